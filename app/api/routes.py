@@ -1,42 +1,154 @@
-import bittensor as bt
-from typing import Optional
-from fastapi import APIRouter, Depends
+import math
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from pydantic import BaseModel
 from app.constants import ROUND_TABLE_HOTKEY, NETWORK
 from app.services.stake import stake_service
-from app.services.auth import get_current_username
+from app.services.auth import check_password, get_current_username, set_session_cookie
 from app.services.wallets import wallets
+from app.services.portfolio import portfolio_service
 from app.core.config import settings
+from utils.amm import ladder
 
 
 router = APIRouter()
 
+# Bounds for trade sizes and tolerances; out-of-range values are rejected with 422
+AMOUNT = dict(gt=0, le=1e9)
+TOLERANCE = dict(gt=0, lt=1)
+
+
+@router.post("/login")
+def login(response: Response, credentials: HTTPBasicCredentials = Depends(HTTPBasic())):
+    """
+    Exchange HTTP Basic credentials for a session token, checked with one bcrypt call.
+
+    The token is returned and also set as an HttpOnly cookie. Send it back as
+    `Authorization: Bearer <token>` (or just keep the cookie) until it expires.
+    """
+    username = check_password(credentials)
+    token, expires = set_session_cookie(response, username)
+    return {"token": token, "expires_at": expires}
+
 @router.get("/min_stake_tolerance")
-def min_stake_tolerance(
-    tao_amount: float,
-    netuid: int,
+async def min_stake_tolerance(
+    tao_amount: float = Query(..., **AMOUNT),
+    netuid: int = Query(..., ge=0),
 ):
-    min_tol = stake_service.get_stake_min_tolerance(tao_amount, netuid)
+    try:
+        min_tol = await stake_service.get_stake_min_tolerance(tao_amount, netuid)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     return {"min_tolerance": min_tol}
 
 
 @router.get("/min_unstake_tolerance")
-def min_unstake_tolerance(
-    tao_amount: float,
-    netuid: int,
+async def min_unstake_tolerance(
+    tao_amount: float = Query(..., **AMOUNT),
+    netuid: int = Query(..., ge=0),
 ):
-    min_tol = stake_service.get_unstake_min_tolerance(tao_amount, netuid)
+    try:
+        min_tol = await stake_service.get_unstake_min_tolerance(tao_amount, netuid)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     return {"min_tolerance": min_tol}
     
 
-@router.get("/stake")
-def stake(
-    tao_amount: float,
-    netuid: int,
+def _parse_amounts(amounts: str) -> List[float]:
+    """
+    Comma-separated trade sizes, each positive, finite and within AMOUNT.
+
+    Raises:
+        HTTPException: 422 on any other value
+    """
+    try:
+        sizes = [float(amount) for amount in amounts.split(",") if amount.strip()]
+    except ValueError:
+        sizes = None
+    if not sizes or not all(math.isfinite(size) and AMOUNT["gt"] < size <= AMOUNT["le"] for size in sizes):
+        raise HTTPException(status_code=422, detail=f"amounts must be numbers above 0 and at most {AMOUNT['le']:g}")
+    return sizes
+
+
+@router.get("/quote")
+async def quote(
+    amounts: Optional[str] = None,
+    netuids: Optional[str] = None,
+    side: str = "both",
+    ladder_max: Optional[float] = Query(None, **AMOUNT),
+    ladder_min: Optional[float] = Query(None, **AMOUNT),
+    ladder_steps: int = Query(10, ge=1, le=100),
+):
+    """
+    Price-impact quotes for several subnets and sizes in one request.
+
+    Pass comma-separated `amounts`, or `ladder_max` (with optional `ladder_min`
+    and `ladder_steps`) for a geometric size ladder. `netuids` is a
+    comma-separated list and defaults to every subnet.
+    """
+    try:
+        if ladder_max is not None:
+            sizes = ladder(ladder_max, ladder_steps, ladder_min).tolist()
+        elif amounts:
+            sizes = _parse_amounts(amounts)
+        else:
+            raise ValueError("Pass amounts or ladder_max")
+        netuid_list = [int(netuid) for netuid in netuids.split(",") if netuid.strip()] if netuids else None
+        return await stake_service.quote(sizes, netuid_list, side)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.get("/balances")
+async def balances(
+    wallet_names: Optional[str] = None,
+    username: str = Depends(get_current_username)
+):
+    """
+    Free balances of the configured wallets (or a comma-separated subset), in one query per block.
+    """
+    try:
+        names = [name for name in wallet_names.split(",") if name.strip()] if wallet_names else None
+        return await stake_service.get_balances(names)
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+@router.get("/portfolio")
+async def portfolio(
     wallet_name: str,
+    username: str = Depends(get_current_username)
+):
+    """
+    Positions, prices and AMM exit values of a wallet (by name) or coldkey (by address),
+    as of the cached head block.
+    """
+    coldkey = portfolio_service.resolve(wallet_name)
+    try:
+        return await portfolio_service.get(coldkey)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+@router.get("/stake")
+async def stake(
+    tao_amount: float = Query(..., **AMOUNT),
+    netuid: int = Query(..., ge=0),
+    wallet_name: str = Query(...),
     dest_hotkey: str = settings.DEFAULT_DEST_HOTKEY,
-    rate_tolerance: float = settings.DEFAULT_RATE_TOLERANCE,
+    rate_tolerance: float = Query(settings.DEFAULT_RATE_TOLERANCE, **TOLERANCE),
     min_tolerance_staking: bool = settings.DEFAULT_MIN_TOLERANCE,
     retries: int = settings.DEFAULT_RETRIES,
+    mode: str = "single",
+    max_impact: float = Query(settings.TWAP_MAX_IMPACT, **TOLERANCE),
+    max_drift: float = Query(settings.TWAP_MAX_DRIFT, **TOLERANCE),
     username: str = Depends(get_current_username)
 ):
     # Validate retries parameter
@@ -50,24 +162,27 @@ def stake(
             "error": f"Wallet '{wallet_name}' not found"
         }
 
-    return stake_service.stake(
+    return await stake_service.stake(
         tao_amount=tao_amount,
         netuid=netuid,
         wallet_name=wallet_name,
         dest_hotkey=dest_hotkey,
         rate_tolerance=rate_tolerance,
         min_tolerance_staking=min_tolerance_staking,
-        retries=retries
+        retries=retries,
+        mode=mode,
+        max_impact=max_impact,
+        max_drift=max_drift,
     )
 
 
 @router.get("/unstake")
-def unstake(
-    netuid: int,
-    wallet_name: str,
-    amount: Optional[float] = None,
+async def unstake(
+    netuid: int = Query(..., ge=0),
+    wallet_name: str = Query(...),
+    amount: Optional[float] = Query(None, **AMOUNT),
     dest_hotkey: str = settings.DEFAULT_DEST_HOTKEY,
-    rate_tolerance: float = settings.DEFAULT_RATE_TOLERANCE,
+    rate_tolerance: float = Query(settings.DEFAULT_RATE_TOLERANCE, **TOLERANCE),
     min_tolerance_unstaking: bool = settings.DEFAULT_MIN_TOLERANCE,
     retries: int = settings.DEFAULT_RETRIES,
     username: str = Depends(get_current_username)
@@ -83,7 +198,7 @@ def unstake(
             "error": f"Wallet '{wallet_name}' not found"
         }
 
-    return stake_service.unstake(
+    return await stake_service.unstake(
         netuid=netuid,
         wallet_name=wallet_name,
         amount=amount,
@@ -94,11 +209,11 @@ def unstake(
     )
 
 @router.get("/move_stake")
-def move_stake(
+async def move_stake(
     wallet_name: str,
-    origin_netuid: int, 
-    destination_netuid: int,
-    amount: Optional[float] = None,
+    origin_netuid: int = Query(..., ge=0),
+    destination_netuid: int = Query(..., ge=0),
+    amount: Optional[float] = Query(None, **AMOUNT),
     origin_hotkey: str = settings.DEFAULT_DEST_HOTKEY,
     destination_hotkey: str = settings.DEFAULT_DEST_HOTKEY,
     retries: int = settings.DEFAULT_RETRIES,
@@ -107,8 +222,15 @@ def move_stake(
     # Validate retries parameter
     if retries < 1:
         retries = 1    
+
+    # Get wallet and delegator
+    if wallet_name not in stake_service.wallets:
+        return {
+            "success": False,
+            "error": f"Wallet '{wallet_name}' not found"
+        }
         
-    return stake_service.move_stake(
+    return await stake_service.move_stake(
         amount=amount,
         wallet_name=wallet_name,
         origin_hotkey=origin_hotkey,
@@ -118,3 +240,29 @@ def move_stake(
         retries=retries
     )
 
+
+class BatchRequest(BaseModel):
+    wallet_name: str
+    operations: List[Dict[str, Any]]
+    mode: str = "all"
+
+
+@router.post("/batch")
+async def batch(
+    request: BatchRequest,
+    username: str = Depends(get_current_username)
+):
+    if request.wallet_name not in stake_service.wallets:
+        return {
+            "success": False,
+            "error": f"Wallet '{request.wallet_name}' not found"
+        }
+
+    try:
+        return await stake_service.batch(
+            wallet_name=request.wallet_name,
+            operations=request.operations,
+            mode=request.mode,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
@@ -1,4 +1,5 @@
 import os
+import secrets
 from pydantic import BaseModel
 from typing import List
 from dotenv import load_dotenv
@@ -10,8 +11,9 @@ load_dotenv(".env")
 
 class Settings(BaseModel):
     VERSION: str = "0.1.0"
-    NETWORK: str = "wss://entrypoint-finney.opentensor.ai:443"
-    #NETWORK: str = "ws://161.97.128.68:9944"
+    # Network name or websocket URL(s); extra nodes for a named network come from
+    # RPC_ENDPOINTS_FINNEY=ws://161.97.128.68:9944,... and are raced against the public one
+    NETWORK: str = "finney"
 
     # WALLET_NAMES: List[str] = []
     # DELEGATORS: List[str] = []
@@ -20,6 +22,14 @@ class Settings(BaseModel):
     DEFAULT_RETRIES: int = 1
     DEFAULT_DEST_HOTKEY: str = ROUND_TABLE_HOTKEY
     USE_ERA: bool = os.getenv("USE_ERA", "true").lower() == "true"
+
+    # mode=twap staking: price impact allowed per child order, and how far the
+    # price may rise from the first child before the order stops
+    TWAP_MAX_IMPACT: float = float(os.getenv("TWAP_MAX_IMPACT", "0.002"))
+    TWAP_MAX_DRIFT: float = float(os.getenv("TWAP_MAX_DRIFT", "0.02"))
+
+    # Push signed extrinsics to every node in BROADCAST_ENDPOINTS (or the network's endpoints)
+    BROADCAST: bool = os.getenv("BROADCAST", "false").lower() == "true"
     
     # WALLET_NAMES: List[str] = os.getenv("WALLET_NAMES", "").split(",")
     # DELEGATORS: List[str] = os.getenv("DELEGATORS", "").split(",")
@@ -28,6 +38,10 @@ class Settings(BaseModel):
     
     ADMIN_HASH: str = "$2b$12$nJCB59aSOjndYY665l/zN.SMIB5OSIv6TagvBcUUyhBKD2wi/WTUC"
 
-settings = Settings()
+    # Key signing the session tokens issued by POST /login, and how long they live.
+    # The server refuses to start without SESSION_SECRET, so every worker signs with the same key;
+    # the random fallback only serves code that imports the settings without running the server
+    SESSION_SECRET: str = os.getenv("SESSION_SECRET") or secrets.token_hex(32)
+    SESSION_TTL: int = int(os.getenv("SESSION_TTL", "3600"))
 
-print(f"USE_ERA: {settings.USE_ERA}")
\ No newline at end of file
+settings = Settings()
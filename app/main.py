@@ -1,17 +1,17 @@
+import asyncio
+import os
 import fastapi
-import bittensor as bt
-import subprocess
 from fastapi import Depends
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 
 from app.api.routes import router
 from app.core.config import settings
 from app.constants import NETWORK
-from app.services.wallets import wallets
 from app.services.stake import stake_service
-from app.services.auth import get_current_username
-from utils.stake_list import get_stake_list
+from app.services.auth import get_current_username, set_session_cookie
+from app.services.portfolio import portfolio_service
+from utils.stake_list import render_portfolio_html
 
 
 app = fastapi.FastAPI()
@@ -21,70 +21,76 @@ app.include_router(router)
 templates = Jinja2Templates(directory="app/templates")
 
 
+# Served while the wallets are unlocking and the chain clients connecting
+STARTUP_PATHS = ("/health", "/login")
+
+
+@app.on_event("startup")
+async def startup():
+    print(f"USE_ERA: {settings.USE_ERA}")
+    if not os.getenv("SESSION_SECRET"):
+        # Workers can't tell how many siblings they have (uvicorn --workers sets no env var),
+        # and each would sign with its own random key and reject the others' tokens
+        raise RuntimeError("SESSION_SECRET must be set; generate one with `openssl rand -hex 32`")
+    # Unlock and connect in the background so the server accepts requests (and /health) right away
+    app.state.initialize = asyncio.create_task(stake_service.initialize())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.initialize.cancel()
+    await stake_service.close()
+
+
+@app.middleware("http")
+async def require_ready(request: fastapi.Request, call_next):
+    if not stake_service.ready and request.url.path not in STARTUP_PATHS:
+        return JSONResponse(
+            {"success": False, "error": "Starting up, see /health"},
+            status_code=503,
+            headers={"Retry-After": "5"},
+        )
+    return await call_next(request)
+
+
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    """
+    Readiness: 200 once wallets are unlocked and the chain is connected, 503 before.
+    """
+    status = dict(stake_service.status(), status="ok" if stake_service.ready else "starting")
+    return JSONResponse(status, status_code=200 if stake_service.ready else 503)
 
 @app.get("/")
-def read_root(request: fastapi.Request, username: str = Depends(get_current_username)):
-    subtensor = stake_service.subtensor
-    def get_balance_html():
+async def read_root(request: fastapi.Request, username: str = Depends(get_current_username)):
+    async def get_balance_html():
+        balances = (await stake_service.get_balances(settings.WALLET_NAMES))["balances"]
         balance_html = ""
-        for wallet_name in settings.WALLET_NAMES:
-            _, delegator = wallets[wallet_name]
-            balance = subtensor.get_balance(delegator)
+        for wallet_name, balance in balances.items():
             balance_html += f"""
                 <div class="balance-container">
-                    <div class="balance-title"><a target="_blank" href="/stake_list_v2?wallet_name={delegator}" style="text-decoration: none; color: inherit; cursor: pointer; text-decoration: underline;">{wallet_name}</a></div>
-                    <div class="balance-amount">{balance} TAO</div>
+                    <div class="balance-title"><a target="_blank" href="/stake_list?wallet_name={balance['delegator']}" style="text-decoration: none; color: inherit; cursor: pointer; text-decoration: underline;">{wallet_name}</a></div>
+                    <div class="balance-amount">τ{balance['free']:,.9f} TAO</div>
                 </div>
             """
         return balance_html
 
-    return templates.TemplateResponse(
+    response = templates.TemplateResponse(
         "index.html",
         {
             "request": request, 
-            "balance_html": get_balance_html(), 
+            "balance_html": await get_balance_html(), 
             "wallet_names": settings.WALLET_NAMES,
             "delegators": settings.DELEGATORS,
         }
     )
+    # The page's own API calls then authenticate with the session cookie instead of bcrypt
+    set_session_cookie(response, username)
+    return response
 
 
 
 @app.get("/stake_list")
-def stake_list(wallet_name: str):
-    result = subprocess.run(["btcli", "stake", "list", "--name", wallet_name, "--no-prompt"], capture_output=True, text=True)
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>{wallet_name} | Stake List</title>
-    </head>
-    <body>
-        <pre>{result.stdout}</pre>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
-
-
-@app.get("/stake_list_v2")
-def stake_list_v2(wallet_name: str):
-    subtensor = stake_service.subtensor
-    stake_list = get_stake_list(subtensor, wallet_name)
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>{wallet_name} | Stake List</title>
-    </head>
-    <body>
-        <pre>{stake_list}</pre>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
-
-
+async def stake_list(wallet_name: str):
+    portfolio = await portfolio_service.get(portfolio_service.resolve(wallet_name))
+    return HTMLResponse(content=render_portfolio_html(portfolio, wallet_name))
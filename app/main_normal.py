@@ -15,6 +15,8 @@ from dotenv import load_dotenv
 from app.core.config import settings
 from app.services.auth import get_current_username
 from app.constants import ROUND_TABLE_HOTKEY, NETWORK
+from utils.balances import get_balance_cache
+from utils.substrate_pool import SubstratePool
 
 app = fastapi.FastAPI()
 
@@ -41,15 +43,20 @@ def unlock_wallets():
 
 unlock_wallets()
 
+# Balances for the dashboard, read for every wallet in one query per block
+balance_cache = get_balance_cache(NETWORK)
+substrate_pool = SubstratePool(NETWORK, size=1)
+
 @app.get("/")
 def read_root(request: fastapi.Request, username: str = Depends(get_current_username)):
     try:
-        subtensor = bt.Subtensor(network=NETWORK)
         def get_balance_html():
+            addresses = {wallet_name: wallets[wallet_name].coldkey.ss58_address for wallet_name in wallet_names}
+            with substrate_pool.connection() as substrate:
+                balances = balance_cache.get(substrate, addresses.values())
             balance_html = ""
-            for wallet_name in wallet_names:
-                wallet = wallets[wallet_name]
-                balance = subtensor.get_balance(wallet.coldkey.ss58_address)
+            for wallet_name, address in addresses.items():
+                balance = balances[address]
                 balance_html += f"""
                     <div class="balance-container">
                         <div class="balance-title"><a target="_blank" href="/stake_list?wallet_name={wallet_name}" style="text-decoration: none; color: inherit; cursor: pointer; text-decoration: underline;">{wallet_name}</a></div>
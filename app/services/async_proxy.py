@@ -0,0 +1,306 @@
+import asyncio
+import bittensor as bt
+from typing import Dict, List, Optional
+from bittensor.utils.balance import Balance
+from utils.amm import tolerance_error
+from utils.batch import BATCH_MODES, batch_calls, decode_batch_events, stake_needed, subnet_needed
+from utils.broadcast import ExtrinsicBroadcaster, broadcast_endpoints
+from utils.nonce import NotIncludedError, nonce_manager
+from utils.receipts import TradeOutcome, parse_trade_outcome
+from utils.rpc import create_async_subtensor
+from utils.snapshot import take_snapshot_async
+from utils.subnet_cache import get_subnet_cache
+
+
+class AsyncProxy:
+    """
+    asyncio counterpart of Proxy for the API.
+
+    Every query and extrinsic goes over the single multiplexed websocket of a
+    bt.AsyncSubtensor, so waiting for inclusion parks a coroutine instead of
+    a threadpool thread and one worker can keep many trades in flight.
+    """
+
+    def __init__(
+        self,
+        network: str,
+        use_era: bool = True,
+        broadcast: bool = False,
+    ):
+        """
+        Initialize the AsyncProxy object. Call initialize() before use.
+
+        Args:
+            network: Network name, websocket URL or comma-separated URLs
+            use_era: Whether to use era parameter in extrinsic creation
+            broadcast: Whether to also push signed extrinsics to every broadcast endpoint
+        """
+        self.network = network
+        self.use_era = use_era
+        # Connected by initialize()
+        self.subtensor: Optional[bt.AsyncSubtensor] = None
+        self.subnets = get_subnet_cache(network)
+        self.broadcaster = ExtrinsicBroadcaster(broadcast_endpoints(network)) if broadcast else None
+
+    @property
+    def substrate(self):
+        return self.subtensor.substrate
+
+    async def initialize(self):
+        """
+        Connect the subtensor and wait for the first subnet state.
+
+        Raises:
+            ConnectionError: If no endpoint is reachable or the subnet state does not load
+        """
+        self.subtensor = await create_async_subtensor(self.network)
+        if not await self.subnets.wait_ready_async():
+            raise ConnectionError(f"Subnet state for {self.network} did not load in time")
+
+    async def close(self):
+        if self.subtensor is not None:
+            await self.subtensor.close()
+
+    async def add_stake(
+        self,
+        proxy_wallet: bt.Wallet,
+        delegator: str,
+        netuid: int,
+        hotkey: str,
+        amount: Balance,
+        tolerance: float = 0.005,
+    ) -> TradeOutcome:
+        """
+        Add stake to a subnet.
+
+        Args:
+            proxy_wallet: Proxy wallet
+            netuid: Network/subnet ID
+            hotkey: Hotkey address
+            amount: Amount to stake
+            tolerance: Tolerance for stake amount
+        """
+        snapshot = await take_snapshot_async(self.substrate, delegator, netuids=[netuid])
+        print(f"free_balance: {snapshot.free_balance}")
+        pool = snapshot.pool(netuid)
+        if not pool:
+            return TradeOutcome(False, error=f"Subnet with netuid {netuid} does not exist")
+        error = tolerance_error(pool.quote(amount, buy=True), tolerance)
+        if error:
+            return TradeOutcome(False, error=error)
+        price_with_tolerance = pool.limit_price(tolerance, buy=True)
+
+        print(f"price_with_tolerance: {price_with_tolerance}")
+        call = await self.substrate.compose_call(
+            call_module='SubtensorModule',
+            call_function='add_stake_limit',
+            call_params={
+                "hotkey": hotkey,
+                "netuid": netuid,
+                "amount_staked": amount.rao,
+                "limit_price": price_with_tolerance,
+                "allow_partial": False,
+            }
+        )
+        return await self._do_proxy_call(proxy_wallet, delegator, call)
+
+    async def remove_stake(
+        self,
+        proxy_wallet: bt.Wallet,
+        delegator: str,
+        netuid: int,
+        hotkey: str,
+        amount: Balance,
+        tolerance: float = 0.005,
+    ) -> TradeOutcome:
+        """
+        Remove stake from a subnet.
+
+        Args:
+            proxy_wallet: Proxy wallet
+            netuid: Network/subnet ID
+            hotkey: Hotkey address
+            amount: Amount to unstake
+            tolerance: Tolerance for unstake price
+        """
+        snapshot = await take_snapshot_async(self.substrate, delegator, netuids=[netuid])
+        pool = snapshot.pool(netuid)
+        if not pool:
+            return TradeOutcome(False, error=f"Subnet with netuid {netuid} does not exist")
+        error = tolerance_error(pool.quote(amount, buy=False), tolerance)
+        if error:
+            return TradeOutcome(False, error=error)
+        price_with_tolerance = pool.limit_price(tolerance, buy=False)
+        print(f"amount: {amount.rao}")
+
+        call = await self.substrate.compose_call(
+            call_module='SubtensorModule',
+            call_function='remove_stake_limit',
+            call_params={
+                "hotkey": hotkey,
+                "netuid": netuid,
+                "amount_unstaked": amount.rao - 1,
+                "limit_price": price_with_tolerance,
+                "allow_partial": False,
+            }
+        )
+        return await self._do_proxy_call(proxy_wallet, delegator, call)
+
+    async def move_stake(
+        self,
+        proxy_wallet: bt.Wallet,
+        delegator: str,
+        origin_hotkey: str,
+        destination_hotkey: str,
+        origin_netuid: int,
+        destination_netuid: int,
+        amount: Balance,
+    ) -> TradeOutcome:
+        """
+        Move stake between validators
+
+        Args:
+            origin_hotkey: Source hotkey address
+            destination_hotkey: Destination hotkey address
+            origin_netuid: Source subnet ID
+            destination_netuid: Destination subnet ID
+            amount: Amount to move
+        """
+        snapshot = await take_snapshot_async(self.substrate, delegator, positions=[(origin_hotkey, origin_netuid)])
+        balance = snapshot.stake(origin_hotkey, origin_netuid)
+        print(f"Current alpha balance on netuid {origin_netuid}: {balance}")
+
+        if amount.rao > balance.rao:
+            return TradeOutcome(False, error="Amount to swap is greater than current balance")
+
+        call = await self.substrate.compose_call(
+            call_module='SubtensorModule',
+            call_function='move_stake',
+            call_params={
+                'origin_hotkey': origin_hotkey,
+                'destination_hotkey': destination_hotkey,
+                'origin_netuid': origin_netuid,
+                'destination_netuid': destination_netuid,
+                'alpha_amount': amount.rao - 1,
+            }
+        )
+        return await self._do_proxy_call(proxy_wallet, delegator, call)
+
+    async def batch(
+        self,
+        proxy_wallet: bt.Wallet,
+        delegator: str,
+        ops: List[Dict],
+        mode: str = "all",
+    ) -> tuple[bool, List[Dict]]:
+        """
+        Run several add/remove/move operations in one proxied Utility batch extrinsic.
+
+        Args:
+            proxy_wallet: Proxy wallet
+            delegator: Delegator address
+            ops: Operations returned by utils.batch.parse_operations
+            mode: "all" for batch_all (all or nothing) or "force" for force_batch
+        """
+        if mode not in BATCH_MODES:
+            return False, [{"success": False, "error": f"Unknown batch mode {mode!r}", "events": []} for _ in ops]
+
+        snapshot = await take_snapshot_async(
+            self.substrate,
+            delegator,
+            netuids={subnet_needed(op) for op in ops} - {None},
+            positions={stake_needed(op) for op in ops} - {None},
+        )
+        try:
+            priced = batch_calls(snapshot, ops)
+        except ValueError as e:
+            return False, [{"success": False, "error": str(e), "events": []} for _ in ops]
+
+        calls = [
+            await self.substrate.compose_call(
+                call_module='SubtensorModule',
+                call_function=call_function,
+                call_params=call_params,
+            )
+            for call_function, call_params in priced
+        ]
+        call = await self.substrate.compose_call(
+            call_module='Utility',
+            call_function=BATCH_MODES[mode],
+            call_params={'calls': calls},
+        )
+        receipt, error_message = await self._submit_proxy_call(proxy_wallet, delegator, call)
+        events = await receipt.triggered_events if receipt is not None else []
+        return decode_batch_events(events, len(ops), error_message)
+
+    async def _do_proxy_call(
+        self,
+        proxy_wallet: bt.Wallet,
+        delegator: str,
+        call,
+    ) -> TradeOutcome:
+        receipt, error_message = await self._submit_proxy_call(proxy_wallet, delegator, call)
+        if receipt is None:
+            return TradeOutcome(False, error=error_message)
+
+        outcome = parse_trade_outcome(await receipt.triggered_events, extrinsic=receipt.extrinsic_hash)
+        print(f"outcome: {outcome}")
+        return outcome
+
+    async def _submit_proxy_call(
+        self,
+        proxy_wallet: bt.Wallet,
+        delegator: str,
+        call,
+    ) -> tuple[Optional[object], Optional[str]]:
+        """
+        Wrap a call in Proxy.proxy, sign it and submit it.
+
+        Returns:
+            Tuple of (receipt, None) on inclusion or (None, error message)
+        """
+        substrate = self.substrate
+        proxy_call = await substrate.compose_call(
+            call_module='Proxy',
+            call_function='proxy',
+            call_params={
+                'real': delegator,
+                'force_proxy_type': 'Staking',
+                'call': call,
+            }
+        )
+        signer = proxy_wallet.coldkey.ss58_address
+        nonce = await nonce_manager.acquire_async(substrate, signer)
+        try:
+            era = {"period": 1} if self.use_era else None
+            extrinsic = await substrate.create_signed_extrinsic(
+                call=proxy_call,
+                keypair=proxy_wallet.coldkey,
+                era=era,
+                nonce=nonce,
+            )
+            print(f"extrinsic: {extrinsic}")
+            push = None
+            if self.broadcaster:
+                # Extra nodes get the raw bytes from a thread while our own connection watches inclusion
+                push = asyncio.ensure_future(asyncio.to_thread(self.broadcaster.push, str(extrinsic.data)))
+            receipt = await substrate.submit_extrinsic(
+                extrinsic,
+                wait_for_inclusion=True,
+                wait_for_finalization=False,
+            )
+            if push is not None:
+                print(f"broadcast: {await push}")
+        except Exception as e:
+            error = e
+            if push is not None:
+                # push() reports per-node errors instead of raising
+                report = await push
+                print(f"broadcast: {report}")
+                if report["acks_ms"]:
+                    # Another node accepted it, so it may still land and use the nonce
+                    error = NotIncludedError(str(e), report)
+            nonce_manager.release(signer, nonce, error)
+            return None, str(e)
+        nonce_manager.release(signer, nonce)
+        return receipt, None
@@ -1,31 +1,114 @@
-from fastapi import Depends, HTTPException, status
+import hashlib
+import hmac
+import time
+from typing import Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 
 from bcrypt import checkpw
 from app.core.config import settings
 
 
-security = HTTPBasic()
+# Credentials are optional here so a request carrying a session token is not rejected for lacking them
+security = HTTPBasic(auto_error=False)
+
+SESSION_COOKIE = "session"
 
 # Get admin hash from environment variable
 USERS = {
     "admin": settings.ADMIN_HASH.encode()
 }
 
-def get_current_username(credentials: HTTPBasicCredentials = Depends(security)):
-    if credentials.username not in USERS:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Basic"},
-        )
-    
-    stored_hash = USERS[credentials.username]
-    if not checkpw(credentials.password.encode(), stored_hash):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Basic"},
-        )
-    
-    return credentials.username
\ No newline at end of file
+
+def _unauthorized() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect username or password",
+        headers={"WWW-Authenticate": "Basic"},
+    )
+
+
+def _sign(payload: str) -> str:
+    return hmac.new(settings.SESSION_SECRET.encode(), payload.encode(), hashlib.sha256).hexdigest()
+
+
+def check_password(credentials: HTTPBasicCredentials) -> str:
+    """
+    Verify a username and password against the bcrypt hashes. Deliberately slow.
+
+    Raises:
+        HTTPException: 401 if the credentials are wrong
+    """
+    stored_hash = USERS.get(credentials.username)
+    if stored_hash is None or not checkpw(credentials.password.encode(), stored_hash):
+        raise _unauthorized()
+    return credentials.username
+
+
+def issue_token(username: str) -> Tuple[str, int]:
+    """
+    Session token for a user who has just passed check_password().
+
+    Returns:
+        (token, expiry as a unix timestamp)
+    """
+    expires = int(time.time()) + settings.SESSION_TTL
+    payload = f"{username}:{expires}"
+    return f"{payload}:{_sign(payload)}", expires
+
+
+def verify_token(token: str) -> Optional[str]:
+    """
+    Username a session token was issued to, or None if it is forged, malformed or expired.
+    """
+    payload, _, signature = token.rpartition(":")
+    username, _, expires = payload.rpartition(":")
+    # Compared as bytes: compare_digest raises TypeError on non-ASCII str
+    if not hmac.compare_digest(_sign(payload).encode(), signature.encode()):
+        return None
+    if not expires.isdigit() or int(expires) < time.time() or username not in USERS:
+        return None
+    return username
+
+
+def set_session_cookie(response: Response, username: str) -> Tuple[str, int]:
+    """
+    Issue a session token and store it in an HttpOnly cookie on the response.
+    """
+    token, expires = issue_token(username)
+    response.set_cookie(
+        SESSION_COOKIE,
+        token,
+        max_age=settings.SESSION_TTL,
+        httponly=True,
+        samesite="strict",
+    )
+    return token, expires
+
+
+def get_current_username(
+    request: Request,
+    credentials: Optional[HTTPBasicCredentials] = Depends(security),
+) -> str:
+    """
+    Authenticate a request by its session token, falling back to HTTP Basic.
+
+    The token is read from an `Authorization: Bearer` header or the session
+    cookie and checked with one HMAC, so authenticated calls on the trade path
+    skip bcrypt. Basic credentials still work but pay for a bcrypt check on
+    every request; clients should exchange them once at POST /login.
+    """
+    authorization = request.headers.get("Authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:].strip()
+    else:
+        token = request.cookies.get(SESSION_COOKIE)
+    if token:
+        username = verify_token(token)
+        if username is not None:
+            return username
+
+    if credentials is None:
+        raise _unauthorized()
+    return check_password(credentials)
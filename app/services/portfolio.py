@@ -0,0 +1,104 @@
+import asyncio
+from typing import Dict, List, Tuple
+
+from fastapi import HTTPException, status
+from scalecodec.utils.ss58 import ss58_decode
+
+from app.services.stake import stake_service
+from app.services.wallets import wallets
+from utils.stake_list import build_portfolio
+
+# Anything this long that is not a configured wallet is taken to be a (mistyped) address
+SS58_MIN_LENGTH = 40
+
+
+class PortfolioService:
+    """
+    Portfolios of coldkeys, cached per block.
+
+    Prices, reserves and exit values come from the shared SubnetStateCache,
+    which already holds every subnet at the head block, so a portfolio costs
+    only its stake and balance queries, pinned to that block. The result is
+    kept until the head moves; concurrent requests for the same coldkey and
+    block share one fetch.
+    """
+
+    def __init__(self, service):
+        """
+        Args:
+            service: StakeService whose chain clients are used once it has connected
+        """
+        self.service = service
+        # coldkey -> (block, portfolio); entries of older blocks are dropped when the head moves
+        self._cache: Dict[str, Tuple[int, Dict]] = {}
+        self._pending: Dict[Tuple[str, int], asyncio.Task] = {}
+
+    @property
+    def subtensor(self):
+        return self.service.subtensor
+
+    @property
+    def subnets(self):
+        return self.service.proxy.subnets
+
+    @property
+    def balances(self):
+        return self.service.balances
+
+    @staticmethod
+    def resolve(wallet_name: str) -> str:
+        """
+        Delegator coldkey of a configured wallet name, or the argument itself if it is an address.
+
+        Raises:
+            HTTPException: 404 for an unknown wallet name, 422 for an invalid SS58 address
+        """
+        if wallet_name in wallets:
+            return wallets[wallet_name][1]
+        try:
+            ss58_decode(wallet_name)
+        except ValueError:
+            if len(wallet_name) < SS58_MIN_LENGTH:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Wallet '{wallet_name}' not found")
+            raise HTTPException(status_code=422, detail=f"'{wallet_name}' is not a valid SS58 address")
+        return wallet_name
+
+    async def get(self, coldkey: str) -> Dict:
+        """
+        Portfolio of a coldkey at the cached head block.
+        """
+        await self.subnets.wait_ready_async()
+        # Prices, reserves and the stake query all come from this one block
+        block, block_hash, subnets, engine = self.subnets.state()
+        cached = self._cache.get(coldkey)
+        if cached is not None and cached[0] == block:
+            return cached[1]
+
+        key = (coldkey, block)
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(coldkey, block, block_hash, subnets, engine))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, coldkey: str, block: int, block_hash: str, subnets: List, engine) -> Dict:
+        stake_infos, balances = await asyncio.gather(
+            self.subtensor.get_stake_for_coldkey(coldkey_ss58=coldkey, block_hash=block_hash),
+            self.balances.get_async(self.subtensor.substrate, [coldkey], block_hash=block_hash),
+        )
+        portfolio = build_portfolio(
+            coldkey,
+            stake_infos,
+            subnets,
+            balances[coldkey],
+            block=block,
+            engine=engine,
+        )
+        if any(cached_block < block for cached_block, _ in self._cache.values()):
+            self._cache = {key: entry for key, entry in self._cache.items() if entry[0] >= block}
+        self._cache[coldkey] = (block, portfolio)
+        return portfolio
+
+
+portfolio_service = PortfolioService(stake_service)
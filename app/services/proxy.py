@@ -3,28 +3,50 @@ from substrateinterface import SubstrateInterface
 from substrateinterface.exceptions import SubstrateRequestException
 from typing import Optional, cast
 from bittensor.utils.balance import Balance, FixedPoint, fixed_to_float
+from utils.amm import tolerance_error
+from utils.broadcast import ExtrinsicBroadcaster, broadcast_endpoints
+from utils.nonce import nonce_manager
+from utils.receipts import TradeOutcome, parse_trade_outcome
+from utils.rpc import connect_substrate, create_subtensor, get_endpoints
+from utils.snapshot import take_snapshot
+from utils.substrate_pool import CONNECTION_ERRORS, SubstratePool
 
 class Proxy:
-    def __init__(self, network: str, use_era: bool = True):
+    def __init__(
+        self,
+        network: str,
+        use_era: bool = True,
+        pool_size: int = 4,
+        heartbeat_interval: float = 12.0,
+        broadcast: bool = False,
+    ):
         """
         Initialize the RonProxy object.
         
         Args:
-            network: Network name
+            network: Network name, websocket URL or comma-separated URLs
             use_era: Whether to use era parameter in extrinsic creation
+            pool_size: Number of pre-warmed substrate connections to keep open
+            heartbeat_interval: Seconds between health checks of idle connections
+            broadcast: Whether to push signed extrinsics to every broadcast endpoint at once
         """
         self.network = network
         self.use_era = use_era
-        self.subtensor = bt.Subtensor(network=network)
+        self.subtensor = create_subtensor(network)
+        self.pool = SubstratePool(
+            network,
+            size=pool_size,
+            heartbeat_interval=heartbeat_interval,
+        )
+        self.broadcaster = ExtrinsicBroadcaster(broadcast_endpoints(network)) if broadcast else None
         
 
     def init_runtime(self):
-        self.substrate = SubstrateInterface(
-            url=self.network,
-            ss58_format=42,
-            type_registry_preset='substrate-node-template',
-            auto_reconnect=True,
-        )
+        """
+        Open a dedicated connection on self.substrate.
+        Trades no longer need this; they check a warm connection out of self.pool.
+        """
+        self.substrate = connect_substrate(get_endpoints(self.network).best())
 
     def add_stake(
         self, 
@@ -34,7 +56,7 @@ class Proxy:
         hotkey: str, 
         amount: Balance, 
         tolerance: float = 0.005,
-    ) -> tuple[bool, str]:
+    ) -> TradeOutcome:
         """
         Add stake to a subnet.
         
@@ -45,49 +67,30 @@ class Proxy:
             amount: Amount to stake
             tolerance: Tolerance for stake amount
         """
-        free_balance = self.subtensor.get_balance(
-            address=delegator,
-        )
-        print(f"free_balance: {free_balance}")
-        subnet_info = self.subtensor.subnet(netuid)
-        if not subnet_info:
-            return False, f"Subnet with netuid {netuid} does not exist"
-        
-        if subnet_info.is_dynamic:
-            rate = 1 / subnet_info.price.tao or 1
-            _rate_with_tolerance = rate * (
-                1 + tolerance
-            )  # Rate only for display
-            rate_with_tolerance = f"{_rate_with_tolerance:.4f}"
-            price_with_tolerance = subnet_info.price.rao * (
-                1 + tolerance
+        with self.pool.connection() as substrate:
+            snapshot = take_snapshot(substrate, delegator, netuids=[netuid])
+            print(f"free_balance: {snapshot.free_balance}")
+            pool = snapshot.pool(netuid)
+            if not pool:
+                return TradeOutcome(False, error=f"Subnet with netuid {netuid} does not exist")
+            error = tolerance_error(pool.quote(amount, buy=True), tolerance)
+            if error:
+                return TradeOutcome(False, error=error)
+            price_with_tolerance = pool.limit_price(tolerance, buy=True)
+            print(f"price_with_tolerance: {price_with_tolerance}")
+            call = substrate.compose_call(
+                call_module='SubtensorModule',
+                call_function='add_stake_limit',
+                call_params={
+                    "hotkey": hotkey,
+                    "netuid": netuid,
+                    "amount_staked": amount.rao,
+                    "limit_price": price_with_tolerance,
+                    "allow_partial": False,
+                }
             )
-        else:
-            rate_with_tolerance = "1"
-            price_with_tolerance = Balance.from_rao(1)
-
-        print(f"price_with_tolerance: {price_with_tolerance}")
-        self.init_runtime()
-        call = self.substrate.compose_call(
-            call_module='SubtensorModule',
-            call_function='add_stake_limit',
-            call_params={
-                "hotkey": hotkey,
-                "netuid": netuid,
-                "amount_staked": amount.rao,
-                "limit_price": price_with_tolerance,
-                "allow_partial": False,
-            }
-        )
-        print(f"call: {call}")
-        is_success, error_message = self._do_proxy_call(proxy_wallet, delegator, call)
-        new_free_balance = self.subtensor.get_balance(
-            address=delegator,
-        )
-        if new_free_balance.rao < free_balance.rao:
-            return True, f"Stake added successfully"
-        else:
-            return False, f"Error: {error_message}"
+            print(f"call: {call}")
+            return self._do_proxy_call(substrate, proxy_wallet, delegator, call)
 
 
     def remove_stake(
@@ -98,7 +101,7 @@ class Proxy:
         hotkey: str,
         amount: Balance,
         tolerance: float = 0.005,
-    ) -> tuple[bool, str]:
+    ) -> TradeOutcome:
         """
         Remove stake from a subnet.
         
@@ -109,46 +112,28 @@ class Proxy:
             amount: Amount to unstake (if not using --all)
             all: Whether to unstake all available balance
         """
-        subnet_info = self.subtensor.subnet(netuid)
-        if not subnet_info:
-            return False, f"Subnet with netuid {netuid} does not exist"
-        
-        if subnet_info.is_dynamic:
-            rate = subnet_info.price.tao or 1
-            rate_with_tolerance = rate * (
-                1 - tolerance
-            )  # Rate only for display
-            price_with_tolerance = subnet_info.price.rao * (
-                1 - tolerance
-            )  # Actual price to pass to extrinsic
-        else:
-            rate_with_tolerance = 1
-            price_with_tolerance = 1
         print(f"amount: {amount.rao}")
-        self.init_runtime()
-        call = self.substrate.compose_call(
-            call_module='SubtensorModule',
-            call_function='remove_stake_limit',
-            call_params={
-                "hotkey": hotkey,
-                "netuid": netuid,
-                "amount_unstaked": amount.rao - 1,
-                "limit_price": price_with_tolerance,
-                "allow_partial": False,
-            }
-        )
-        free_balance = self.subtensor.get_balance(
-            address=delegator,
-        )
-        
-        is_success, error_message = self._do_proxy_call(proxy_wallet, delegator, call)
-        new_free_balance = self.subtensor.get_balance(
-            address=delegator,
-        )
-        if new_free_balance.rao > free_balance.rao:
-            return True, f"Stake removed successfully"
-        else:
-            return False, f"Error: {error_message}"
+        with self.pool.connection() as substrate:
+            snapshot = take_snapshot(substrate, delegator, netuids=[netuid])
+            pool = snapshot.pool(netuid)
+            if not pool:
+                return TradeOutcome(False, error=f"Subnet with netuid {netuid} does not exist")
+            error = tolerance_error(pool.quote(amount, buy=False), tolerance)
+            if error:
+                return TradeOutcome(False, error=error)
+            price_with_tolerance = pool.limit_price(tolerance, buy=False)
+            call = substrate.compose_call(
+                call_module='SubtensorModule',
+                call_function='remove_stake_limit',
+                call_params={
+                    "hotkey": hotkey,
+                    "netuid": netuid,
+                    "amount_unstaked": amount.rao - 1,
+                    "limit_price": price_with_tolerance,
+                    "allow_partial": False,
+                }
+            )
+            return self._do_proxy_call(substrate, proxy_wallet, delegator, call)
 
     def move_stake(
         self, 
@@ -159,7 +144,7 @@ class Proxy:
         origin_netuid: int, 
         destination_netuid: int, 
         amount: Balance, 
-    ) -> tuple[bool, str]:
+    ) -> TradeOutcome:
         """
         Move stake between validators
         
@@ -170,48 +155,35 @@ class Proxy:
             amount: Amount to swap (if not using --all)
             all: Whether to swap all available balance
         """
-        balance = self.subtensor.get_stake(
-            coldkey_ss58=delegator,
-            hotkey_ss58=origin_hotkey,
-            netuid=origin_netuid,
-        )
-        print(f"Current alpha balance on netuid {origin_netuid}: {balance}")
-        
-        if amount.rao > balance.rao:
-            return False, f"Error: Amount to swap is greater than current balance"
+        with self.pool.connection() as substrate:
+            snapshot = take_snapshot(substrate, delegator, positions=[(origin_hotkey, origin_netuid)])
+            balance = snapshot.stake(origin_hotkey, origin_netuid)
+            print(f"Current alpha balance on netuid {origin_netuid}: {balance}")
 
-        self.init_runtime()
-        
-        call = self.substrate.compose_call(
-            call_module='SubtensorModule',
-            call_function='move_stake',
-            call_params={
-                'origin_hotkey': origin_hotkey,
-                'destination_hotkey': destination_hotkey,
-                'origin_netuid': origin_netuid,
-                'destination_netuid': destination_netuid,
-                'alpha_amount': amount.rao - 1,
-            }
-        )
-        is_success, error_message = self._do_proxy_call(proxy_wallet, delegator, call)
-        new_balance = self.subtensor.get_stake(
-            coldkey_ss58=delegator,
-            hotkey_ss58=origin_hotkey,
-            netuid=origin_netuid,
-        )
-        print(f"New alpha balance on netuid {origin_netuid}: {new_balance}")
-        if new_balance.rao < balance.rao:
-            return True, f"Stake swapped successfully"
-        else:
-            return False, f"Error: {error_message}"
+            if amount.rao > balance.rao:
+                return TradeOutcome(False, error="Amount to swap is greater than current balance")
+
+            call = substrate.compose_call(
+                call_module='SubtensorModule',
+                call_function='move_stake',
+                call_params={
+                    'origin_hotkey': origin_hotkey,
+                    'destination_hotkey': destination_hotkey,
+                    'origin_netuid': origin_netuid,
+                    'destination_netuid': destination_netuid,
+                    'alpha_amount': amount.rao - 1,
+                }
+            )
+            return self._do_proxy_call(substrate, proxy_wallet, delegator, call)
 
     def _do_proxy_call(
         self,
+        substrate: SubstrateInterface,
         proxy_wallet: bt.Wallet,
         delegator: str,
         call,
-    ) -> tuple[bool, str]:
-        proxy_call = self.substrate.compose_call(
+    ) -> TradeOutcome:
+        proxy_call = substrate.compose_call(
             call_module='Proxy',
             call_function='proxy',
             call_params={
@@ -220,31 +192,44 @@ class Proxy:
                 'call': call,
             }
         )
-        if self.use_era:
-            extrinsic = self.substrate.create_signed_extrinsic(
-                call=proxy_call,
-                keypair=proxy_wallet.coldkey,
-                era={"period": 1},
-            )
-        else:
-            extrinsic = self.substrate.create_signed_extrinsic(
-                call=proxy_call,
-                keypair=proxy_wallet.coldkey,
-            )
-        print(f"extrinsic: {extrinsic}")
+        # Nonces are assigned locally so concurrent trades from one proxy wallet don't collide
+        signer = proxy_wallet.coldkey.ss58_address
+        nonce = nonce_manager.acquire(substrate, signer)
         try:
-            receipt = self.substrate.submit_extrinsic(
-                extrinsic,
-                wait_for_inclusion=True,
-                wait_for_finalization=False,
-            )
+            if self.use_era:
+                extrinsic = substrate.create_signed_extrinsic(
+                    call=proxy_call,
+                    keypair=proxy_wallet.coldkey,
+                    era={"period": 1},
+                    nonce=nonce,
+                )
+            else:
+                extrinsic = substrate.create_signed_extrinsic(
+                    call=proxy_call,
+                    keypair=proxy_wallet.coldkey,
+                    nonce=nonce,
+                )
+            print(f"extrinsic: {extrinsic}")
+            if self.broadcaster:
+                receipt, report = self.broadcaster.submit(substrate, extrinsic)
+                print(f"broadcast: {report}")
+            else:
+                receipt = substrate.submit_extrinsic(
+                    extrinsic,
+                    wait_for_inclusion=True,
+                    wait_for_finalization=False,
+                )
         except Exception as e:
-            error_message = str(e)
-            return False, error_message
-        
-        is_success = receipt.is_success
-        error_message = receipt.error_message
-        return is_success, str(error_message)
+            nonce_manager.release(signer, nonce, e)
+            if isinstance(e, CONNECTION_ERRORS):
+                # The error becomes an outcome, so tell the pool not to hand this socket out again
+                self.pool.mark_broken(substrate)
+            return TradeOutcome(False, error=str(e))
+        nonce_manager.release(signer, nonce)
+
+        outcome = parse_trade_outcome(receipt.triggered_events, extrinsic=receipt.extrinsic_hash)
+        print(f"outcome: {outcome}")
+        return outcome
 
 
 if __name__ == "__main__":
@@ -254,5 +239,5 @@ if __name__ == "__main__":
     netuid = input("Enter netuid: ")
     proxy_wallet.unlock_coldkey()
     proxy = Proxy("finney")
-    is_success, error_message = proxy.add_stake(proxy_wallet, delegator, int(netuid), "5F5WLLEzDBXQDdTzDYgbQ3d3JKbM15HhPdFuLMmuzcUW5xG2", Balance.from_tao(int(amount)))
-    print(is_success, error_message)
\ No newline at end of file
+    outcome = proxy.add_stake(proxy_wallet, delegator, int(netuid), "5F5WLLEzDBXQDdTzDYgbQ3d3JKbM15HhPdFuLMmuzcUW5xG2", Balance.from_tao(int(amount)))
+    print(outcome.success, outcome)
\ No newline at end of file
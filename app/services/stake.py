@@ -1,9 +1,24 @@
-import bittensor as bt
-from typing import Dict, Tuple, Optional, Any
+import asyncio
+import numpy as np
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional, Any
 
 from app.core.config import settings
-from app.services.proxy import Proxy
-from app.services.wallets import wallets
+from app.services.wallets import unlock_wallets, unlocked, wallets
+
+# bittensor and everything built on it are imported by initialize() in the
+# background, so importing the app (and starting uvicorn) does not wait for them
+if TYPE_CHECKING:
+    import bittensor as bt
+
+
+# Seconds between attempts to connect the chain clients on startup
+CONNECT_RETRY_INTERVAL = 5.0
+
+
+# Added on top of the exact minimum tolerance when min tolerance staking is on
+MIN_TOLERANCE_MARGIN = 0.001
+
+QUOTE_SIDES = ("stake", "unstake")
 
 
 class StakeService:
@@ -11,21 +26,97 @@ class StakeService:
     Service class for handling stake-related business logic.
     Encapsulates all staking operations including min tolerance calculations,
     stake/unstake operations with retry mechanisms, and error handling.
+    All chain access is asyncio-native; run initialize() once on startup.
+    Construction is cheap: the chain clients only exist once initialize()
+    has connected them, and `ready` tells when that is.
     """
     
-    def __init__(self, wallets: Dict[str, Tuple[bt.Wallet, str]]):
+    def __init__(self, wallets: Dict[str, Tuple["bt.Wallet", str]]):
         """
-        Initialize the StakeService with wallets and proxy instance.
+        Initialize the StakeService with wallets. Call initialize() before use.
         
         Args:
-            wallets: Dictionary mapping wallet names to (wallet, delegator) tuples
-            proxy: Proxy instance for handling stake operations
+            wallets: Dictionary mapping wallet names to (wallet, delegator) tuples,
+                filled in by unlock_wallets()
         """
         self.wallets = wallets
-        self.proxy = Proxy(settings.NETWORK, use_era=settings.USE_ERA)
-        self.subtensor = bt.Subtensor(network=settings.NETWORK)
+        self.proxy = None
+        self.subtensor = None
+        self.balances = None
+        self.wallets_ready = False
+        self.chain_ready = False
+        self.chain_error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.wallets_ready and self.chain_ready
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Startup progress, for /health.
+        """
+        return {
+            "wallets": {
+                wallet_name: "unlocked" if unlocked.get(wallet_name) else ("failed" if wallet_name in unlocked else "pending")
+                for wallet_name in settings.WALLET_NAMES
+            },
+            "chain": "connected" if self.chain_ready else "connecting",
+            "chain_error": self.chain_error,
+            "block": self.proxy.subnets.block if self.chain_ready else None,
+        }
+
+    async def initialize(self):
+        """
+        Unlock the wallets and connect the chain clients, concurrently.
+        """
+        await asyncio.gather(self._unlock(), self._connect())
+
+    async def _unlock(self):
+        await asyncio.to_thread(unlock_wallets)
+        self.wallets_ready = True
+
+    async def _connect(self):
+        while True:
+            proxy = None
+            try:
+                # Importing bittensor and probing the RPC endpoints both block, so keep them off the loop
+                proxy = await asyncio.to_thread(self._build_proxy)
+                await proxy.initialize()
+                break
+            except Exception as e:
+                print(f"Error connecting to {settings.NETWORK}: {e}")
+                self.chain_error = str(e)
+                # The next attempt builds a fresh proxy, so release this one's connection
+                if proxy is not None:
+                    try:
+                        await proxy.close()
+                    except Exception as close_error:
+                        print(f"Error closing failed connection: {close_error}")
+                await asyncio.sleep(CONNECT_RETRY_INTERVAL)
+
+        from utils.balances import get_balance_cache
+
+        self.proxy = proxy
+        self.subtensor = proxy.subtensor
+        self.balances = get_balance_cache(settings.NETWORK)
+        self.chain_error = None
+        self.chain_ready = True
+
+    @staticmethod
+    def _build_proxy():
+        from app.services.async_proxy import AsyncProxy
+
+        return AsyncProxy(
+            settings.NETWORK,
+            use_era=settings.USE_ERA,
+            broadcast=settings.BROADCAST,
+        )
+
+    async def close(self):
+        if self.proxy is not None:
+            await self.proxy.close()
     
-    def get_stake_min_tolerance(self, tao_amount: float, netuid: int) -> float:
+    async def get_stake_min_tolerance(self, tao_amount: float, netuid: int) -> float:
         """
         Calculate the minimum tolerance for staking operations.
         
@@ -36,25 +127,100 @@ class StakeService:
         Returns:
             float: Minimum tolerance value
         """
-        subnet = self.subtensor.subnet(netuid=netuid)
-        if subnet is None:
-            raise ValueError(f"Subnet with netuid {netuid} does not exist")
-        min_tolerance = tao_amount / subnet.tao_in.tao
-        return min_tolerance
+        engine = await self.proxy.subnets.quotes_async()
+        quote = engine.stake(netuid, tao_amount)
+        return float(quote.min_tolerance)
 
 
-    def get_unstake_min_tolerance(self, tao_amount: float, netuid: int) -> float:
+    async def get_unstake_min_tolerance(self, tao_amount: float, netuid: int) -> float:
         """
         Calculate the minimum tolerance for unstaking operations.
+
+        Args:
+            tao_amount: Amount of alpha to unstake
+            netuid: Network/subnet ID
+
+        Returns:
+            float: Minimum tolerance value
+        """
+        engine = await self.proxy.subnets.quotes_async()
+        quote = engine.unstake(netuid, tao_amount)
+        return float(quote.min_tolerance)
+
+    async def get_balances(self, wallet_names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Free balance of each wallet's delegator, read together at the cached head block.
+
+        Args:
+            wallet_names: Wallets to read, defaults to every configured wallet
+
+        Returns:
+            Dict with the block read at and, per wallet, its delegator and free balance
+
+        Raises:
+            ValueError: If a wallet is unknown
         """
-        subnet = self.subtensor.subnet(netuid=netuid)
-        if subnet is None:
-            raise ValueError(f"Subnet with netuid {netuid} does not exist")
-        min_tolerance = tao_amount / (tao_amount + subnet.alpha_in.tao)
-        return min_tolerance
+        wallet_names = wallet_names or list(self.wallets)
+        unknown = [wallet_name for wallet_name in wallet_names if wallet_name not in self.wallets]
+        if unknown:
+            raise ValueError(f"Wallet(s) not found: {', '.join(unknown)}")
+        delegators = {wallet_name: self.wallets[wallet_name][1] for wallet_name in wallet_names}
+        balances = await self.balances.get_async(self.proxy.substrate, delegators.values())
+        return {
+            "block": self.balances.block,
+            "balances": {
+                wallet_name: {"delegator": delegator, "free": balances[delegator].tao}
+                for wallet_name, delegator in delegators.items()
+            },
+        }
+
+    async def quote(
+        self,
+        amounts: List[float],
+        netuids: Optional[List[int]] = None,
+        side: str = "both",
+    ) -> Dict[str, Any]:
+        """
+        Quote every (netuid, amount) pair from the per-block subnet cache.
+
+        Args:
+            amounts: Trade sizes, TAO for stake and alpha for unstake
+            netuids: Subnets to quote, defaults to every subnet
+            side: "stake", "unstake" or "both"
+
+        Returns:
+            Dict with the block quoted at and, per side and netuid, one row per
+            amount with the expected output, price impact and recommended tolerance
+
+        Raises:
+            ValueError: If a side or netuid is unknown
+        """
+        sides = QUOTE_SIDES if side == "both" else (side,)
+        if any(name not in QUOTE_SIDES for name in sides):
+            raise ValueError(f"Unknown side {side!r}, expected stake, unstake or both")
+
+        engine = await self.proxy.subnets.quotes_async()
+        netuids = engine.netuids.tolist() if not netuids else list(netuids)
+        # One row per netuid, one column per amount
+        grid = np.asarray(netuids)[:, None], np.asarray(amounts, dtype=float)[None, :]
+
+        quotes = {}
+        for name in sides:
+            quote = engine.stake(*grid) if name == "stake" else engine.unstake(*grid)
+            per_netuid = {netuid: [] for netuid in netuids}
+            for row in quote.rows():
+                row["recommended_tolerance"] = row["min_tolerance"] + MIN_TOLERANCE_MARGIN
+                per_netuid[row.pop("netuid")].append(row)
+            quotes[name] = per_netuid
+
+        return {
+            "block": engine.block,
+            "fee": engine.fee,
+            "quotes": quotes,
+        }
 
     
-    def stake(
+    async def stake(
         self,
         tao_amount: float,
         netuid: int,
@@ -62,7 +228,10 @@ class StakeService:
         dest_hotkey: str = settings.DEFAULT_DEST_HOTKEY,
         rate_tolerance: float = settings.DEFAULT_RATE_TOLERANCE,
         min_tolerance_staking: bool = settings.DEFAULT_MIN_TOLERANCE,
-        retries: int = settings.DEFAULT_RETRIES
+        retries: int = settings.DEFAULT_RETRIES,
+        mode: str = "single",
+        max_impact: float = settings.TWAP_MAX_IMPACT,
+        max_drift: float = settings.TWAP_MAX_DRIFT,
     ) -> Dict[str, Any]:
         """
         Execute staking operation with retry mechanism and error handling.
@@ -75,32 +244,53 @@ class StakeService:
             rate_tolerance: Tolerance for rate calculations
             min_tolerance_staking: Whether to use minimum tolerance
             retries: Number of retry attempts
+            mode: "single" for one trade, "twap" to split it across blocks
+            max_impact: Price impact allowed per child order in twap mode
+            max_drift: Price rise after which a twap order stops
             
         Returns:
             Dict containing success status, result, and min_tolerance
         """ 
+        if mode == "twap":
+            return await self.twap_stake(
+                tao_amount=tao_amount,
+                netuid=netuid,
+                wallet_name=wallet_name,
+                dest_hotkey=dest_hotkey,
+                max_impact=max_impact,
+                max_drift=max_drift,
+                max_failures=retries,
+            )
+        if mode != "single":
+            return {
+                "success": False,
+                "error": f"Unknown mode {mode!r}, expected single or twap"
+            }
+
         wallet, delegator = self.wallets[wallet_name]
         
         # Adjust rate tolerance if using minimum tolerance staking
         if min_tolerance_staking:
             # Calculate minimum tolerance
-            subnet = self.subtensor.subnet(netuid=netuid)
-            if subnet is None:
+            try:
+                min_tolerance = await self.get_stake_min_tolerance(tao_amount, netuid)
+            except ValueError as e:
                 return {
                     "success": False,
-                    "error": f"Subnet with netuid {netuid} does not exist"
+                    "error": str(e)
                 }
-            min_tolerance = tao_amount / subnet.tao_in.tao
-    
-            rate_tolerance = min_tolerance + 0.001
+            rate_tolerance = min_tolerance + MIN_TOLERANCE_MARGIN
         
+        import bittensor as bt
+
         # Execute staking with retry mechanism
         success = False
         msg = None
+        outcome = None
 
         for _ in range(retries):
             try:
-                result, msg = self.proxy.add_stake(
+                outcome = await self.proxy.add_stake(
                     amount=bt.Balance.from_tao(tao_amount),
                     proxy_wallet=wallet,
                     delegator=delegator,
@@ -108,8 +298,8 @@ class StakeService:
                     hotkey=dest_hotkey,
                     tolerance=rate_tolerance,
                 )
-                
-                if result:
+                msg = outcome.error
+                if outcome.success:
                     success = True
                     break
             except Exception as e:
@@ -119,10 +309,65 @@ class StakeService:
         # This should never be reached, but required for type checking
         return {
             "success": success,
-            "error": msg
+            "error": msg,
+            "outcome": outcome.as_dict() if success else None,
         }
     
-    def unstake(
+    async def twap_stake(
+        self,
+        tao_amount: float,
+        netuid: int,
+        wallet_name: str,
+        dest_hotkey: str = settings.DEFAULT_DEST_HOTKEY,
+        max_impact: float = settings.TWAP_MAX_IMPACT,
+        max_drift: float = settings.TWAP_MAX_DRIFT,
+        max_failures: int = settings.DEFAULT_RETRIES,
+    ) -> Dict[str, Any]:
+        """
+        Stake in block-spaced child orders sized from the current pool depth.
+
+        Each child waits for the previous one's inclusion, is sized so its own
+        price impact stays within max_impact and is priced from a fresh
+        snapshot. See utils.twap.TwapOrder for when the order stops.
+
+        Returns:
+            Dict with the cumulative fills, average price and every child's outcome
+        """
+        import bittensor as bt
+        from utils.receipts import TradeOutcome
+        from utils.snapshot import take_snapshot_async
+        from utils.twap import TwapOrder
+
+        wallet, delegator = self.wallets[wallet_name]
+        order = TwapOrder(
+            netuid,
+            bt.Balance.from_tao(tao_amount),
+            max_impact=max_impact,
+            max_drift=max_drift,
+            tolerance_margin=MIN_TOLERANCE_MARGIN,
+            max_failures=max(max_failures, 1),
+        )
+        while not order.done:
+            snapshot = await take_snapshot_async(self.proxy.substrate, delegator, netuids=[netuid])
+            child = order.next_child(snapshot.pool(netuid))
+            if child is None:
+                break
+            try:
+                outcome = await self.proxy.add_stake(
+                    amount=child,
+                    proxy_wallet=wallet,
+                    delegator=delegator,
+                    netuid=netuid,
+                    hotkey=dest_hotkey,
+                    tolerance=order.tolerance,
+                )
+            except Exception as e:
+                outcome = TradeOutcome(False, error=str(e))
+            order.record(child, outcome)
+        print(order)
+        return order.as_dict()
+
+    async def unstake(
         self,
         netuid: int,
         wallet_name: str,
@@ -147,12 +392,14 @@ class StakeService:
         Returns:
             Dict containing success status, result, and min_tolerance
         """ 
+        import bittensor as bt
+
         wallet, delegator = self.wallets[wallet_name]
         
         # Determine amount to unstake
         if amount is None:
             # Unstake all available balance
-            amount_balance = self.subtensor.get_stake(
+            amount_balance = await self.subtensor.get_stake(
                 coldkey_ss58=delegator,
                 hotkey_ss58=dest_hotkey,
                 netuid=netuid
@@ -169,23 +416,24 @@ class StakeService:
         
         # Adjust rate tolerance if using minimum tolerance unstaking
         if min_tolerance_unstaking:
-            subnet = self.subtensor.subnet(netuid=netuid)
-            if subnet is None:
+            # Calculate minimum tolerance for unstaking
+            try:
+                min_tolerance = await self.get_unstake_min_tolerance(amount_balance.tao, netuid)
+            except ValueError as e:
                 return {
                     "success": False,
-                    "error": f"Subnet with netuid {netuid} does not exist"
+                    "error": str(e)
                 }
-            # Calculate minimum tolerance for unstaking
-            min_tolerance = amount_balance.tao / (amount_balance.tao + subnet.alpha_in.tao)
-            rate_tolerance = min_tolerance + 0.001
+            rate_tolerance = min_tolerance + MIN_TOLERANCE_MARGIN
         
         # Execute unstaking with retry mechanism
         success = False
         msg = None
+        outcome = None
 
         for _ in range(retries):
             try:
-                result, msg = self.proxy.remove_stake(
+                outcome = await self.proxy.remove_stake(
                     netuid=netuid,
                     proxy_wallet=wallet,
                     delegator=delegator,
@@ -193,7 +441,8 @@ class StakeService:
                     hotkey=dest_hotkey,
                     tolerance=rate_tolerance,
                 )
-                if result:
+                msg = outcome.error
+                if outcome.success:
                     success = True
                     break     
             except Exception as e:
@@ -203,11 +452,12 @@ class StakeService:
         # This should never be reached, but required for type checking
         return {
             "success": success,
-            "error": msg
+            "error": msg,
+            "outcome": outcome.as_dict() if success else None,
         }
 
 
-    def move_stake(
+    async def move_stake(
         self,
         wallet_name: str,
         origin_netuid: int, 
@@ -220,10 +470,12 @@ class StakeService:
         """
         Execute move stake operation with retry mechanism and error handling.
         """
+        import bittensor as bt
+
         wallet, delegator = self.wallets[wallet_name]
 
         if amount is None:
-            amount_balance = self.subtensor.get_stake(
+            amount_balance = await self.subtensor.get_stake(
                 coldkey_ss58=delegator,
                 hotkey_ss58=origin_hotkey,
                 netuid=origin_netuid
@@ -235,10 +487,11 @@ class StakeService:
         # Execute move stake with retry mechanism
         success = False
         msg = None
+        outcome = None
 
         for _ in range(retries):
             try:
-                result, msg = self.proxy.move_stake(
+                outcome = await self.proxy.move_stake(
                     amount=amount_balance,
                     proxy_wallet=wallet,
                     delegator=delegator,
@@ -247,7 +500,8 @@ class StakeService:
                     origin_netuid=origin_netuid,
                     destination_netuid=destination_netuid,
                 )
-                if result:
+                msg = outcome.error
+                if outcome.success:
                     success = True
                     break
             except Exception as e:
@@ -257,7 +511,47 @@ class StakeService:
         # This should never be reached, but required for type checking
         return {
             "success": success,
-            "error": msg
+            "error": msg,
+            "outcome": outcome.as_dict() if success else None,
+        }
+
+    async def batch(
+        self,
+        wallet_name: str,
+        operations: List[Dict[str, Any]],
+        mode: str = "all",
+    ) -> Dict[str, Any]:
+        """
+        Execute several add/remove/move operations in one proxied Utility batch.
+
+        Batches are not retried: a force_batch may have partly succeeded.
+
+        Args:
+            wallet_name: Name of the wallet to use
+            operations: Operations as accepted by utils.batch.parse_operations
+            mode: "all" for batch_all (all or nothing) or "force" for force_batch
+
+        Returns:
+            Dict containing success status, first error and per-operation results
+
+        Raises:
+            ValueError: If an operation is malformed or out of range
+        """
+        from utils.batch import parse_operations
+
+        wallet, delegator = self.wallets[wallet_name]
+        ops = parse_operations(
+            operations,
+            default_hotkey=settings.DEFAULT_DEST_HOTKEY,
+            default_tolerance=settings.DEFAULT_RATE_TOLERANCE,
+        )
+
+        success, results = await self.proxy.batch(wallet, delegator, ops, mode)
+        errors = [result["error"] for result in results if result["error"]]
+        return {
+            "success": success,
+            "error": errors[0] if errors else None,
+            "results": [dict(result, op=op) for op, result in zip(ops, results)],
         }
 
 stake_service = StakeService(wallets)
\ No newline at end of file
@@ -1,23 +1,90 @@
-import bittensor as bt
-from typing import Dict, Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 from app.core.config import settings
 
-wallets: Dict[str, Tuple[bt.Wallet, str]] = {}
+if TYPE_CHECKING:
+    import bittensor as bt
 
+wallets: Dict[str, Tuple["bt.Wallet", str]] = {}
+
+# wallet name -> whether its coldkey was unlocked, once unlock_wallets() has tried it
+unlocked: Dict[str, bool] = {}
+
+
+def prompts_for_password(wallet: "bt.Wallet") -> bool:
+    """
+    Whether unlocking a wallet's coldkey would ask for its password on the terminal.
+
+    It does not when the keyfile is unencrypted or the password is in the
+    environment variable bittensor reads for that keyfile.
+    """
+    keyfile = wallet.coldkey_file
+    try:
+        return keyfile.is_encrypted() and not os.getenv(keyfile.env_var_name())
+    except Exception:
+        # Can't tell, so treat it as prompting and keep it off the parallel path
+        return True
+
+
+def unlock_wallet(wallet_name: str, retries: int = 3, wallet: Optional["bt.Wallet"] = None) -> bool:
+    """
+    Unlock one configured wallet's coldkey and register it in `wallets`.
+
+    Args:
+        wallet_name: Configured wallet name
+        retries: Attempts, i.e. how many times a mistyped password may be entered again
+        wallet: The wallet, if already opened
+
+    Returns:
+        Whether the coldkey was unlocked
+    """
+    import bittensor as bt
+
+    wallet = wallet or bt.Wallet(name=wallet_name)
+    print(f"Unlocking wallet {wallet_name}")
+    success = False
+    for _ in range(retries):
+        try:
+            wallet.unlock_coldkey()
+            success = True
+            break
+        except Exception as e:
+            print(f"Error unlocking wallet {wallet_name}: {e}")
+            continue
+    wallets[wallet_name] = (wallet, settings.DELEGATORS[settings.WALLET_NAMES.index(wallet_name)])
+    unlocked[wallet_name] = success
+    return success
+
+
+def unlock_wallets() -> Dict[str, bool]:
+    """
+    Unlock every configured wallet.
+
+    Coldkey decryption runs a deliberately slow key derivation, so wallets
+    that unlock without a prompt (password in the environment or an
+    unencrypted keyfile) are unlocked on one thread each. Their password
+    can't change between attempts, so each gets a single one. Wallets that
+    prompt are unlocked afterwards one at a time, so each prompt is answered
+    by the wallet it names.
+
+    Returns:
+        Dict of wallet name -> whether it was unlocked
+    """
+    import bittensor as bt
 
-def unlock_wallets():
     print(settings.WALLET_NAMES)
-    for wallet_name in settings.WALLET_NAMES:
-        wallet = bt.Wallet(name=wallet_name)
-        print(f"Unlocking wallet {wallet_name}")
-        retries = 3
-        for _ in range(retries):
-            try:
-                wallet.unlock_coldkey()
-                break
-            except Exception as e:
-                print(f"Error unlocking wallet {wallet_name}: {e}")
-                continue
-        wallets[wallet_name] = (wallet, settings.DELEGATORS[settings.WALLET_NAMES.index(wallet_name)])
-
-unlock_wallets()
\ No newline at end of file
+    opened = {wallet_name: bt.Wallet(name=wallet_name) for wallet_name in settings.WALLET_NAMES}
+    silent = [wallet_name for wallet_name, wallet in opened.items() if not prompts_for_password(wallet)]
+    results = {}
+    if silent:
+        with ThreadPoolExecutor(max_workers=len(silent)) as executor:
+            futures = {
+                wallet_name: executor.submit(unlock_wallet, wallet_name, 1, opened[wallet_name])
+                for wallet_name in silent
+            }
+        results = {wallet_name: future.result() for wallet_name, future in futures.items()}
+    for wallet_name, wallet in opened.items():
+        if wallet_name not in results:
+            results[wallet_name] = unlock_wallet(wallet_name, wallet=wallet)
+    return {wallet_name: results[wallet_name] for wallet_name in settings.WALLET_NAMES}
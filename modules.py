@@ -1,18 +1,25 @@
 import bittensor as bt
-from substrateinterface import SubstrateInterface
+from substrateinterface import ExtrinsicReceipt, SubstrateInterface
 from substrateinterface.exceptions import SubstrateRequestException
-from typing import Optional, cast
+from websocket import WebSocketException
+from typing import Dict, List, Optional, cast
 from bittensor.utils.balance import Balance, FixedPoint, fixed_to_float
 import threading
 import time
-
-RPC_ENDPOINTS = {
-    'test': 'wss://test.finney.opentensor.ai:443',
-    'finney': 'wss://entrypoint-finney.opentensor.ai:443',
-}
+from utils.amm import tolerance_error
+from utils.batch import BATCH_MODES, compose_batch_call, decode_batch_events, parse_operations
+from utils.broadcast import ExtrinsicBroadcaster, broadcast_endpoints
+from utils.nonce import nonce_manager
+from utils.receipts import TradeOutcome, parse_trade_outcome
+from utils.rpc import RPC_ENDPOINTS, create_substrate, create_subtensor, get_endpoints
+from utils.snapshot import take_snapshot
+from utils.twap import TwapOrder
+
+# Seconds to wait for a timed-out submit to stop once its socket is closed
+SUBMIT_CANCEL_TIMEOUT = 5.0
 
 class RonProxy:
-    def __init__(self, proxy_wallet: str, network: str, delegator: str):
+    def __init__(self, proxy_wallet: str, network: str, delegator: str, broadcast: bool = False):
         """
         Initialize the RonProxy object.
         
@@ -20,6 +27,7 @@ class RonProxy:
             proxy_wallet: Proxy wallet address
             network: Network name
             delegator: Delegator address
+            broadcast: Whether to push signed extrinsics to every broadcast endpoint at once
         """
         if network not in RPC_ENDPOINTS:
             raise ValueError(f"Invalid network: {network}")
@@ -27,15 +35,41 @@ class RonProxy:
         self.network = network
         self.delegator = delegator
         self.proxy_wallet = bt.Wallet(name=proxy_wallet)
-        self.subtensor = bt.Subtensor(network=network)
-        self.substrate = SubstrateInterface(
-            url=RPC_ENDPOINTS[self.network],
-            ss58_format=42,
-            type_registry_preset='substrate-node-template',
-        )
+        self.subtensor = create_subtensor(network)
+        self.substrate = create_substrate(network)
+        self.broadcaster = ExtrinsicBroadcaster(broadcast_endpoints(network)) if broadcast else None
 
+    def _submit(self, extrinsic):
+        """
+        Submit a signed extrinsic and wait for inclusion, broadcasting it if enabled.
+        """
+        if self.broadcaster is None:
+            return self.substrate.submit_extrinsic(
+                extrinsic,
+                wait_for_inclusion=True,
+                wait_for_finalization=False,
+            )
+        # Raises NotIncludedError if it was pushed but not seen in a block, so its nonce is resynced
+        receipt, report = self.broadcaster.submit(self.substrate, extrinsic)
+        print(f"Broadcast: included in block {report['block_number']}, acks (ms): {report['acks_ms']}")
+        if report['errors']:
+            print(f"Broadcast errors: {report['errors']}")
+        return receipt
 
-    def add_stake(self, netuid: int, hotkey: str, amount: Balance, tolerance: float = 0.01) -> None:
+    def _failover(self) -> None:
+        """
+        Drop the current node and reconnect to the best healthy one.
+        """
+        get_endpoints(self.network).report_failure(self.substrate.url)
+        try:
+            self.substrate.close()
+        except Exception:
+            pass
+        self.substrate = create_substrate(self.network)
+        self.subtensor = create_subtensor(self.network)
+
+
+    def add_stake(self, netuid: int, hotkey: str, amount: Balance, tolerance: float = 0.01) -> TradeOutcome:
         """
         Add stake to a subnet.
         
@@ -45,31 +79,22 @@ class RonProxy:
             amount: Amount to stake
             tolerance: Tolerance for stake amount
         """
-        free_balance = self.subtensor.get_balance(
-            address=self.delegator,
-        )
+        snapshot = take_snapshot(self.substrate, self.delegator, netuids=[netuid])
+        free_balance = snapshot.free_balance
         print("--------------------------------")
         print(f"Adding stake...")
         print(f"Tolerance set to: {tolerance}")
         print(f"Current free balance: {free_balance}")
         
-        subnet_info = self.subtensor.subnet(netuid)
-        if not subnet_info:
+        pool = snapshot.pool(netuid)
+        if not pool:
             print(f"Subnet with netuid {netuid} does not exist")
-            return
-        
-        if subnet_info.is_dynamic:
-            rate = 1 / subnet_info.price.tao or 1
-            _rate_with_tolerance = rate * (
-                1 + tolerance
-            )  # Rate only for display
-            rate_with_tolerance = f"{_rate_with_tolerance:.4f}"
-            price_with_tolerance = subnet_info.price.rao * (
-                1 + tolerance
-            )
-        else:
-            rate_with_tolerance = "1"
-            price_with_tolerance = Balance.from_rao(1)
+            return TradeOutcome(False, error=f"Subnet with netuid {netuid} does not exist")
+        error = tolerance_error(pool.quote(amount, buy=True), tolerance)
+        if error:
+            print(error)
+            return TradeOutcome(False, error=error)
+        price_with_tolerance = pool.limit_price(tolerance, buy=True)
         call = self.substrate.compose_call(
             call_module='SubtensorModule',
             call_function='add_stake_limit',
@@ -81,24 +106,13 @@ class RonProxy:
                 "allow_partial": False,
             }
         )
-        is_success, error_message = self._do_proxy_call(call, 'Staking')
-        if is_success:
-            new_free_balance = self.subtensor.get_balance(
-                address=self.delegator,
-            )
-            print(f"New free balance: {new_free_balance}")
-            print(f"Free balance: {free_balance}")
-            if new_free_balance.rao < free_balance.rao:
-                print(f"Stake added successfully, free balance changed from {free_balance.rao} to {new_free_balance.rao}")
-                return
-            else:
-                print(f"Stake added failed")
-        else:
-            print(f"Error: {error_message}")
+        outcome = self._do_trade_call(call)
+        print(outcome)
+        return outcome
 
 
     def remove_stake(self, netuid: int, hotkey: str, amount: Balance,
-                    all: bool = False, tolerance: float = 0.05) -> None:
+                    all: bool = False, tolerance: float = 0.05) -> TradeOutcome:
         """
         Remove stake from a subnet.
         
@@ -108,11 +122,8 @@ class RonProxy:
             amount: Amount to unstake (if not using --all)
             all: Whether to unstake all available balance
         """
-        balance = self.subtensor.get_stake(
-            coldkey_ss58=self.delegator,
-            hotkey_ss58=hotkey,
-            netuid=netuid,
-        )
+        snapshot = take_snapshot(self.substrate, self.delegator, positions=[(hotkey, netuid)])
+        balance = snapshot.stake(hotkey, netuid)
         print("--------------------------------")
         print(f"Removing stake...")
         print(f"Tolerance set to: {tolerance}")
@@ -123,46 +134,17 @@ class RonProxy:
             
         if amount.rao > balance.rao:
             print(f"Error: Amount to unstake is greater than current balance")
-            return
+            return TradeOutcome(False, error="Amount to unstake is greater than current balance")
         
-        subnet_info = self.subtensor.subnet(netuid)
-        if not subnet_info:
+        pool = snapshot.pool(netuid)
+        if not pool:
             print(f"Subnet with netuid {netuid} does not exist")
-            return
-        
-        if subnet_info.is_dynamic:
-            rate = subnet_info.price.tao or 1
-            rate_with_tolerance = rate * (
-                1 - tolerance
-            )  # Rate only for display
-            price_with_tolerance = subnet_info.price.rao * (
-                1 - tolerance
-            )  # Actual price to pass to extrinsic
-        else:
-            rate_with_tolerance = 1
-            price_with_tolerance = 1
-
-        free_balance = self.subtensor.get_balance(
-            address=self.delegator,
-        )
-        
-        subnet_info = self.subtensor.subnet(netuid)
-        if not subnet_info:
-            print(f"Subnet with netuid {netuid} does not exist")
-            return
-        
-        if subnet_info.is_dynamic:
-            rate = subnet_info.price.tao or 1
-            rate_with_tolerance = rate * (
-                1 - tolerance
-            )  # Rate only for display
-            price_with_tolerance = subnet_info.price.rao * (
-                1 - tolerance
-            )  # Actual price to pass to extrinsic
-        else:
-            rate_with_tolerance = 1
-            price_with_tolerance = 1
-            
+            return TradeOutcome(False, error=f"Subnet with netuid {netuid} does not exist")
+        error = tolerance_error(pool.quote(amount, buy=False), tolerance)
+        if error:
+            print(error)
+            return TradeOutcome(False, error=error)
+        price_with_tolerance = pool.limit_price(tolerance, buy=False)
         call = self.substrate.compose_call(
             call_module='SubtensorModule',
             call_function='remove_stake_limit',
@@ -174,18 +156,9 @@ class RonProxy:
                 "allow_partial": False,
             }
         )
-        is_success, error_message = self._do_proxy_call(call, 'Staking')
-        if is_success:
-            free_new_balance = self.subtensor.get_balance(
-                address=self.delegator,
-            )
-            if free_new_balance.rao > free_balance.rao:
-                print(f"Stake removed successfully, free balance changed from {free_balance.rao} to {free_new_balance.rao}")
-                return
-            else:
-                print(f"Stake removal failed")
-        else:
-            print(f"Error: {error_message}")
+        outcome = self._do_trade_call(call)
+        print(outcome)
+        return outcome
 
     def move_stake(self, origin_hotkey: str, dest_hotkey: str, origin_netuid: int, dest_netuid: int):
         """
@@ -197,11 +170,8 @@ class RonProxy:
             origin_netuid: Source subnet ID
             dest_netuid: Destination subnet ID
         """
-        balance = self.subtensor.get_stake(
-            coldkey_ss58=self.delegator,
-            hotkey_ss58=origin_hotkey,
-            netuid=origin_netuid,
-        )
+        snapshot = take_snapshot(self.substrate, self.delegator, positions=[(origin_hotkey, origin_netuid)])
+        balance = snapshot.stake(origin_hotkey, origin_netuid)
         print(f"Current alpha balance on netuid {origin_netuid}: {balance}")
         
         call = self.substrate.compose_call(
@@ -392,7 +362,56 @@ class RonProxy:
         else:
             print(f"Error: {error_message}")
 
+    def batch(self, operations: List[Dict], mode: str = "all") -> tuple[bool, List[Dict]]:
+        """
+        Run several add/remove/move operations in one proxied Utility batch extrinsic.
+
+        Args:
+            operations: Operations as accepted by utils.batch.parse_operations
+            mode: "all" for batch_all (all or nothing) or "force" for force_batch
+        """
+        ops = parse_operations(operations)
+        print("--------------------------------")
+        print(f"Batching {len(ops)} operations ({BATCH_MODES.get(mode, mode)})...")
+        call = compose_batch_call(self.substrate, self.delegator, ops, mode)
+        receipt, error_message = self._submit_proxy_call(call, 'Staking')
+        events = receipt.triggered_events if receipt is not None else []
+        success, results = decode_batch_events(events, len(ops), error_message)
+        for op, result in zip(ops, results):
+            status = "ok" if result["success"] else f"failed: {result['error']}"
+            print(f"  {op['op']} {op.get('netuid', op.get('origin_netuid'))}: {status}")
+        return success, results
+
+    def _do_trade_call(self, call) -> TradeOutcome:
+        """
+        Submit a proxied staking call and read its outcome from the receipt events.
+        """
+        receipt, error_message = self._submit_proxy_call(call, 'Staking')
+        if receipt is None:
+            return TradeOutcome(False, error=error_message)
+
+        extrinsic = receipt.get_extrinsic_identifier()
+        print(f"Extrinsic: {extrinsic}")
+        return parse_trade_outcome(receipt.triggered_events, extrinsic=extrinsic)
+
     def _do_proxy_call(self, call, proxy_type) -> tuple[bool, str]:
+        receipt, error_message = self._submit_proxy_call(call, proxy_type)
+        if receipt is None:
+            return False, error_message
+
+        print(f"Extrinsic: {receipt.get_extrinsic_identifier()}")
+
+        is_success = receipt.is_success
+        error_message = receipt.error_message
+        return is_success, error_message
+
+    def _submit_proxy_call(self, call, proxy_type) -> tuple[Optional[ExtrinsicReceipt], Optional[str]]:
+        """
+        Wrap a call in Proxy.proxy, sign it and submit it.
+
+        Returns:
+            Tuple of (receipt, None) on inclusion or (None, error message)
+        """
         proxy_call = self.substrate.compose_call(
             call_module='Proxy',
             call_function='proxy',
@@ -402,18 +421,18 @@ class RonProxy:
                 'call': call,
             }
         )
-        extrinsic = self.substrate.create_signed_extrinsic(
-            call=proxy_call,
-            keypair=self.proxy_wallet.coldkey,
-            era={"period": 1},
-        )
+        signer = self.proxy_wallet.coldkey.ss58_address
+        nonce = nonce_manager.acquire(self.substrate, signer)
         try:
-            receipt = self.substrate.submit_extrinsic(
-                extrinsic,
-                wait_for_inclusion=True,
-                wait_for_finalization=False,
+            extrinsic = self.substrate.create_signed_extrinsic(
+                call=proxy_call,
+                keypair=self.proxy_wallet.coldkey,
+                era={"period": 1},
+                nonce=nonce,
             )
+            receipt = self._submit(extrinsic)
         except SubstrateRequestException as e:
+            nonce_manager.release(signer, nonce, e)
             error_message = f"SubstrateRequestException: {e}"
             print(error_message)
             if "Custom error: 8" in str(e):
@@ -422,16 +441,22 @@ class RonProxy:
                     Transaction rejected because partial unstaking is disabled.
                     Either increase price tolerance or enable partial unstaking.
                 """
-            return False, error_message
-        
-        print(f"Extrinsic: {receipt.get_extrinsic_identifier()}")
-        
-        is_success = receipt.is_success
-        error_message = receipt.error_message
-        return is_success, error_message
+            return None, error_message
+        except (WebSocketException, OSError) as e:
+            nonce_manager.release(signer, nonce, e)
+            print(f"Connection to {self.substrate.url} failed: {e}")
+            self._failover()
+            return None, f"Connection error: {e}"
+        except Exception as e:
+            # Signing or broadcast failures must not leak the nonce either
+            nonce_manager.release(signer, nonce, e)
+            print(f"Proxy call failed: {e}")
+            return None, str(e)
+        nonce_manager.release(signer, nonce)
+        return receipt, None
     
 class LeoProxy:
-    def __init__(self, proxy_wallet: bt.Wallet, network: str, delegator: str):
+    def __init__(self, proxy_wallet: bt.Wallet, network: str, delegator: str, broadcast: bool = False):
         """
         Initialize the LeoProxy object.
         
@@ -439,6 +464,7 @@ class LeoProxy:
             proxy_wallet: Proxy wallet address
             network: Network name
             delegator: Delegator address
+            broadcast: Whether to push signed extrinsics to every broadcast endpoint at once
         """
         if network not in RPC_ENDPOINTS:
             raise ValueError(f"Invalid network: {network}")
@@ -446,14 +472,40 @@ class LeoProxy:
         self.network = network
         self.delegator = delegator
         self.proxy_wallet = proxy_wallet
-        self.subtensor = bt.Subtensor(network=network)
-        self.substrate = SubstrateInterface(
-            url=RPC_ENDPOINTS[self.network],
-            ss58_format=42,
-            type_registry_preset='substrate-node-template',
-        )
+        self.subtensor = create_subtensor(network)
+        self.substrate = create_substrate(network)
+        self.broadcaster = ExtrinsicBroadcaster(broadcast_endpoints(network)) if broadcast else None
 
-    def add_stake(self, netuid: int, hotkey: str, amount: Balance, tolerance: float = 0.01) -> None:
+    def _submit(self, extrinsic):
+        """
+        Submit a signed extrinsic and wait for inclusion, broadcasting it if enabled.
+        """
+        if self.broadcaster is None:
+            return self.substrate.submit_extrinsic(
+                extrinsic,
+                wait_for_inclusion=True,
+                wait_for_finalization=False,
+            )
+        # Raises NotIncludedError if it was pushed but not seen in a block, so its nonce is resynced
+        receipt, report = self.broadcaster.submit(self.substrate, extrinsic)
+        print(f"Broadcast: included in block {report['block_number']}, acks (ms): {report['acks_ms']}")
+        if report['errors']:
+            print(f"Broadcast errors: {report['errors']}")
+        return receipt
+
+    def _failover(self) -> None:
+        """
+        Drop the current node and reconnect to the best healthy one.
+        """
+        get_endpoints(self.network).report_failure(self.substrate.url)
+        try:
+            self.substrate.close()
+        except Exception:
+            pass
+        self.substrate = create_substrate(self.network)
+        self.subtensor = create_subtensor(self.network)
+
+    def add_stake(self, netuid: int, hotkey: str, amount: Balance, tolerance: float = 0.01) -> TradeOutcome:
         """
         Add stake to a subnet.
         
@@ -463,30 +515,22 @@ class LeoProxy:
             amount: Amount to stake
             tolerance: Tolerance for stake amount
         """
-        free_balance = self.subtensor.get_balance(
-            address=self.delegator,
-        )
+        snapshot = take_snapshot(self.substrate, self.delegator, netuids=[netuid])
+        free_balance = snapshot.free_balance
         print("--------------------------------")
         print(f"Adding stake...")
         print(f"Tolerance set to: {tolerance}")
         print(f"Current free balance: {free_balance}")
         
-        subnet_info = self.subtensor.subnet(netuid)
-        if not subnet_info:
+        pool = snapshot.pool(netuid)
+        if not pool:
             print(f"Subnet with netuid {netuid} does not exist")
-            return
-        if subnet_info.is_dynamic:
-            rate = 1 / subnet_info.price.tao or 1
-            _rate_with_tolerance = rate * (
-                1 + tolerance
-            )  # Rate only for display
-            rate_with_tolerance = f"{_rate_with_tolerance:.4f}"
-            price_with_tolerance = subnet_info.price.rao * (
-                1 + tolerance
-            )
-        else:
-            rate_with_tolerance = "1"
-            price_with_tolerance = Balance.from_rao(1)
+            return TradeOutcome(False, error=f"Subnet with netuid {netuid} does not exist")
+        error = tolerance_error(pool.quote(amount, buy=True), tolerance)
+        if error:
+            print(error)
+            return TradeOutcome(False, error=error)
+        price_with_tolerance = pool.limit_price(tolerance, buy=True)
         call = self.substrate.compose_call(
             call_module='SubtensorModule',
             call_function='add_stake_limit',
@@ -498,24 +542,39 @@ class LeoProxy:
                 "allow_partial": False,
             }
         )
-        is_success, error_message = self._do_proxy_call(call, 'Staking')
-        if is_success:
-            new_free_balance = self.subtensor.get_balance(
-                address=self.delegator,
-            )
-            print(f"New free balance: {new_free_balance}")
-            print(f"Free balance: {free_balance}")
-            if new_free_balance.rao < free_balance.rao:
-                print(f"Stake added successfully, free balance changed from {free_balance.rao} to {new_free_balance.rao}")
-                return
-            else:
-                print(f"Stake added failed")
-        else:
-            print(f"Error: {error_message}")
+        outcome = self._do_trade_call(call)
+        print(outcome)
+        return outcome
+
+    def twap_add_stake(self, netuid: int, hotkey: str, amount: Balance, max_impact: float = 0.002,
+                       max_drift: float = 0.02, max_children: int = 100) -> TwapOrder:
+        """
+        Add stake in block-spaced child orders sized from the pool depth.
+
+        Args:
+            netuid: Network/subnet ID
+            hotkey: Hotkey address
+            amount: Total amount to stake
+            max_impact: Price impact allowed for each child order
+            max_drift: Stop once the price has risen this much since the first child
+            max_children: Most child orders to send
+        """
+        order = TwapOrder(netuid, amount, max_impact=max_impact, max_drift=max_drift, max_children=max_children)
+        print("--------------------------------")
+        print(f"TWAP staking {amount} on SN{netuid}, max impact per child {max_impact:.2%}...")
+        while not order.done:
+            pool = take_snapshot(self.substrate, self.delegator, netuids=[netuid]).pool(netuid)
+            child = order.next_child(pool)
+            if child is None:
+                break
+            print(f"Child {len(order.children) + 1}: {child} of {order.remaining} remaining at price {pool.price}")
+            order.record(child, self.add_stake(netuid, hotkey, child, tolerance=order.tolerance))
+        print(order)
+        return order
 
 
     def remove_stake(self, netuid: int, hotkey: str, amount: Balance,
-                    all: bool = False, tolerance: float = 0.05) -> None:
+                    all: bool = False, tolerance: float = 0.05) -> TradeOutcome:
         """
         Remove stake from a subnet.
         
@@ -525,11 +584,8 @@ class LeoProxy:
             amount: Amount to unstake (if not using --all)
             all: Whether to unstake all available balance
         """
-        balance = self.subtensor.get_stake(
-            coldkey_ss58=self.delegator,
-            hotkey_ss58=hotkey,
-            netuid=netuid,
-        )
+        snapshot = take_snapshot(self.substrate, self.delegator, positions=[(hotkey, netuid)])
+        balance = snapshot.stake(hotkey, netuid)
         print("--------------------------------")
         print(f"Removing stake...")
         print(f"Tolerance set to: {tolerance}")
@@ -539,45 +595,16 @@ class LeoProxy:
             amount = balance
         if amount.rao > balance.rao:
             print(f"Error: Amount to unstake is greater than current balance")
-            return
-        subnet_info = self.subtensor.subnet(netuid)
-        if not subnet_info:
+            return TradeOutcome(False, error="Amount to unstake is greater than current balance")
+        pool = snapshot.pool(netuid)
+        if not pool:
             print(f"Subnet with netuid {netuid} does not exist")
-            return
-        
-        if subnet_info.is_dynamic:
-            rate = subnet_info.price.tao or 1
-            rate_with_tolerance = rate * (
-                1 - tolerance
-            )  # Rate only for display
-            price_with_tolerance = subnet_info.price.rao * (
-                1 - tolerance
-            )  # Actual price to pass to extrinsic
-        else:
-            rate_with_tolerance = 1
-            price_with_tolerance = 1
-
-        free_balance = self.subtensor.get_balance(
-            address=self.delegator,
-        )
-        
-        subnet_info = self.subtensor.subnet(netuid)
-        if not subnet_info:
-            print(f"Subnet with netuid {netuid} does not exist")
-            return
-        
-        if subnet_info.is_dynamic:
-            rate = subnet_info.price.tao or 1
-            rate_with_tolerance = rate * (
-                1 - tolerance
-            )  # Rate only for display
-            price_with_tolerance = subnet_info.price.rao * (
-                1 - tolerance
-            )  # Actual price to pass to extrinsic
-        else:
-            rate_with_tolerance = 1
-            price_with_tolerance = 1
-            
+            return TradeOutcome(False, error=f"Subnet with netuid {netuid} does not exist")
+        error = tolerance_error(pool.quote(amount, buy=False), tolerance)
+        if error:
+            print(error)
+            return TradeOutcome(False, error=error)
+        price_with_tolerance = pool.limit_price(tolerance, buy=False)
         call = self.substrate.compose_call(
             call_module='SubtensorModule',
             call_function='remove_stake_limit',
@@ -589,18 +616,9 @@ class LeoProxy:
                 "allow_partial": False,
             }
         )
-        is_success, error_message = self._do_proxy_call(call, 'Staking')
-        if is_success:
-            free_new_balance = self.subtensor.get_balance(
-                address=self.delegator,
-            )
-            if free_new_balance.rao > free_balance.rao:
-                print(f"Stake removed successfully, free balance changed from {free_balance.rao} to {free_new_balance.rao}")
-                return
-            else:
-                print(f"Stake removal failed")
-        else:
-            print(f"Error: {error_message}")
+        outcome = self._do_trade_call(call)
+        print(outcome)
+        return outcome
 
     def move_stake(self, origin_hotkey: str, dest_hotkey: str, origin_netuid: int, dest_netuid: int):
         """
@@ -612,11 +630,8 @@ class LeoProxy:
             origin_netuid: Source subnet ID
             dest_netuid: Destination subnet ID
         """
-        balance = self.subtensor.get_stake(
-            coldkey_ss58=self.delegator,
-            hotkey_ss58=origin_hotkey,
-            netuid=origin_netuid,
-        )
+        snapshot = take_snapshot(self.substrate, self.delegator, positions=[(origin_hotkey, origin_netuid)])
+        balance = snapshot.stake(origin_hotkey, origin_netuid)
         print(f"Current alpha balance on netuid {origin_netuid}: {balance}")
         
         call = self.substrate.compose_call(
@@ -768,7 +783,56 @@ class LeoProxy:
         else:
             print(f"Error: {error_message}")
 
+    def batch(self, operations: List[Dict], mode: str = "all") -> tuple[bool, List[Dict]]:
+        """
+        Run several add/remove/move operations in one proxied Utility batch extrinsic.
+
+        Args:
+            operations: Operations as accepted by utils.batch.parse_operations
+            mode: "all" for batch_all (all or nothing) or "force" for force_batch
+        """
+        ops = parse_operations(operations)
+        print("--------------------------------")
+        print(f"Batching {len(ops)} operations ({BATCH_MODES.get(mode, mode)})...")
+        call = compose_batch_call(self.substrate, self.delegator, ops, mode)
+        receipt, error_message = self._submit_proxy_call(call, 'Staking')
+        events = receipt.triggered_events if receipt is not None else []
+        success, results = decode_batch_events(events, len(ops), error_message)
+        for op, result in zip(ops, results):
+            status = "ok" if result["success"] else f"failed: {result['error']}"
+            print(f"  {op['op']} {op.get('netuid', op.get('origin_netuid'))}: {status}")
+        return success, results
+
+    def _do_trade_call(self, call, timeout: int = 12) -> TradeOutcome:
+        """
+        Submit a proxied staking call and read its outcome from the receipt events.
+        """
+        receipt, error_message = self._submit_proxy_call(call, 'Staking', timeout)
+        if receipt is None:
+            return TradeOutcome(False, error=error_message)
+
+        extrinsic = receipt.get_extrinsic_identifier()
+        print(f"Extrinsic: {extrinsic}")
+        return parse_trade_outcome(receipt.triggered_events, extrinsic=extrinsic)
+
     def _do_proxy_call(self, call, proxy_type, timeout: int = 12) -> tuple[bool, str]:
+        receipt, error_message = self._submit_proxy_call(call, proxy_type, timeout)
+        if receipt is None:
+            return False, error_message
+
+        print(f"Extrinsic: {receipt.get_extrinsic_identifier()}")
+
+        is_success = receipt.is_success
+        error_message = receipt.error_message
+        return is_success, error_message
+
+    def _submit_proxy_call(self, call, proxy_type, timeout: int = 12) -> tuple[Optional[ExtrinsicReceipt], Optional[str]]:
+        """
+        Wrap a call in Proxy.proxy, sign it and submit it.
+
+        Returns:
+            Tuple of (receipt, None) on inclusion or (None, error message)
+        """
         proxy_call = self.substrate.compose_call(
             call_module='Proxy',
             call_function='proxy',
@@ -778,26 +842,29 @@ class LeoProxy:
                 'call': call,
             }
         )
-        print("proxy_call_step1")
-        extrinsic = self.substrate.create_signed_extrinsic(
-            call=proxy_call,
-            keypair=self.proxy_wallet.coldkey,
-            era={"period": 1},
-        )
-        print("proxy_call_step2")
-        
+        signer = self.proxy_wallet.coldkey.ss58_address
+        nonce = nonce_manager.acquire(self.substrate, signer)
+        try:
+            extrinsic = self.substrate.create_signed_extrinsic(
+                call=proxy_call,
+                keypair=self.proxy_wallet.coldkey,
+                era={"period": 1},
+                nonce=nonce,
+            )
+        except Exception as e:
+            nonce_manager.release(signer, nonce, e)
+            raise
+
         receipt = [None]
         exception = [None]
         
         def submit_with_timeout():
             try:
-                receipt[0] = self.substrate.submit_extrinsic(
-                    extrinsic,
-                    wait_for_inclusion=True,
-                    wait_for_finalization=False,
-                )
+                receipt[0] = self._submit(extrinsic)
             except Exception as e:
                 exception[0] = e
+            finally:
+                nonce_manager.release(signer, nonce, exception[0])
         
         thread = threading.Thread(target=submit_with_timeout, daemon=True)
         thread.start()
@@ -805,10 +872,26 @@ class LeoProxy:
         
         if thread.is_alive():
             print(f"Timeout: submit_extrinsic exceeded {timeout} seconds")
-            return False, f"Timeout: Transaction submission took longer than {timeout} seconds"
+            # A node that cannot include us within a block is treated as stalled. Closing its
+            # socket cancels the stuck submit; the thread must release its nonce before we fail
+            # over, or the release could resync the nonce after a send on the new node
+            try:
+                self.substrate.close()
+            except Exception:
+                pass
+            thread.join(timeout=SUBMIT_CANCEL_TIMEOUT)
+            if thread.is_alive():
+                print(f"Submit on {self.substrate.url} did not stop; resyncing the nonce after failover")
+                nonce_manager.reset(signer)
+            self._failover()
+            return None, f"Timeout: Transaction submission took longer than {timeout} seconds"
         
         if exception[0] is not None:
             e = exception[0]
+            if isinstance(e, (WebSocketException, OSError)):
+                print(f"Connection to {self.substrate.url} failed: {e}")
+                self._failover()
+                return None, f"Connection error: {e}"
             print(f"SubstrateRequestException: {e}")
             if isinstance(e, SubstrateRequestException) and "Custom error: 8" in str(e):
                 error_message = f"""
@@ -816,15 +899,10 @@ class LeoProxy:
                     Transaction rejected because partial unstaking is disabled.
                     Either increase price tolerance or enable partial unstaking.
                 """
-            return False, "SubstrateRequestException Error occurred"
+            return None, "SubstrateRequestException Error occurred"
         
         if receipt[0] is None:
-            return False, "No receipt received from transaction"
-        
-        print(f"Extrinsic: {receipt[0].get_extrinsic_identifier()}")
-        
-        is_success = receipt[0].is_success
-        error_message = receipt[0].error_message
-        return is_success, error_message
+            return None, "No receipt received from transaction"
+        return receipt[0], None
     
     
\ No newline at end of file
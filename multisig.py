@@ -8,11 +8,7 @@ from bittensor.utils.balance import Balance
 from dotenv import load_dotenv
 import os
 import sys
-
-RPC_ENDPOINTS = {
-    'test': 'wss://test.finney.opentensor.ai:443',
-    'finney': 'wss://entrypoint-finney.opentensor.ai:443',
-}
+from utils.rpc import RPC_ENDPOINTS, create_substrate, create_subtensor
 
 class MultisigProposal:
     def __init__(self, network: str, multisig_address: str, proxy_wallet: str, approver_address: str):
@@ -31,12 +27,8 @@ class MultisigProposal:
         self.multisig_address = multisig_address
         self.proxy_wallet = bt.Wallet(name=proxy_wallet)
         self.approver_address = approver_address
-        self.substrate = SubstrateInterface(
-            url=RPC_ENDPOINTS[self.network],
-            ss58_format=42,
-            type_registry_preset='substrate-node-template',
-        )
-        self.subtensor = bt.Subtensor(network=network)
+        self.substrate = create_substrate(network)
+        self.subtensor = create_subtensor(network)
 
     def create_transfer_proposal(self, destination: str, amount: Balance) -> None:
         """
@@ -4,6 +4,8 @@ Proxy script for blockchain staking operations.
 """
 
 import argparse
+import json
+import os
 import sys
 from modules import RonProxy
 from bittensor.utils.balance import Balance
@@ -72,6 +74,12 @@ def create_parser() -> argparse.ArgumentParser:
     transfer_stake_parser.add_argument('--amount', type=float, default=0, help='Amount to transfer')
     transfer_stake_parser.add_argument('--all', action='store_true', help='Swap all available balance')
     transfer_stake_parser.add_argument('--name', type=str, default=".env", help='Specify the environment')
+
+    # Batch command
+    batch_parser = subparsers.add_parser('batch', help='Run several stake operations in one extrinsic')
+    batch_parser.add_argument('--ops-file', type=str, required=True, help='JSON file with a list of add/remove/move operations')
+    batch_parser.add_argument('--mode', type=str, choices=['all', 'force'], default='all', help='all: batch_all (all or nothing), force: force_batch')
+    batch_parser.add_argument('--name', type=str, default=".env", help='Specify the environment')
     
     return parser
 
@@ -123,6 +131,11 @@ def validate_args(args: argparse.Namespace) -> bool:
         if not args.hotkey:
             print("Error: Must specify --hotkey")
             return False
+
+    elif args.command == 'batch':
+        if not os.path.exists(args.ops_file):
+            print(f"Error: Operations file {args.ops_file} does not exist")
+            return False
     
     return True
 
@@ -192,6 +205,7 @@ def main():
         proxy_wallet=proxy_wallet,
         network=network,
         delegator=delegator,
+        broadcast=os.getenv('BROADCAST', 'false').lower() == 'true',
     )
     print(f"Initialized RonProxy object for {network} network")
     
@@ -244,6 +258,11 @@ def main():
                 amount=Balance.from_tao(args.amount),
                 all=args.all,
             )
+        elif args.command == 'batch':
+            with open(args.ops_file) as f:
+                operations = json.load(f)
+            success, _ = ron_proxy.batch(operations, mode=args.mode)
+            print("Batch succeeded" if success else "Batch failed")
     
     except Exception as e:
         print(f"Error: {e}")
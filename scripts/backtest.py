@@ -0,0 +1,53 @@
+import sys
+import os
+
+# Add the parent directory to the Python search path (sys.path)
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+import argparse
+import json
+
+from utils.backtest import sweep
+
+
+def parse_list(value, cast=float):
+    return [cast(item) for item in value.split(",") if item.strip()]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Backtest the leo threshold strategy over recorded price history")
+    parser.add_argument("--history", default=os.getenv("PRICE_HISTORY", "price_history"), help="PriceHistory directory")
+    parser.add_argument("--netuids", required=True, help="Comma-separated netuids")
+    parser.add_argument("--thresholds", required=True, help="Comma-separated price thresholds in TAO")
+    parser.add_argument("--tolerances", default="0.005", help="Comma-separated rate tolerances")
+    parser.add_argument("--amounts", default="1", help="Comma-separated stake amounts in TAO")
+    parser.add_argument("--start", type=int, help="First block (default: first recorded)")
+    parser.add_argument("--end", type=int, help="Last block (default: last recorded)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--top", type=int, default=20, help="Number of results to print")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = sweep(
+        args.history,
+        netuids=parse_list(args.netuids, int),
+        thresholds=parse_list(args.thresholds),
+        tolerances=parse_list(args.tolerances),
+        amounts=parse_list(args.amounts),
+        start=args.start,
+        end=args.end,
+        workers=args.workers,
+    )
+
+    if args.json:
+        print(json.dumps(results[:args.top], indent=2))
+    else:
+        print(f"{'SN':>4} {'threshold':>10} {'tolerance':>9} {'amount':>8} {'PnL':>10} {'return':>8} {'trades':>6} {'failed':>6} {'slippage':>8}")
+        for result in results[:args.top]:
+            print(
+                f"{result['netuid']:>4} {result['threshold']:>10.5f} {result['tolerance']:>9.4f} {result['amount']:>8.2f} "
+                f"{result['pnl']:>+10.4f} {result['return_pct']:>+7.2f}% {result['trades']:>6} {result['failed']:>6} "
+                f"{result['mean_slippage']:>8.4%}"
+            )
@@ -1,16 +1,28 @@
-import bittensor as bt
+import sys
 import os
+
+# Add the parent directory to the Python search path (sys.path)
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+import bittensor as bt
 import requests
 import json
 import time
 import threading
 import requests
+from utils.backfill import Backfill
+from utils.event_store import EventStore, block_timestamp
+from utils.labels import get_label_index
+from utils.rpc import create_subtensor
+from utils.subnet_cache import get_subnet_cache
 
 
 WEBHOOK_URL = "https://discord.com/api/webhooks/1396875737952292936/Bggfi9QEHVljmOxaqzJniLwQ70oCjnlj0lb7nIBq4avsVya_dkGNfjOKaGlOt_urwdul"
 WEBHOOK_URL_OWN = "https://canary.discord.com/api/webhooks/1410255303689375856/Rkt1TkqmxV3tV_82xFNz_SRP7O0RVBVPaOuZM4JXveyLYypFKqi05EeSCKc4m1a9gJh0"
-NETWORK = "finney"
-#NETWORK = "ws://34.30.248.57:9944"
+NETWORK = "finney"  # private nodes are added with RPC_ENDPOINTS_FINNEY
+EVENT_STORE = os.getenv("EVENT_STORE", "events.db")
 
 class DiscordBot:
     def __init__(self):
@@ -49,26 +61,21 @@ class DiscordBot:
 
 class ColdkeySwapFetcher:
     def __init__(self):
-        self.subtensor = bt.Subtensor(NETWORK)
-        self.subtensor_finney = bt.Subtensor("finney")
+        self.subtensor = create_subtensor(NETWORK)
+        self.subtensor_finney = create_subtensor("finney")
+        self.subnets = get_subnet_cache(NETWORK)
+        self.backfill = Backfill(NETWORK)
+        self.store = EventStore(EVENT_STORE)
 
         self.last_checked_block = self.subtensor.get_current_block()
         self.discord_bot = DiscordBot()
         self.subnet_names = []
-  
-    def fetch_extrinsic_data(self, block_number):
-        """Extract ColdkeySwapScheduled events from the data"""
-        coldkey_swaps = []
-        identity_changes = []
-        print(f"Fetching events from chain")
-        block_hash = self.subtensor.substrate.get_block_hash(block_id=block_number)
-        extrinsics = self.subtensor.substrate.get_extrinsics(block_hash=block_hash)
-        subnet_infos = self.subtensor.all_subnets()
-        owner_coldkeys = [subnet_info.owner_coldkey for subnet_info in subnet_infos]
-        subnet_names = [subnet_info.subnet_name for subnet_info in subnet_infos]
-        print(f"Fetched {len(extrinsics)} events from chain and {len(subnet_infos)} subnets")
+        self.labels = get_label_index(NETWORK)
 
-        for ex in extrinsics:
+    def find_coldkey_swaps(self, block):
+        """Extract schedule_swap_coldkey calls by subnet owners from a block's extrinsics"""
+        coldkey_swaps = []
+        for ex in block.extrinsics:
             call = ex.value.get('call', {})
             if (
                 call.get('call_module') == 'SubtensorModule' and
@@ -78,20 +85,25 @@ class ColdkeySwapFetcher:
                 args = call.get('call_args', [])
                 new_coldkey = next((a['value'] for a in args if a['name'] == 'new_coldkey'), None)
                 from_coldkey = ex.value.get('address', None)
-                print(f"Swap scheduled: from {from_coldkey} to {new_coldkey}")
+                print(f"Swap scheduled in block {block.number}: from {from_coldkey} to {new_coldkey}")
                 
-                try:
-                    subnet_id = owner_coldkeys.index(from_coldkey)
-                    swap_info = {
-                        'old_coldkey': from_coldkey,
-                        'new_coldkey': new_coldkey,
-                        'subnet': subnet_id,
-                    }
-                    
-                    coldkey_swaps.append(swap_info)
-                except ValueError:
+                subnet_id = self.labels.owner_netuid(from_coldkey)
+                if subnet_id is None:
                     print(f"From coldkey {from_coldkey} not found in owner coldkeys")
-                
+                    continue
+                coldkey_swaps.append({
+                    'old_coldkey': from_coldkey,
+                    'new_coldkey': new_coldkey,
+                    'subnet': subnet_id,
+                })
+        return coldkey_swaps
+
+    def find_identity_changes(self):
+        """Compare subnet names with the previous round"""
+        identity_changes = []
+        subnet_infos = self.subnets.all_subnets()
+        subnet_names = [subnet_info.subnet_name for subnet_info in subnet_infos]
+
         subnet_count = len(self.subnet_names)
         for i in range(subnet_count):
             if subnet_names[i] != self.subnet_names[i]:
@@ -103,50 +115,59 @@ class ColdkeySwapFetcher:
                 identity_changes.append(identity_change_info)
 
         self.subnet_names = subnet_names
-        return coldkey_swaps, identity_changes
+        return identity_changes
+
+    def report(self, coldkey_swaps, identity_changes):
+        try:
+            with open("coldkey_swaps.log", "a") as f:
+                for swap in coldkey_swaps:
+                    f.write(f"{swap}\n")
+        except Exception as e:
+            print(f"Error writing to file: {e}")
+
+        try:
+            with open("identity_changes.log", "a") as f:
+                for change in identity_changes:
+                    f.write(f"{change}\n")
+        except Exception as e:
+            print(f"Error writing to file: {e}")
+
+        try:
+            message = self.format_message(coldkey_swaps, identity_changes)
+            self.discord_bot.send_message_to_my_own(message)
+            threading.Timer(60.0, lambda: self.discord_bot.send_message(message)).start()
+        except Exception as e:
+            print(f"Error sending message: {e}")
  
     def run(self):
         while True:
-            current_block = self.subtensor.get_current_block()
-            print(f"Current block: {current_block}")
-            if current_block < self.last_checked_block:
-                time.sleep(2)
-                continue
-
-            print(f"Fetching coldkey swaps for block {self.last_checked_block}")
-            while True:
-                try:
-                    coldkey_swaps, identity_changes = self.fetch_extrinsic_data(self.last_checked_block)
-                    if len(coldkey_swaps) > 0 or len(identity_changes) > 0:
-                        try:
-                            with open("coldkey_swaps.log", "a") as f:
-                                for swap in coldkey_swaps:
-                                    f.write(f"{swap}\n")
-                        except Exception as e:
-                            print(f"Error writing to file: {e}")
-        
-                        try:
-                            with open("identity_changes.log", "a") as f:
-                                for change in identity_changes:
-                                    f.write(f"{change}\n")
-                        except Exception as e:
-                            print(f"Error writing to file: {e}")
-
-                        try:
-                            message = self.format_message(coldkey_swaps, identity_changes)
-                            self.discord_bot.send_message_to_my_own(message)
-                            threading.Timer(60.0, lambda: self.discord_bot.send_message(message)).start()
-                        except Exception as e:
-                            print(f"Error sending message: {e}")
-                    else:
-                        print("No coldkey swaps found")
-                    
-                    self.last_checked_block += 1
-                    break
-
-                except Exception as e:
-                    print(f"Error fetching coldkey swaps: {e}")
-                    time.sleep(1)
+            try:
+                current_block = self.subtensor.get_current_block()
+                print(f"Current block: {current_block}")
+                if current_block < self.last_checked_block:
+                    time.sleep(2)
+                    continue
+
+                # Subnet state is only current at the head, so it is read once per round
+                identity_changes = self.find_identity_changes()
+                self.labels.refresh_owners()
+                print(f"Fetching coldkey swaps for blocks {self.last_checked_block} to {current_block}")
+                if len(identity_changes) > 0:
+                    self.report([], identity_changes)
+
+                for block in self.backfill.blocks(self.last_checked_block, current_block):
+                    coldkey_swaps = self.find_coldkey_swaps(block)
+                    self.store.add_block(block)
+                    if len(coldkey_swaps) > 0:
+                        self.store.add_coldkey_swaps(block.number, coldkey_swaps, block_timestamp(block))
+                        self.report(coldkey_swaps, [])
+                    self.last_checked_block = block.number + 1
+                self.store.flush()
+
+            except Exception as e:
+                print(f"Error fetching coldkey swaps: {e}")
+                time.sleep(1)
+                self.subtensor = create_subtensor(NETWORK)
 
 
     def format_message(self, coldkey_swaps, identity_changes):
@@ -13,8 +13,10 @@ from typing import List
 from app.constants import ROUND_TABLE_HOTKEY, NETWORK
 from app.core.config import settings
 from app.services.proxy import Proxy
+from utils.block_follower import BlockFollower
 from utils.logger import logger
 from utils.index import get_sn_price, convert_alpha_to_float
+from utils.strategy import STAKE, UNSTAKE, ThresholdStrategy
 
 if __name__ == '__main__':
     
@@ -25,7 +27,7 @@ if __name__ == '__main__':
     
     subtensor = bt.Subtensor(network=NETWORK)
     netuid = int(input("Enter the netuid: "))
-    sn_price = get_sn_price(subtensor, netuid)
+    sn_price = get_sn_price(subtensor, netuid, NETWORK)
     logger.info(f"Subnet price for netuid {netuid}: {sn_price} TAO per alpha")
 
     user_stake_amount = float(input("Enter the stake amount: "))
@@ -33,24 +35,22 @@ if __name__ == '__main__':
     tolerance = float(input("Enter the tolerance: "))
 
     try:
-        sn_price = get_sn_price(subtensor, netuid)
-        user_unstake_price = sn_price + threshold
-        user_stake_price = sn_price - threshold
+        sn_price = get_sn_price(subtensor, netuid, NETWORK)
+        strategy = ThresholdStrategy(netuid, user_stake_amount, tolerance, threshold=threshold)
 
         confirm = input(f"Already staked? If so this script will starts with unstaking functionality. (y/n): ")
         if confirm.lower() == 'y':
-            staked = True
-            user_unstake_price = float(input("Enter the unstake price: "))
-        else:
-            user_stake_price = sn_price - threshold
-            staked = False
+            strategy.staked = True
+            strategy.unstake_price = float(input("Enter the unstake price: "))
+        strategy.start(sn_price)
 
-        while True:
+        for block in BlockFollower(NETWORK, with_events=False):
             try:
-                sn_price = get_sn_price(subtensor, netuid)
-                print(f"SN{netuid} price: {sn_price}, stake_price: {user_stake_price}, unstake_price: {user_unstake_price}, stake_amount: {user_stake_amount}, staked: {staked}")
+                sn_price = get_sn_price(subtensor, netuid, NETWORK)
+                print(f"SN{netuid} price: {sn_price}, {strategy}")
                 
-                if staked and sn_price > user_unstake_price:
+                action = strategy.decide(sn_price)
+                if action == UNSTAKE:
                     amount = subtensor.get_stake(
                         coldkey_ss58=wallet.coldkeypub.ss58_address,
                         hotkey_ss58=dest_hotkey,
@@ -70,10 +70,8 @@ if __name__ == '__main__':
                     if not result:
                         raise Exception("Unstake failed")
                     print("Unstaked successfully")
-                    staked = False
-                    sn_price = get_sn_price(subtensor, netuid)
-                    user_stake_price = sn_price - threshold    
-                elif not staked and sn_price < user_stake_price:
+                    strategy.filled(UNSTAKE, get_sn_price(subtensor, netuid, NETWORK))
+                elif action == STAKE:
                     result = subtensor.add_stake(
                         netuid=netuid,
                         amount= bt.Balance.from_tao(user_stake_amount, netuid),
@@ -87,10 +85,7 @@ if __name__ == '__main__':
                         raise Exception("Stake failed")
 
                     print("Staked successfully")
-                    staked = True
-                    sn_price = get_sn_price(subtensor, netuid)
-                    user_unstake_price = sn_price + threshold
-                subtensor.wait_for_block()
+                    strategy.filled(STAKE, get_sn_price(subtensor, netuid, NETWORK))
                 
             except Exception as e:
                 logger.error(f"Error: {e}")
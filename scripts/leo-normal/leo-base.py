@@ -13,8 +13,10 @@ from typing import List
 from app.constants import ROUND_TABLE_HOTKEY, NETWORK
 from app.core.config import settings
 from app.services.proxy import Proxy
+from utils.block_follower import BlockFollower
 from utils.logger import logger
 from utils.index import get_sn_price
+from utils.strategy import STAKE, UNSTAKE, ThresholdStrategy
 
 if __name__ == '__main__':
     
@@ -24,7 +26,7 @@ if __name__ == '__main__':
     
     subtensor = bt.Subtensor(network=NETWORK)
     netuid = int(input("Enter the netuid: "))
-    sn_price = get_sn_price(subtensor, netuid)
+    sn_price = get_sn_price(subtensor, netuid, NETWORK)
     logger.info(f"Subnet price for netuid {netuid}: {sn_price} TAO per alpha")
 
     user_stake_amount = float(input("Enter the stake amount: "))
@@ -33,13 +35,16 @@ if __name__ == '__main__':
     dest_hotkey = ROUND_TABLE_HOTKEY
     tolerance = float(input("Enter the tolerance: "))
 
-    staked = False
+    strategy = ThresholdStrategy(
+        netuid, user_stake_amount, tolerance, stake_price=user_stake_price, unstake_price=user_unstake_price,
+    )
     try:
-        while True:
+        for block in BlockFollower(NETWORK, with_events=False):
             try:
-                sn_price = get_sn_price(subtensor, netuid)
+                sn_price = get_sn_price(subtensor, netuid, NETWORK)
                 print(f"Current subnet price: {sn_price}, stake_price: {user_stake_price}, unstake_price: {user_unstake_price}, stake_amount: {user_stake_amount}")
-                if staked and sn_price > user_unstake_price:
+                action = strategy.decide(sn_price)
+                if action == UNSTAKE:
                     amount = subtensor.get_stake(
                         coldkey_ss58=wallet.coldkeypub.ss58_address,
                         hotkey_ss58=dest_hotkey,
@@ -57,9 +62,9 @@ if __name__ == '__main__':
                     if not result:
                         raise Exception("Unstake failed")
 
-                    staked = False
+                    strategy.filled(UNSTAKE, sn_price)
                     logger.info(f"Unstaked from netuid {netuid} at price {sn_price}")
-                elif not staked and sn_price < user_stake_price:
+                elif action == STAKE:
                     result = subtensor.add_stake(
                         netuid=netuid,
                         amount= bt.Balance.from_tao(user_stake_amount, netuid),
@@ -72,9 +77,8 @@ if __name__ == '__main__':
                     if not result:
                         raise Exception("Stake failed")
 
-                    staked = True
+                    strategy.filled(STAKE, sn_price)
                     logger.info(f"Staked to netuid {netuid} at price {sn_price}")
-                subtensor.wait_for_block()
             except Exception as e:
                 logger.error(f"Error: {e}")
                 continue
@@ -13,8 +13,10 @@ from typing import List
 from app.constants import ROUND_TABLE_HOTKEY, NETWORK
 from app.core.config import settings
 from app.services.proxy import Proxy
+from utils.block_follower import BlockFollower
 from utils.logger import logger
-from utils.index import get_sn_price, extract_stake_events_from_data
+from utils.events import decode_stake_events
+from utils.index import get_sn_price
 
 if __name__ == '__main__':
     
@@ -29,13 +31,9 @@ if __name__ == '__main__':
     threshold = float(input("Enter the threshold: "))
     tolerance = float(input("Enter the tolerance: "))
 
-    while True:
+    for block in BlockFollower(NETWORK):
         try:
-            block_number = subtensor.get_current_block()
-            block_hash = subtensor.substrate.get_block_hash(block_id=block_number)
-            events = subtensor.substrate.get_events(block_hash=block_hash)
-
-            stake_events = extract_stake_events_from_data(subtensor, events)
+            stake_events = decode_stake_events(block.events)
             
             if staked and sn_price > user_unstake_price:
                 result = subtensor.unstake(
@@ -51,7 +49,7 @@ if __name__ == '__main__':
                     raise Exception("Unstake failed")
                 print("Unstaked successfully")
                 staked = False
-                sn_price = get_sn_price(subtensor, netuid)
+                sn_price = get_sn_price(subtensor, netuid, NETWORK)
                 user_stake_price = sn_price - threshold    
             elif not staked and sn_price < user_stake_price:
                 result = subtensor.add_stake(
@@ -68,10 +66,9 @@ if __name__ == '__main__':
 
                 print("Staked successfully")
                 staked = True
-                sn_price = get_sn_price(subtensor, netuid)
+                sn_price = get_sn_price(subtensor, netuid, NETWORK)
                 user_unstake_price = sn_price + threshold
-            subtensor.wait_for_block()
-            sn_price = get_sn_price(subtensor, netuid)
+            sn_price = get_sn_price(subtensor, netuid, NETWORK)
             print(f"SN{netuid} price: {sn_price}, stake_price: {user_stake_price}, unstake_price: {user_unstake_price}, stake_amount: {user_stake_amount}, staked: {staked}")
             
         except Exception as e:
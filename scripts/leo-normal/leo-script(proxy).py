@@ -47,7 +47,7 @@ if __name__ == '__main__':
         if input().lower() == 'y':
             while True:
                 try:
-                    success, msg = proxy.remove_stake(
+                    outcome = proxy.remove_stake(
                         proxy_wallet=wallet,
                         delegator=delegator,
                         netuid=netuid,
@@ -55,7 +55,7 @@ if __name__ == '__main__':
                         amount=amount_balance,
                         tolerance=tolerance,
                     )
-                    if success:
+                    if outcome.success:
                         break
                 except Exception as e:
                     logger.error(f"Error: {e}")
@@ -13,8 +13,10 @@ from typing import List
 from app.constants import ROUND_TABLE_HOTKEY, NETWORK
 from app.core.config import settings
 from app.services.proxy import Proxy
+from utils.block_follower import BlockFollower
 from utils.logger import logger
 from utils.index import get_sn_price, convert_alpha_to_float
+from utils.strategy import STAKE, UNSTAKE, ThresholdStrategy
 from modules import LeoProxy
 from bittensor.utils.balance import Balance
 
@@ -33,24 +35,23 @@ if __name__ == '__main__':
     user_stake_amount = float(input("Enter the stake amount: "))
     threshold = float(input("Enter the threshold: "))
     tolerance = float(input("Enter the tolerance: "))
-    repeat_cnt = int(input("Enter the number of repeats: "))
+    repeat_cnt = int(input("Enter the number of repeats (0 or less to run forever): "))
     
     delegator = '5ESwpyuGxBmkXuQ1J8DqtmhFZQEDzLWKVup9xai567JRhvDN'
 
     try:
         sn_price = get_sn_price(subtensor, netuid)
-        user_unstake_price = sn_price + threshold
-        user_stake_price = sn_price - threshold
+        strategy = ThresholdStrategy(netuid, user_stake_amount, tolerance, threshold=threshold, repeat=repeat_cnt if repeat_cnt > 0 else None)
 
         confirm = input(f"Already staked? If so this script will starts with unstaking functionality. (y/n): ")
         if confirm.lower() == 'y':
-            staked = True
-            user_unstake_price = float(input("Enter the unstake price: "))
-        else:
-            user_stake_price = sn_price - threshold
-            staked = False
+            strategy.staked = True
+            strategy.unstake_price = float(input("Enter the unstake price: "))
+        strategy.start(sn_price)
 
-        while repeat_cnt != 0:
+        for block in BlockFollower(NETWORK, with_events=False):
+            if strategy.done:
+                break
             try:
                 leo_proxy = LeoProxy(
                     proxy_wallet=wallet,
@@ -58,37 +59,35 @@ if __name__ == '__main__':
                     delegator=delegator,
                 )
                 sn_price = get_sn_price(subtensor, netuid)
-                print(f"SN{netuid} price: {sn_price}, stake_price: {user_stake_price}, unstake_price: {user_unstake_price}, stake_amount: {user_stake_amount}, staked: {staked}")
+                print(f"SN{netuid} price: {sn_price}, {strategy}")
                 
-                if staked and sn_price > user_unstake_price:
-                    leo_proxy.remove_stake(
+                action = strategy.decide(sn_price)
+                if action == UNSTAKE:
+                    outcome = leo_proxy.remove_stake(
                         netuid=netuid,
                         hotkey=dest_hotkey,
                         amount=Balance.from_tao(0, netuid=netuid),
                         tolerance=tolerance,
                         all=True,
                     )
+                    if not outcome.success:
+                        raise Exception(f"Unstake failed: {outcome.error}")
                     print("Unstaked successfully")
-                    staked = False
-                    repeat_cnt -= 1
-                    sn_price = get_sn_price(subtensor, netuid)
-                    user_stake_price = sn_price - threshold    
-                elif not staked and sn_price < user_stake_price:
-                    leo_proxy.add_stake(
+                    strategy.filled(UNSTAKE, get_sn_price(subtensor, netuid))
+                elif action == STAKE:
+                    outcome = leo_proxy.add_stake(
                         netuid=netuid,
                         hotkey=dest_hotkey,
                         amount=Balance.from_tao(user_stake_amount),
                         tolerance=tolerance,
                     )
+                    if not outcome.success:
+                        raise Exception(f"Stake failed: {outcome.error}")
                     print("Staked successfully")
-                    staked = True
-                    sn_price = get_sn_price(subtensor, netuid)
-                    user_unstake_price = sn_price + threshold
-                subtensor.wait_for_block()
+                    strategy.filled(STAKE, get_sn_price(subtensor, netuid))
                 
             except Exception as e:
                 logger.error(f"Error: {e}")
-                subtensor.wait_for_block()
                 continue
     except KeyboardInterrupt:
         print("\nExiting...")
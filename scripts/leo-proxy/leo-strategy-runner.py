@@ -0,0 +1,45 @@
+import sys
+import os
+
+# Add the parent directory to the Python search path (sys.path)
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+import bittensor as bt
+
+from app.constants import ROUND_TABLE_HOTKEY, NETWORK
+from modules import LeoProxy
+from utils.logger import logger
+from utils.strategy_runner import StrategyRunner, load_config
+
+if __name__ == '__main__':
+    config_path = sys.argv[1] if len(sys.argv) > 1 else "strategies.json"
+    network, slots = load_config(config_path, default_hotkey=ROUND_TABLE_HOTKEY)
+    network = network or NETWORK
+
+    # Each wallet is unlocked once, however many strategies trade through it
+    wallets = {}
+    for wallet_name in dict.fromkeys(slot.wallet for slot in slots):
+        wallet = bt.Wallet(name=wallet_name)
+        wallet.unlock_coldkey()
+        wallets[wallet_name] = wallet
+
+    runner = StrategyRunner(
+        network,
+        slots,
+        proxy_factory=lambda wallet_name, delegator: LeoProxy(
+            proxy_wallet=wallets[wallet_name],
+            network=network,
+            delegator=delegator,
+        ),
+    )
+    for slot in slots:
+        logger.info(f"Loaded {slot}")
+
+    try:
+        runner.run()
+    except KeyboardInterrupt:
+        print("\nExiting...")
+    except Exception as e:
+        logger.error(f"Error: {e}")
@@ -71,7 +71,7 @@ if __name__ == '__main__':
                 logger.info(f"Current price {alpha_price} TAO is below threshold {threshold} TAO. Skipping...")
                 continue
             
-            success, msg = proxy.remove_stake(
+            outcome = proxy.remove_stake(
                 proxy_wallet=wallet,
                 delegator=delegator,
                 netuid=netuid,
@@ -79,7 +79,7 @@ if __name__ == '__main__':
                 amount=amount_balance,
                 tolerance=tolerance,
             )
-            if success:
+            if outcome.success:
                 break
         except KeyboardInterrupt:
             print("\nExiting...")
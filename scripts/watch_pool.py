@@ -1,22 +1,43 @@
+import sys
+import os
+
+# Add the parent directory to the Python search path (sys.path)
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
 import bittensor as bt
+import numpy as np
+from app.constants import NETWORK
+from utils.block_follower import BlockFollower
+from utils.price_history import PriceHistory
+from utils.rpc import create_subtensor
+
+# One recorder per directory: PriceHistory locks it, so running watch_pool.py and
+# watch_price.py together needs a different PRICE_HISTORY for each
+PRICE_HISTORY = os.getenv("PRICE_HISTORY", "price_history")
 
 if __name__ == '__main__':
     threshold = int(input("Enter the threshold: "))
-    subtensor = bt.Subtensor(network="finney")
-    subnet_infos = subtensor.all_subnets()
-    prev_tao_in = [subnet_info.tao_in for subnet_info in subnet_infos]
-    while True:
+    subtensor = create_subtensor(NETWORK)
+    history = PriceHistory(PRICE_HISTORY)
+    follower = BlockFollower(NETWORK, with_events=False)
+    for block in follower:
         try:
-            now_subnet_infos = subtensor.all_subnets()
-            now_tao_in = [subnet_info.tao_in for subnet_info in now_subnet_infos]
-            tao_flow = [float(now_tao_in[i] - prev_tao_in[i]) for i in range(len(now_tao_in))]
-            for i in range(len(tao_flow)):
-                if abs(tao_flow[i]) >= threshold:
-                    print(f"SN {i:2d} => {round(float(now_subnet_infos[i].price), 5):>8.5f}, {round(tao_flow[i], 2):>8.2f}")
+            now_subnet_infos = subtensor.all_subnets(block=block.number)
+            history.append(block.number, now_subnet_infos)
+            history.flush()
+            # Flows against the previous block, read back from the recorded history
+            tao_in = history.window("tao_in", block.number - 1, block.number)
+            recorded = history.recorded(block.number - 1, block.number)
+            if len(tao_in) < 2 or not recorded.all():
+                continue
+            tao_flow = tao_in[1] - tao_in[0]
+            for i in np.flatnonzero(np.abs(tao_flow) >= threshold):
+                print(f"SN {i:2d} => {history.window('price', block.number, block.number, i)[0]:>8.5f}, {tao_flow[i]:>8.2f}")
 
             print("***")
-            prev_tao_in = now_tao_in
-            subtensor.wait_for_block()
         except Exception as e:
             print(f"Error in watching_price: {e}")
+            subtensor = create_subtensor(NETWORK)
             continue
@@ -9,27 +9,36 @@ if parent_dir not in sys.path:
 import bittensor as bt
 from app.constants import NETWORK
 from utils.logger import logger
+from utils.block_follower import BlockFollower
+from utils.price_history import PriceHistory
+from utils.rpc import create_subtensor
+
+# One recorder per directory: PriceHistory locks it, so running watch_pool.py and
+# watch_price.py together needs a different PRICE_HISTORY for each
+PRICE_HISTORY = os.getenv("PRICE_HISTORY", "price_history")
 
 if __name__ == '__main__':
     netuid = int(input("Enter the netuid: "))
-    subtensor = bt.Subtensor(network=NETWORK)
-    prev_tao_in = 0
-    while True:
+    subtensor = create_subtensor(NETWORK)
+    history = PriceHistory(PRICE_HISTORY)
+    for block in BlockFollower(NETWORK, with_events=False):
         try:
-            subnet = subtensor.subnet(netuid=netuid)
-            if subnet is None:
+            subnet_infos = subtensor.all_subnets(block=block.number)
+            history.append(block.number, subnet_infos)
+            history.flush()
+            if not any(subnet_info.netuid == netuid for subnet_info in subnet_infos):
                 logger.error(f"Subnet is None for netuid: {netuid}")
                 continue
-            
-            price = subnet.alpha_to_tao(1)
-            now_tao_in = subnet.tao_in
-            if now_tao_in is None:
-                logger.error(f"Now tao in is None for netuid: {netuid}")
+
+            # Flow against the previous block, read back from the recorded history
+            price = history.window("price", block.number, block.number, netuid)[0]
+            tao_in = history.window("tao_in", block.number - 1, block.number, netuid)
+            if len(tao_in) < 2 or not history.recorded(block.number - 1, block.number).all():
+                logger.info(f"Block {block.number} netuid: {netuid} ===> price: {price}")
                 continue
-            tao_flow = now_tao_in - prev_tao_in
-            logger.info(f"Netuid: {netuid} ===> price: {price}, tao_flow: {tao_flow}")
-            prev_tao_in = now_tao_in
-            subtensor.wait_for_block()
+            tao_flow = tao_in[1] - tao_in[0]
+            logger.info(f"Block {block.number} netuid: {netuid} ===> price: {price}, tao_flow: {tao_flow}")
         except Exception as e:
             logger.error(f"Error in watching_price: {e}")
-            continue
\ No newline at end of file
+            subtensor = create_subtensor(NETWORK)
+            continue
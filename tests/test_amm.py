@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from utils.amm import RAO_PER_TAO, QuoteEngine, ladder, limit_prices, tolerance_error
+
+
+@pytest.fixture
+def engine():
+    # SN1: 1000 TAO / 4000 alpha (price 0.25), SN2: 50 TAO / 10 alpha (price 5), SN0 stable
+    return QuoteEngine(
+        netuids=[0, 1, 2],
+        tao_in=[0.0, 1000.0, 50.0],
+        alpha_in=[0.0, 4000.0, 10.0],
+        is_dynamic=[False, True, True],
+        fee=0.0005,
+    )
+
+
+def test_spot_price(engine):
+    assert engine.spot_price([0, 1, 2]).tolist() == [1.0, 0.25, 5.0]
+
+
+def test_stake_is_constant_product(engine):
+    quote = engine.stake(1, 10.0)
+    net = 10.0 * (1 - engine.fee)
+    assert quote.amount_out == pytest.approx(4000 * net / (1000 + net))
+    assert (1000 + net) * (4000 - quote.amount_out) == pytest.approx(1000 * 4000)
+    assert quote.price_impact > 0
+
+
+def test_unstake_undoes_stake_less_fees(engine):
+    alpha = float(engine.stake(1, 10.0).amount_out)
+    # Swap back against the pool as it is after the stake
+    after = QuoteEngine([1], [1000 + 10.0 * (1 - engine.fee)], [4000 - alpha], [True], fee=engine.fee)
+    tao = float(after.unstake(1, alpha).amount_out)
+    # Both legs pay the fee, and nothing else is lost
+    assert 10.0 * (1 - engine.fee) ** 2 <= tao < 10.0 * (1 - engine.fee)
+
+
+def test_stable_subnet_has_no_impact(engine):
+    quote = engine.stake(0, 5.0)
+    assert quote.amount_out == 5.0
+    assert quote.min_tolerance == 0.0
+    assert engine.max_amount(0, 0.01, buy=True) == np.inf
+
+
+def test_quotes_broadcast_over_netuids_and_amounts(engine):
+    quote = engine.stake(np.array([1, 2])[:, None], [1.0, 2.0, 4.0])
+    assert quote.amount_out.shape == (2, 3)
+    assert len(quote.rows()) == 6
+    # Bigger trades cost more impact
+    assert (np.diff(quote.price_impact, axis=1) > 0).all()
+
+
+@pytest.mark.parametrize("buy", [True, False])
+def test_max_amount_inverts_min_tolerance(engine, buy):
+    amounts = engine.max_amount([1, 2], 0.01, buy=buy)
+    quote = engine.stake([1, 2], amounts) if buy else engine.unstake([1, 2], amounts)
+    assert quote.min_tolerance == pytest.approx([0.01, 0.01])
+
+
+def test_limit_price_round_trip(engine):
+    buy = engine.limit_price([1, 2], 0.01, buy=True)
+    sell = engine.limit_price([1, 2], 0.01, buy=False)
+    assert buy.tolist() == [int(0.25 * 1.01 * RAO_PER_TAO), int(5 * 1.01 * RAO_PER_TAO)]
+    assert sell.tolist() == [int(0.25 * 0.99 * RAO_PER_TAO), int(5 * 0.99 * RAO_PER_TAO)]
+    assert engine.limit_price(0, 0.01, buy=True) == 1
+    assert limit_prices(np.nan, 0.5, buy=False) == 1
+
+
+def test_quote_limit_price_fills_at_min_tolerance(engine):
+    quote = engine.stake(1, 10.0)
+    limit = quote.limit_price / RAO_PER_TAO
+    # Pool price after the stake, which the limit price must allow
+    net = 10.0 * (1 - engine.fee)
+    assert limit == pytest.approx((1000 + net) / (4000 - quote.amount_out), rel=1e-8)
+
+
+def test_tolerance_error(engine):
+    quote = engine.stake(1, 10.0)
+    assert tolerance_error(quote, float(quote.min_tolerance) * 2) is None
+    assert "below" in tolerance_error(quote, float(quote.min_tolerance) / 2)
+
+
+def test_unknown_netuid(engine):
+    with pytest.raises(ValueError, match="netuid 7"):
+        engine.stake([1, 7], 1.0)
+
+
+def test_ladder():
+    sizes = ladder(8.0, 4)
+    assert sizes.tolist() == pytest.approx([1.0, 2.0, 4.0, 8.0])
+    assert ladder(10.0, 3, 0.1).tolist() == pytest.approx([0.1, 1.0, 10.0])
+    with pytest.raises(ValueError):
+        ladder(0, 3)
+    with pytest.raises(ValueError):
+        ladder(1.0, 3, 2.0)
@@ -0,0 +1,85 @@
+import pytest
+
+pytest.importorskip("fastapi")
+
+from bcrypt import gensalt, hashpw
+from fastapi import HTTPException, Request, Response
+from fastapi.security import HTTPBasicCredentials
+
+from app.core.config import settings
+from app.services import auth
+
+
+PASSWORD = "correct horse"
+
+
+@pytest.fixture(autouse=True)
+def admin(monkeypatch):
+    # Cheapest bcrypt cost, so the tests stay fast
+    monkeypatch.setitem(auth.USERS, "admin", hashpw(PASSWORD.encode(), gensalt(rounds=4)))
+
+
+def request(headers=None, cookie=None) -> Request:
+    raw = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    if cookie is not None:
+        raw.append((b"cookie", f"{auth.SESSION_COOKIE}={cookie}".encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_issued_token_verifies():
+    token, expires = auth.issue_token("admin")
+    assert token.startswith(f"admin:{expires}:")
+    assert auth.verify_token(token) == "admin"
+
+
+def test_forged_tokens_are_rejected():
+    token, expires = auth.issue_token("admin")
+    signature = token.rsplit(":", 1)[1]
+    # A longer expiry under the original signature
+    assert auth.verify_token(f"admin:{expires + 3600}:{signature}") is None
+    assert auth.verify_token(token[:-1] + ("0" if token[-1] != "0" else "1")) is None
+    assert auth.verify_token("admin") is None
+    assert auth.verify_token("") is None
+    assert auth.verify_token(f"admin:{expires}:\u00e9") is None
+
+
+def test_token_for_unknown_user_is_rejected():
+    payload = "mallory:9999999999"
+    assert auth.verify_token(f"{payload}:{auth._sign(payload)}") is None
+
+
+def test_expired_token_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_TTL", -1)
+    token, _ = auth.issue_token("admin")
+    assert auth.verify_token(token) is None
+
+
+def test_token_from_another_key_is_rejected(monkeypatch):
+    token, _ = auth.issue_token("admin")
+    monkeypatch.setattr(settings, "SESSION_SECRET", "another key")
+    assert auth.verify_token(token) is None
+
+
+def test_check_password():
+    assert auth.check_password(HTTPBasicCredentials(username="admin", password=PASSWORD)) == "admin"
+    with pytest.raises(HTTPException) as error:
+        auth.check_password(HTTPBasicCredentials(username="admin", password="wrong"))
+    assert error.value.status_code == 401
+
+
+def test_session_cookie():
+    response = Response()
+    token, _ = auth.set_session_cookie(response, "admin")
+    cookie = response.headers["set-cookie"]
+    assert f"{auth.SESSION_COOKIE}={token}" in cookie
+    assert "HttpOnly" in cookie
+
+
+def test_current_username_from_bearer_cookie_or_basic():
+    token, _ = auth.issue_token("admin")
+    assert auth.get_current_username(request({"Authorization": f"Bearer {token}"}), None) == "admin"
+    assert auth.get_current_username(request(cookie=token), None) == "admin"
+    basic = HTTPBasicCredentials(username="admin", password=PASSWORD)
+    assert auth.get_current_username(request({"Authorization": "Bearer forged"}), basic) == "admin"
+    with pytest.raises(HTTPException):
+        auth.get_current_username(request({"Authorization": "Bearer forged"}), None)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from utils.backtest import backtest, sweep
+from utils.price_history import PriceHistory
+from utils.strategy import ThresholdStrategy
+
+
+ALPHA_IN = 100_000.0
+
+
+def reserves(prices):
+    """
+    (blocks, tao_in, alpha_in) of a deep pool quoted at the given prices; 0 marks an unrecorded block.
+    """
+    prices = np.asarray(prices, dtype=float)
+    alpha_in = np.where(prices > 0, ALPHA_IN, 0.0)
+    return np.arange(1000, 1000 + len(prices)), prices * ALPHA_IN, alpha_in
+
+
+def test_round_trip_profits_from_the_swing():
+    strategy = ThresholdStrategy(1, 1.0, 0.01, threshold=0.1)
+    result = backtest(strategy, *reserves([1.0, 0.95, 0.85, 0.9, 1.0, 1.1, 1.0]), fee=0.0005)
+    assert [fill["action"] for fill in result.fills] == ["stake", "unstake"]
+    # Re-anchored 0.1 above the fill, the unstake level is about 0.95
+    assert [fill["block"] for fill in result.fills] == [1002, 1004]
+    assert result.round_trips == 1
+    assert result.alpha == 0.0
+    assert result.pnl == pytest.approx(1.0 / 0.85 - 1.0, rel=0.01)
+    assert strategy.stake_price == pytest.approx(0.9, rel=0.01)
+
+
+def test_open_position_is_valued_at_the_last_block():
+    strategy = ThresholdStrategy(1, 1.0, 0.01, threshold=0.1)
+    result = backtest(strategy, *reserves([1.0, 0.8, 0.9]), fee=0.0)
+    assert result.trades == 1
+    assert result.exit_value == pytest.approx(result.alpha * 0.9, rel=1e-4)
+    assert result.pnl == pytest.approx(0.9 / 0.8 - 1.0, rel=1e-3)
+
+
+def test_unrecorded_blocks_never_trigger():
+    strategy = ThresholdStrategy(1, 1.0, 0.01, threshold=0.1)
+    result = backtest(strategy, *reserves([1.0, 0.0, 0.0, 1.0]))
+    assert result.trades == 0
+
+
+def test_tolerance_below_the_impact_fails():
+    # Staking a tenth of the pool moves the price far more than 0.1%
+    strategy = ThresholdStrategy(1, ALPHA_IN / 10, 0.001, threshold=0.1)
+    result = backtest(strategy, *reserves([1.0, 0.8, 0.8]))
+    assert result.trades == 0
+    assert result.failed == 2
+
+
+def test_sweep_over_a_recorded_history(tmp_path):
+    history = PriceHistory(str(tmp_path / "history"), width=4)
+    for block, price in enumerate([1.0, 0.85, 1.0, 1.1], start=1000):
+        history.append(block, [type("Info", (), dict(
+            netuid=1, price=price, tao_in=price * ALPHA_IN, alpha_in=ALPHA_IN, alpha_out=ALPHA_IN,
+        ))])
+    history.close()
+
+    results = sweep(str(tmp_path / "history"), [1], [0.05, 0.5], [0.01], [1.0], workers=1)
+    assert [result["threshold"] for result in results] == [0.05, 0.5]
+    assert results[0]["round_trips"] == 1 and results[0]["pnl"] > 0
+    assert results[1]["trades"] == 0
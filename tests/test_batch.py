@@ -0,0 +1,88 @@
+import pytest
+
+pytest.importorskip("bittensor.utils.balance")
+
+from utils.batch import decode_batch_events, parse_operations, stake_needed
+
+
+HOTKEY = "5CsiGTsNBAn1bNiGNEd5LYpo6bm3PXT5ogPrQmvpZaUb2XzZ"
+
+
+def event(module_id: str, event_id: str, attributes=None) -> dict:
+    return {"event": {"module_id": module_id, "event_id": event_id, "attributes": attributes or {}}}
+
+
+def staked(netuid: int) -> dict:
+    return event("SubtensorModule", "StakeAdded", ("coldkey", HOTKEY, 1_000_000_000, 4_000_000_000, netuid))
+
+
+COMPLETED = event("Utility", "ItemCompleted")
+FAILED = event("Utility", "ItemFailed", {"error": {"Module": {"index": 7, "error": "0x01000000"}}})
+EXECUTED = event("Proxy", "ProxyExecuted", {"result": {"Ok": None}})
+
+
+def test_parse_operations_fills_defaults():
+    ops = parse_operations(
+        [
+            {"op": "add", "netuid": 1, "amount": 1.0},
+            {"op": "remove", "netuid": 2, "all": True},
+            {"op": "move", "origin_netuid": 1, "destination_netuid": 2, "amount": 0.5},
+        ],
+        default_hotkey=HOTKEY,
+        default_tolerance=0.01,
+    )
+    assert ops[0] == {"op": "add", "netuid": 1, "amount": 1.0, "hotkey": HOTKEY, "tolerance": 0.01}
+    assert ops[1]["amount"] is None and "all" not in ops[1]
+    assert ops[2]["origin_hotkey"] == ops[2]["destination_hotkey"] == HOTKEY
+    assert [stake_needed(op) for op in ops] == [None, (HOTKEY, 2), None]
+
+
+@pytest.mark.parametrize("operations, message", [
+    ([], "No operations"),
+    ([{"op": "swap", "netuid": 1}], "unknown op"),
+    ([{"op": "add", "netuid": 1}], "missing amount"),
+    ([{"op": "move", "origin_netuid": 1}], "missing destination_netuid"),
+    ([{"op": "add", "netuid": 1, "amount": -1.0}], "amount must be above 0"),
+    ([{"op": "add", "netuid": 1, "amount": float("inf")}], "amount must be above 0"),
+    ([{"op": "add", "netuid": 1, "amount": 2e9}], "amount must be above 0"),
+    ([{"op": "add", "netuid": 1, "amount": "lots"}], "amount must be a number"),
+    ([{"op": "add", "netuid": 1, "amount": 1.0, "tolerance": 1.5}], "tolerance must be between 0 and 1"),
+    ([{"op": "remove", "netuid": 1, "tolerance": 0}], "tolerance must be between 0 and 1"),
+])
+def test_parse_operations_rejects_malformed(operations, message):
+    with pytest.raises(ValueError, match=message):
+        parse_operations(operations, default_hotkey=HOTKEY)
+
+
+def test_parse_operations_needs_a_hotkey():
+    with pytest.raises(ValueError, match="missing hotkey"):
+        parse_operations([{"op": "add", "netuid": 1, "amount": 1.0}])
+
+
+def test_events_are_split_at_item_boundaries():
+    success, results = decode_batch_events([staked(1), COMPLETED, staked(2), staked(2), COMPLETED, EXECUTED], 2)
+    assert success
+    assert [len(result["events"]) for result in results] == [1, 2]
+    assert results[1]["events"][0]["attributes"][4] == 2
+
+
+def test_force_batch_reports_failed_and_missing_items():
+    success, results = decode_batch_events([staked(1), COMPLETED, FAILED, EXECUTED], 3)
+    assert not success
+    assert [result["success"] for result in results] == [True, False, False]
+    assert results[1]["error"] is not None and results[1]["events"] == []
+    assert results[2]["error"] == "Not executed"
+
+
+def test_batch_all_failure_reverts_every_item():
+    reverted = event("Proxy", "ProxyExecuted", {"result": {"Err": {"Module": {"index": 7, "error": "0x02000000"}}}})
+    success, results = decode_batch_events([staked(1), COMPLETED, reverted], 2)
+    assert not success
+    assert all(not result["success"] and result["events"] == [] for result in results)
+    assert results[0]["error"] == results[1]["error"] is not None
+
+
+def test_unexecuted_proxy_call():
+    success, results = decode_batch_events([], 2, fallback_error="Insufficient balance")
+    assert not success
+    assert [result["error"] for result in results] == ["Insufficient balance"] * 2
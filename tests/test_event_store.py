@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import pytest
+
+# utils.events reads event fields through utils.receipts, which needs bittensor
+pytest.importorskip("bittensor.utils.balance")
+
+from utils.event_store import EventStore, block_timestamp
+
+
+COLDKEY = "5F5WLLEzDBXQDdTzDYgbQ3d3JKbM15HhPdFuLMmuzcUW5xG2"
+HOTKEY = "5CsiGTsNBAn1bNiGNEd5LYpo6bm3PXT5ogPrQmvpZaUb2XzZ"
+
+
+def event(module_id: str, event_id: str, attributes) -> dict:
+    return {"event": {"module_id": module_id, "event_id": event_id, "attributes": attributes}}
+
+
+def block(number: int, timestamp=None, extrinsics=()) -> SimpleNamespace:
+    return SimpleNamespace(
+        number=number,
+        timestamp=timestamp,
+        extrinsics=list(extrinsics),
+        events=[
+            event("System", "ExtrinsicSuccess", {}),
+            event("SubtensorModule", "StakeAdded", (COLDKEY, HOTKEY, 10_000_000_000, 40_000_000_000, 1)),
+            event("Balances", "Withdraw", {}),
+            event("SubtensorModule", "StakeRemoved", (COLDKEY, HOTKEY, 2_000_000_000, 8_000_000_000, 2)),
+        ],
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"))
+    yield store
+    store.close()
+
+
+def test_round_trip(store):
+    assert store.add_block(block(100, timestamp=1700000000.0)) == 2
+    store.flush()
+    rows = store.flows(coldkey=COLDKEY)
+    assert [(row["block"], row["idx"], row["type"], row["netuid"]) for row in rows] == [
+        (100, 1, "StakeAdded", 1),
+        (100, 3, "StakeRemoved", 2),
+    ]
+    assert rows[0]["timestamp"] == 1700000000.0
+    assert rows[0]["amount_tao"] == 10.0
+    assert rows[0]["alpha"] == 40_000_000_000
+    assert [row["type"] for row in store.flows(netuid=2)] == ["StakeRemoved"]
+    assert store.flows(since=1700000001.0) == []
+    assert store.last_block() == 100
+
+
+def test_insert_is_idempotent(store):
+    store.add_block(block(100))
+    store.flush()
+    # Re-fed after a restart
+    store.add_block(block(100))
+    store.add_block(block(101))
+    store.flush()
+    assert [(row["block"], row["idx"]) for row in store.flows()] == [(100, 1), (100, 3), (101, 1), (101, 3)]
+
+
+def test_unknown_timestamp_is_null(store):
+    store.add_block(block(100))
+    store.flush()
+    assert {row["timestamp"] for row in store.flows()} == {None}
+
+
+def test_timestamp_from_the_set_extrinsic():
+    timestamp_set = SimpleNamespace(value={"call": {
+        "call_module": "Timestamp",
+        "call_function": "set",
+        "call_args": [{"name": "now", "value": 1700000012000}],
+    }})
+    assert block_timestamp(block(100, extrinsics=[timestamp_set])) == 1700000012.0
+    assert block_timestamp(block(100, timestamp=5.0, extrinsics=[timestamp_set])) == 5.0
+    assert block_timestamp(block(100)) is None
+
+
+def test_coldkey_swaps(store):
+    store.add_coldkey_swaps(100, [{"old_coldkey": COLDKEY, "new_coldkey": HOTKEY, "subnet": 3}], 1700000000.0)
+    store.add_coldkey_swaps(100, [{"old_coldkey": COLDKEY, "new_coldkey": HOTKEY, "subnet": 3}], 1700000000.0)
+    store.flush()
+    swaps = store.coldkey_swaps(coldkey=HOTKEY)
+    assert len(swaps) == 1
+    assert swaps[0]["netuid"] == 3
@@ -0,0 +1,103 @@
+import pytest
+from substrateinterface.exceptions import SubstrateRequestException
+
+from utils.nonce import NONCE_ERRORS, NonceManager, NotIncludedError
+
+
+SIGNER = "5F5WLLEzDBXQDdTzDYgbQ3d3JKbM15HhPdFuLMmuzcUW5xG2"
+
+
+class FakeSubstrate:
+    """
+    Answers system_accountNextIndex with `chain_next` and counts the calls.
+    """
+
+    def __init__(self, chain_next: int):
+        self.chain_next = chain_next
+        self.calls = 0
+
+    def rpc_request(self, method, params):
+        assert method == "system_accountNextIndex"
+        self.calls += 1
+        return {"result": self.chain_next}
+
+
+def test_in_flight_nonces_come_from_the_local_counter():
+    substrate = FakeSubstrate(5)
+    manager = NonceManager()
+    assert [manager.acquire(substrate, SIGNER) for _ in range(3)] == [5, 6, 7]
+    assert substrate.calls == 1
+
+
+def test_idle_signer_resyncs_from_the_chain():
+    substrate = FakeSubstrate(5)
+    manager = NonceManager()
+    manager.release(SIGNER, manager.acquire(substrate, SIGNER))
+    # Someone else used the account meanwhile
+    substrate.chain_next = 9
+    assert manager.acquire(substrate, SIGNER) == 9
+    assert substrate.calls == 2
+
+
+@pytest.mark.parametrize("marker", NONCE_ERRORS)
+def test_nonce_errors_force_a_resync(marker):
+    substrate = FakeSubstrate(5)
+    manager = NonceManager()
+    first = manager.acquire(substrate, SIGNER)
+    manager.acquire(substrate, SIGNER)
+    manager.release(SIGNER, first, Exception(f"Transaction is {marker}"))
+    substrate.chain_next = 12
+    # Still one in flight, but the local counter was dropped
+    assert manager.acquire(substrate, SIGNER) == 12
+    assert substrate.calls == 2
+
+
+def test_price_limit_rejection_keeps_the_counter():
+    substrate = FakeSubstrate(5)
+    manager = NonceManager()
+    first = manager.acquire(substrate, SIGNER)
+    manager.acquire(substrate, SIGNER)
+    manager.release(SIGNER, first, SubstrateRequestException("1010: Invalid Transaction: Custom error: 8"))
+    assert manager.acquire(substrate, SIGNER) == 7
+    assert substrate.calls == 1
+
+
+def test_pushed_but_not_included_forces_a_resync():
+    substrate = FakeSubstrate(5)
+    manager = NonceManager()
+    manager.acquire(substrate, SIGNER)
+    second = manager.acquire(substrate, SIGNER)
+    # Still in node pools, so the nonce must not be handed out again
+    manager.release(SIGNER, second, NotIncludedError("Extrinsic was not included in time"))
+    substrate.chain_next = 7
+    assert manager.acquire(substrate, SIGNER) == 7
+    assert substrate.calls == 2
+
+
+def test_rejected_last_nonce_is_handed_out_again():
+    substrate = FakeSubstrate(5)
+    manager = NonceManager()
+    manager.acquire(substrate, SIGNER)
+    second = manager.acquire(substrate, SIGNER)
+    manager.release(SIGNER, second, SubstrateRequestException("Invalid Transaction"))
+    assert manager.acquire(substrate, SIGNER) == second
+    assert substrate.calls == 1
+
+
+def test_other_errors_keep_the_counter():
+    substrate = FakeSubstrate(5)
+    manager = NonceManager()
+    first = manager.acquire(substrate, SIGNER)
+    manager.acquire(substrate, SIGNER)
+    manager.release(SIGNER, first, TimeoutError("no reply"))
+    assert manager.acquire(substrate, SIGNER) == 7
+
+
+def test_reset():
+    substrate = FakeSubstrate(5)
+    manager = NonceManager()
+    manager.acquire(substrate, SIGNER)
+    manager.reset(SIGNER)
+    substrate.chain_next = 6
+    assert manager.acquire(substrate, SIGNER) == 6
+    assert substrate.calls == 2
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from utils.price_history import PriceHistory
+
+
+def subnet(netuid: int, price: float) -> SimpleNamespace:
+    return SimpleNamespace(netuid=netuid, price=price, tao_in=price * 1000, alpha_in=1000.0, alpha_out=2000.0)
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = PriceHistory(str(tmp_path / "history"), width=8, chunk=4)
+    yield history
+    history.close()
+
+
+def test_files_grow_by_chunks(history):
+    history.append(100, [subnet(1, 0.5)])
+    assert history.meta["capacity"] == 4
+    history.append(109, [subnet(1, 0.6)])
+    assert history.meta["capacity"] == 12
+    assert (history.start_block, history.last_block) == (100, 109)
+    # Rows written before growing survive the re-map
+    assert history.window("price", 100, 100, netuid=1).tolist() == [0.5]
+
+
+def test_skipped_blocks_are_not_recorded(history):
+    for block in (100, 101, 104):
+        history.append(block, [subnet(1, block / 100), subnet(3, 2.0)])
+    assert history.blocks().tolist() == list(range(100, 105))
+    assert history.recorded().tolist() == [True, True, False, False, True]
+    prices = history.window("price", netuid=1)
+    assert prices.tolist() == [1.0, 1.01, 0.0, 0.0, 1.04]
+    assert history.window("tao_in", 104, 104, netuid=slice(1, 4)).tolist() == [[1040.0, 0.0, 2000.0]]
+
+
+def test_append_rejects_bad_input(history):
+    history.append(100, [subnet(1, 0.5)])
+    with pytest.raises(ValueError):
+        history.append(99, [subnet(1, 0.5)])
+    with pytest.raises(ValueError):
+        history.append(101, [subnet(8, 0.5)])
+    with pytest.raises(ValueError):
+        history.window("volume")
+
+
+def test_reader_sees_flushed_blocks(history):
+    history.append(100, [subnet(1, 0.5)])
+    history.flush()
+    reader = PriceHistory(history.path, readonly=True)
+    assert reader.window("price", netuid=1).tolist() == [0.5]
+    with pytest.raises(ValueError):
+        reader.append(101, [subnet(1, 0.5)])
+
+    history.append(101, [subnet(1, 0.7)])
+    history.flush()
+    reader.reload()
+    assert reader.window("price", netuid=1).tolist() == [0.5, 0.7]
+    assert isinstance(reader.window("price"), np.memmap)
+
+
+def test_single_writer(history):
+    with pytest.raises(RuntimeError):
+        PriceHistory(history.path)
+    history.close()
+    PriceHistory(history.path).close()
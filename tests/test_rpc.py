@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("bittensor.utils.balance")
+
+from utils import rpc
+from utils.rpc import create_async_subtensor, resolve_endpoints
+
+
+class FakeEndpoints:
+    def __init__(self, urls):
+        self.urls = urls
+        self.failures = []
+
+    def ranked(self):
+        return list(self.urls)
+
+    def report_failure(self, url):
+        self.failures.append(url)
+
+
+class FakeAsyncSubtensor:
+    down = set()
+
+    def __init__(self, network):
+        self.url = network
+        self.closed = False
+
+    async def initialize(self):
+        if self.url in self.down:
+            raise ConnectionError("refused")
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def endpoints(monkeypatch):
+    endpoints = FakeEndpoints(["ws://private:9944", "wss://public:443"])
+    monkeypatch.setattr(rpc, "get_endpoints", lambda network: endpoints)
+    monkeypatch.setattr(rpc.bt, "AsyncSubtensor", FakeAsyncSubtensor)
+    return endpoints
+
+
+def test_resolve_endpoints(monkeypatch):
+    monkeypatch.setenv("RPC_ENDPOINTS_FINNEY", "ws://a:9944, ws://b:9944,ws://a:9944")
+    assert resolve_endpoints("finney") == ["ws://a:9944", "ws://b:9944", *rpc.RPC_ENDPOINTS["finney"]]
+    assert resolve_endpoints("ws://x:1,ws://y:2") == ["ws://x:1", "ws://y:2"]
+
+
+def test_async_subtensor_uses_the_best_endpoint(endpoints, monkeypatch):
+    monkeypatch.setattr(FakeAsyncSubtensor, "down", set())
+    subtensor = asyncio.run(create_async_subtensor("finney"))
+    assert subtensor.url == "ws://private:9944"
+
+
+def test_async_subtensor_falls_back_in_rank_order(endpoints, monkeypatch):
+    monkeypatch.setattr(FakeAsyncSubtensor, "down", {"ws://private:9944"})
+    subtensor = asyncio.run(create_async_subtensor("finney"))
+    assert subtensor.url == "wss://public:443"
+    assert endpoints.failures == ["ws://private:9944"]
+
+
+def test_async_subtensor_fails_when_no_endpoint_answers(endpoints, monkeypatch):
+    monkeypatch.setattr(FakeAsyncSubtensor, "down", {"ws://private:9944", "wss://public:443"})
+    with pytest.raises(ConnectionError, match="No RPC endpoint reachable"):
+        asyncio.run(create_async_subtensor("finney"))
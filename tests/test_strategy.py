@@ -0,0 +1,59 @@
+import pytest
+
+from utils.strategy import STAKE, UNSTAKE, ThresholdStrategy
+
+
+def test_fixed_prices_need_both_levels():
+    with pytest.raises(ValueError):
+        ThresholdStrategy(1, 10.0, 0.01, stake_price=0.1)
+
+
+def test_fixed_price_round_trip():
+    strategy = ThresholdStrategy(1, 10.0, 0.01, stake_price=0.1, unstake_price=0.2, repeat=1)
+    strategy.start(0.15)
+    assert strategy.decide(0.15) is None
+    assert strategy.decide(0.09) == STAKE
+    strategy.filled(STAKE, 0.095)
+    assert strategy.staked
+    assert strategy.decide(0.15) is None
+    assert strategy.decide(0.21) == UNSTAKE
+    strategy.filled(UNSTAKE, 0.205)
+    assert strategy.done
+    assert strategy.trigger() is None
+    assert strategy.decide(0.01) is None
+    # Fixed levels do not move
+    assert (strategy.stake_price, strategy.unstake_price) == (0.1, 0.2)
+
+
+def test_threshold_levels_follow_the_fills():
+    strategy = ThresholdStrategy(1, 10.0, 0.01, threshold=0.05)
+    strategy.start(1.0)
+    assert strategy.stake_price == pytest.approx(0.95)
+    assert strategy.unstake_price == pytest.approx(1.05)
+
+    assert strategy.decide(0.94) == STAKE
+    strategy.filled(STAKE, 0.96)
+    assert strategy.unstake_price == pytest.approx(1.01)
+    assert strategy.trigger() == (UNSTAKE, strategy.unstake_price, False)
+
+    assert strategy.decide(1.02) == UNSTAKE
+    strategy.filled(UNSTAKE, 1.0)
+    assert strategy.stake_price == pytest.approx(0.95)
+    assert not strategy.done
+
+
+def test_unanchored_levels_are_set_by_the_first_price():
+    strategy = ThresholdStrategy(1, 10.0, 0.01, threshold=0.1)
+    assert strategy.decide(2.0) is None
+    assert strategy.stake_price == pytest.approx(1.9)
+
+
+def test_repeat_counts_round_trips():
+    strategy = ThresholdStrategy(1, 10.0, 0.01, threshold=0.1, repeat=2)
+    strategy.start(1.0)
+    for _ in range(2):
+        assert not strategy.done
+        strategy.filled(STAKE, 1.0)
+        strategy.filled(UNSTAKE, 1.0)
+    assert strategy.done
+    assert strategy.as_dict()["repeats_left"] == 0
@@ -0,0 +1,106 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("bittensor.utils.balance")
+
+from bittensor.utils.balance import Balance
+
+from utils import strategy_runner
+from utils.receipts import TradeOutcome
+from utils.snapshot import PoolState
+from utils.strategy import STAKE, UNSTAKE
+from utils.strategy_runner import StrategyRunner, load_config
+
+
+HOTKEY = "5CsiGTsNBAn1bNiGNEd5LYpo6bm3PXT5ogPrQmvpZaUb2XzZ"
+DELEGATOR = "5F5WLLEzDBXQDdTzDYgbQ3d3JKbM15HhPdFuLMmuzcUW5xG2"
+
+
+def write_config(tmp_path, strategies, network=None):
+    path = tmp_path / "strategies.json"
+    path.write_text(json.dumps({"network": network, "strategies": strategies}))
+    return str(path)
+
+
+def test_load_config(tmp_path):
+    network, slots = load_config(write_config(tmp_path, [
+        {"netuid": 1, "wallet": "leo", "delegator": DELEGATOR, "stake_amount": 2, "tolerance": 0.01, "threshold": 0.1},
+        {"name": "fixed", "netuid": 2, "wallet": "leo", "delegator": DELEGATOR, "stake_amount": 1,
+         "tolerance": 0.01, "stake_price": 0.1, "unstake_price": 0.2, "repeat": 3, "hotkey": "5Hot"},
+    ], network="test"), default_hotkey=HOTKEY)
+    assert network == "test"
+    assert [slot.name for slot in slots] == ["leo-sn1", "fixed"]
+    assert [slot.hotkey for slot in slots] == [HOTKEY, "5Hot"]
+    assert slots[0].strategy.threshold == 0.1
+    assert slots[1].strategy.repeats_left == 3
+    assert slots[0].account == slots[1].account == ("leo", DELEGATOR)
+
+
+def test_load_config_rejects_incomplete_strategies(tmp_path):
+    with pytest.raises(ValueError, match="missing 'delegator'"):
+        load_config(write_config(tmp_path, [{"netuid": 1, "wallet": "leo", "stake_amount": 1, "tolerance": 0.01,
+                                             "threshold": 0.1}]), HOTKEY)
+    with pytest.raises(ValueError, match="both a stake price"):
+        load_config(write_config(tmp_path, [{"netuid": 1, "wallet": "leo", "delegator": DELEGATOR,
+                                             "stake_amount": 1, "tolerance": 0.01, "stake_price": 0.1}]), HOTKEY)
+
+
+class FakeProxy:
+    def __init__(self):
+        self.trades = []
+
+    def add_stake(self, netuid, hotkey, amount, tolerance):
+        self.trades.append((STAKE, netuid, amount.tao))
+        return TradeOutcome(True, event="StakeAdded", netuid=netuid, tao=amount, alpha=Balance.from_tao(amount.tao * 2, netuid))
+
+    def remove_stake(self, netuid, hotkey, amount, tolerance, all=False):
+        self.trades.append((UNSTAKE, netuid, all))
+        return TradeOutcome(True, event="StakeRemoved", netuid=netuid, tao=Balance.from_tao(1), alpha=Balance.from_tao(2, netuid))
+
+
+def pool(netuid: int, price: float) -> PoolState:
+    return PoolState(netuid, True, True, Balance.from_tao(price * 10_000), Balance.from_tao(10_000, netuid))
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    monkeypatch.setattr(strategy_runner, "create_substrate", lambda network: object())
+    _, slots = load_config(write_config(tmp_path, [
+        {"netuid": 1, "wallet": "leo", "delegator": DELEGATOR, "stake_amount": 2, "tolerance": 0.01,
+         "stake_price": 0.5, "unstake_price": 0.6, "repeat": 1},
+        {"netuid": 2, "wallet": "leo", "delegator": DELEGATOR, "stake_amount": 1, "tolerance": 0.01,
+         "stake_price": 0.1, "unstake_price": 0.2},
+    ]), HOTKEY)
+    proxies = {}
+    runner = StrategyRunner("test", slots, lambda wallet, delegator: proxies.setdefault((wallet, delegator), FakeProxy()))
+    runner.proxy = proxies[("leo", DELEGATOR)]
+    yield runner
+    for executor in runner._executors.values():
+        executor.shutdown(wait=True)
+
+
+def run_block(runner, prices):
+    runner.pools = lambda block: {netuid: pool(netuid, price) for netuid, price in prices.items()}
+    runner.on_block(SimpleNamespace(number=1, hash="0x01"))
+    # Each account's worker runs its trades in order, so a no-op queued last waits for them
+    for executor in runner._executors.values():
+        executor.submit(lambda: None).result()
+
+
+def test_strategies_share_one_snapshot_per_block(runner):
+    run_block(runner, {1: 0.45, 2: 0.15})
+    assert runner.proxy.trades == [(STAKE, 1, 2.0)]
+    assert runner.slots[0].strategy.staked and not runner.slots[0].busy
+
+    run_block(runner, {1: 0.65, 2: 0.05})
+    assert runner.proxy.trades[1:] == [(UNSTAKE, 1, True), (STAKE, 2, 1.0)]
+    assert runner.slots[0].strategy.done
+    assert [status["name"] for status in runner.status()] == ["leo-sn1", "leo-sn2"]
+
+
+def test_busy_strategy_is_skipped(runner):
+    runner.slots[0].busy = True
+    run_block(runner, {1: 0.45, 2: 0.15})
+    assert runner.proxy.trades == []
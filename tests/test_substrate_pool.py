@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+# utils.rpc, which opens the connections, also builds bittensor clients
+pytest.importorskip("bittensor.utils.balance")
+
+from utils import substrate_pool
+from utils.substrate_pool import SubstratePool
+
+
+class FakeSubstrate:
+    """
+    Stands in for a SubstrateInterface connection; counts what the pool does with it.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.closed = False
+        self.pings = 0
+
+    def rpc_request(self, method, params):
+        self.pings += 1
+        return {"result": {}}
+
+    def close(self):
+        self.closed = True
+
+
+class FakeEndpoints:
+    def is_healthy(self, url: str) -> bool:
+        return True
+
+    def best(self) -> str:
+        return "ws://node:9944"
+
+    def report_failure(self, url: str) -> None:
+        pass
+
+
+class Connector:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.opened = []
+
+    def __call__(self, network: str) -> FakeSubstrate:
+        substrate = FakeSubstrate("ws://node:9944")
+        with self.lock:
+            self.opened.append(substrate)
+        return substrate
+
+
+def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def connector(monkeypatch):
+    connector = Connector()
+    monkeypatch.setattr(substrate_pool, "create_substrate", connector)
+    monkeypatch.setattr(substrate_pool, "get_endpoints", lambda network: FakeEndpoints())
+    return connector
+
+
+@pytest.fixture
+def pool(connector):
+    pool = SubstratePool("finney", size=2, heartbeat_interval=3600)
+    wait_for(lambda: pool._idle.qsize() == 2)
+    yield pool
+    pool.close()
+
+
+def test_connections_are_warmed_in_the_background(pool, connector):
+    assert len(connector.opened) == 2
+    with pool.connection() as substrate:
+        assert substrate in connector.opened
+    assert len(connector.opened) == 2
+
+
+def test_most_recently_used_connection_is_reused(pool):
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+
+
+def test_connection_errors_replace_the_connection(pool, connector):
+    with pytest.raises(OSError):
+        with pool.connection() as substrate:
+            raise OSError("socket closed")
+    assert substrate.closed
+    wait_for(lambda: len(connector.opened) == 3 and pool._idle.qsize() == 2)
+
+
+def test_other_errors_keep_the_connection(pool, connector):
+    with pytest.raises(ValueError):
+        with pool.connection() as substrate:
+            raise ValueError("bad call")
+    assert not substrate.closed
+    assert pool._idle.qsize() == 2
+
+
+def test_connects_inline_when_the_pool_is_empty(pool, connector):
+    held = [pool.checkout(), pool.checkout()]
+    extra = pool.checkout(timeout=0)
+    assert extra not in held
+    assert len(connector.opened) == 3
+
+
+def test_close_closes_idle_connections(pool, connector):
+    pool.close()
+    assert all(substrate.closed for substrate in connector.opened)
+
+
+def test_surplus_connections_are_closed_on_checkin(pool, connector):
+    held = [pool.checkout(), pool.checkout(), pool.checkout(timeout=0)]
+    assert pool._open == 3
+    for substrate in held:
+        pool.checkin(substrate)
+    assert pool._open == 2
+    assert pool._idle.qsize() == 2
+    assert sum(substrate.closed for substrate in held) == 1
+
+
+def test_broken_surplus_connection_is_not_replaced(pool, connector):
+    held = [pool.checkout(), pool.checkout(), pool.checkout(timeout=0)]
+    pool.checkin(held[2], broken=True)
+    pool.checkin(held[0])
+    pool.checkin(held[1])
+    time.sleep(0.05)
+    assert len(connector.opened) == 3
+    assert pool._open == 2
+
+
+def test_marked_broken_connection_is_discarded(pool, connector):
+    with pool.connection() as substrate:
+        # A caller that caught the connection error itself
+        pool.mark_broken(substrate)
+    assert substrate.closed
+    wait_for(lambda: len(connector.opened) == 3 and pool._idle.qsize() == 2)
+    assert pool._open == 2
@@ -0,0 +1,83 @@
+import pytest
+
+pytest.importorskip("bittensor.utils.balance")
+
+from bittensor.utils.balance import Balance
+
+from utils.amm import QuoteEngine
+from utils.receipts import TradeOutcome
+from utils.snapshot import PoolState
+from utils.twap import TwapOrder
+
+
+def pool(tao_in: float, alpha_in: float, netuid: int = 1) -> PoolState:
+    return PoolState(netuid, True, True, Balance.from_tao(tao_in), Balance.from_tao(alpha_in, netuid))
+
+
+def filled(tao: float, alpha: float) -> TradeOutcome:
+    return TradeOutcome(True, event="StakeAdded", netuid=1, tao=Balance.from_tao(tao), alpha=Balance.from_tao(alpha, 1))
+
+
+def test_children_stay_within_the_impact_cap():
+    order = TwapOrder(1, Balance.from_tao(100), max_impact=0.002)
+    state = pool(1000, 4000)
+    child = order.next_child(state)
+    depth = float(QuoteEngine.from_pools([state]).max_amount(1, 0.002, buy=True))
+    assert child.tao == pytest.approx(depth, abs=1e-9)
+    assert state.quote(child, buy=True).min_tolerance <= 0.002 + 1e-9
+    assert order.start_price == pytest.approx(0.25)
+
+
+def test_last_child_is_what_remains():
+    order = TwapOrder(1, Balance.from_tao(0.5))
+    assert order.next_child(pool(1000, 4000)).rao == Balance.from_tao(0.5).rao
+
+
+def test_children_add_up_to_the_amount():
+    order = TwapOrder(1, Balance.from_tao(5), max_impact=0.002)
+    state = pool(1000, 4000)
+    total = 0
+    while True:
+        child = order.next_child(state)
+        if child is None:
+            break
+        order.record(child, filled(child.tao, child.tao * 4))
+        total += child.rao
+    assert order.done and order.stopped is None
+    assert total == Balance.from_tao(5).rao
+    assert order.as_dict()["success"]
+    assert order.average_price == pytest.approx(0.25)
+
+
+def test_thin_pool_stops_instead_of_breaking_the_cap():
+    order = TwapOrder(1, Balance.from_tao(10), max_impact=0.002, min_child=0.01)
+    # Depth within 0.2% impact is about 0.001 TAO
+    assert order.next_child(pool(1, 4)) is None
+    assert order.stopped.startswith("Pool too thin")
+
+
+def test_drift_stops_the_order():
+    order = TwapOrder(1, Balance.from_tao(100), max_drift=0.02)
+    order.next_child(pool(1000, 4000))
+    assert order.next_child(pool(1000, 3900)) is None
+    assert "Price moved" in order.stopped
+
+
+def test_failures_in_a_row_stop_the_order():
+    order = TwapOrder(1, Balance.from_tao(100), max_failures=2)
+    state = pool(1000, 4000)
+    for _ in range(2):
+        order.record(order.next_child(state), TradeOutcome(False, error="Slippage"))
+    assert order.done
+    assert "2 child orders failed" in order.stopped
+    assert order.filled_tao.rao == 0
+
+
+def test_missing_subnet_and_child_limit():
+    assert TwapOrder(1, Balance.from_tao(1)).next_child(None) is None
+    order = TwapOrder(1, Balance.from_tao(100), max_children=1)
+    state = pool(1000, 4000)
+    child = order.next_child(state)
+    order.record(child, filled(child.tao, child.tao * 4))
+    assert order.next_child(state) is None
+    assert order.stopped == "Reached 1 child orders"
@@ -0,0 +1,259 @@
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+# Share of every swap input kept by the pool as a fee
+SWAP_FEE = float(os.getenv("SWAP_FEE", "0.0005"))
+
+RAO_PER_TAO = 1e9
+
+
+class Quote:
+    """
+    Quotes for a vector of trades in one direction, one entry per (netuid, amount).
+
+    Amounts and reserves are in TAO/alpha units; every attribute is an array
+    of the broadcast shape of the requested netuids and amounts.
+    """
+
+    def __init__(
+        self,
+        buy: bool,
+        netuids: np.ndarray,
+        amount_in: np.ndarray,
+        amount_out: np.ndarray,
+        spot_price: np.ndarray,
+        min_tolerance: np.ndarray,
+        dynamic: np.ndarray,
+    ):
+        self.buy = buy
+        self.netuids = netuids
+        self.amount_in = amount_in
+        self.amount_out = amount_out
+        self.spot_price = spot_price
+        self.min_tolerance = min_tolerance
+        self.dynamic = dynamic
+
+    @property
+    def effective_price(self) -> np.ndarray:
+        """
+        TAO paid (stake) or received (unstake) per alpha, fee included.
+        """
+        tao, alpha = (self.amount_in, self.amount_out) if self.buy else (self.amount_out, self.amount_in)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(alpha > 0, tao / alpha, self.spot_price)
+
+    @property
+    def price_impact(self) -> np.ndarray:
+        """
+        Relative distance of the effective price from the spot price.
+        """
+        ratio = self.effective_price / self.spot_price
+        return ratio - 1 if self.buy else 1 - ratio
+
+    @property
+    def limit_price(self) -> np.ndarray:
+        """
+        Tightest limit price in rao that still fills the whole amount.
+        """
+        return limit_prices(np.where(self.dynamic, self.spot_price, np.nan), self.min_tolerance, self.buy)
+
+    def rows(self) -> List[Dict]:
+        """
+        One dict per quote, flattened in C order.
+        """
+        columns = np.broadcast_arrays(
+            self.netuids, self.amount_in, self.amount_out, self.spot_price,
+            self.effective_price, self.price_impact, self.min_tolerance,
+        )
+        return [
+            {
+                "netuid": int(netuid),
+                "amount_in": float(amount_in),
+                "amount_out": float(amount_out),
+                "spot_price": float(spot_price),
+                "effective_price": float(effective_price),
+                "price_impact": float(price_impact),
+                "min_tolerance": float(min_tolerance),
+            }
+            for netuid, amount_in, amount_out, spot_price, effective_price, price_impact, min_tolerance
+            in zip(*(column.ravel() for column in columns))
+        ]
+
+
+def limit_prices(spot_price, tolerance, buy: bool) -> np.ndarray:
+    """
+    Limit price in rao for add_stake_limit (buy) or remove_stake_limit (sell),
+    `tolerance` away from the spot price. A NaN spot price (stable subnet) gives 1 rao.
+    """
+    spot_price, tolerance = np.broadcast_arrays(np.asarray(spot_price, dtype=float), np.asarray(tolerance, dtype=float))
+    limit = spot_price * (1 + tolerance if buy else 1 - tolerance) * RAO_PER_TAO
+    return np.where(np.isnan(spot_price), 1, np.floor(limit)).astype(np.int64)
+
+
+class QuoteEngine:
+    """
+    Constant-product quotes for any number of subnets and amounts at once.
+
+    Reserves are held in arrays indexed by netuid, so a quote for a vector
+    of netuids and a vector (or ladder) of amounts is a handful of array
+    operations instead of a Python loop over subnets. Netuids and amounts
+    broadcast against each other: pass `netuids[:, None]` and `amounts` to
+    get a full price-impact curve for every subnet.
+    """
+
+    def __init__(
+        self,
+        netuids: Iterable[int],
+        tao_in: Iterable[float],
+        alpha_in: Iterable[float],
+        is_dynamic: Iterable[bool],
+        fee: float = SWAP_FEE,
+        block: Optional[int] = None,
+    ):
+        """
+        Args:
+            netuids: Subnet ids
+            tao_in: TAO reserve of each subnet, in TAO
+            alpha_in: Alpha reserve of each subnet, in alpha
+            is_dynamic: Whether each subnet has a dynamic (AMM) pool
+            fee: Share of the swap input kept by the pool
+            block: Block the reserves were read at, if known
+        """
+        netuids = np.asarray(list(netuids), dtype=np.int64)
+        size = int(netuids.max()) + 1 if netuids.size else 0
+        self.fee = fee
+        self.block = block
+        self.exists = np.zeros(size, dtype=bool)
+        self.tao_in = np.zeros(size)
+        self.alpha_in = np.zeros(size)
+        self.is_dynamic = np.zeros(size, dtype=bool)
+        self.exists[netuids] = True
+        self.tao_in[netuids] = list(tao_in)
+        self.alpha_in[netuids] = list(alpha_in)
+        self.is_dynamic[netuids] = list(is_dynamic)
+
+    @classmethod
+    def from_pools(cls, pools: Iterable, fee: float = SWAP_FEE, block: Optional[int] = None) -> "QuoteEngine":
+        """
+        Build from objects with netuid, tao_in, alpha_in (Balance) and is_dynamic,
+        i.e. subnet infos from all_subnets() or snapshot PoolStates.
+        """
+        pools = [pool for pool in pools if pool is not None and getattr(pool, "exists", True)]
+        return cls(
+            netuids=[pool.netuid for pool in pools],
+            tao_in=[pool.tao_in.tao for pool in pools],
+            alpha_in=[pool.alpha_in.tao for pool in pools],
+            is_dynamic=[pool.is_dynamic for pool in pools],
+            fee=fee,
+            block=block,
+        )
+
+    @property
+    def netuids(self) -> np.ndarray:
+        return np.flatnonzero(self.exists)
+
+    def _lookup(self, netuids, amounts):
+        netuids, amounts = np.broadcast_arrays(np.asarray(netuids, dtype=np.int64), np.asarray(amounts, dtype=float))
+        inside = (netuids >= 0) & (netuids < self.exists.size)
+        known = inside & self.exists[np.where(inside, netuids, 0)] if self.exists.size else inside
+        if not known.all():
+            missing = ", ".join(str(netuid) for netuid in np.unique(netuids[~known]))
+            raise ValueError(f"Subnet with netuid {missing} does not exist")
+        dynamic = self.is_dynamic[netuids] & (self.alpha_in[netuids] > 0) & (self.tao_in[netuids] > 0)
+        return netuids, amounts, self.tao_in[netuids], self.alpha_in[netuids], dynamic
+
+    def spot_price(self, netuids) -> np.ndarray:
+        """
+        TAO price of one alpha (1 on stable subnets).
+        """
+        netuids, _, tao_in, alpha_in, dynamic = self._lookup(netuids, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(dynamic, tao_in / alpha_in, 1.0)
+
+    def stake(self, netuids, tao_amounts) -> Quote:
+        """
+        Quote staking TAO amounts into subnets.
+
+        Raises:
+            ValueError: If a netuid does not exist
+        """
+        netuids, amounts, tao_in, alpha_in, dynamic = self._lookup(netuids, tao_amounts)
+        net = amounts * (1 - self.fee)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spot = np.where(dynamic, tao_in / alpha_in, 1.0)
+            alpha_out = np.where(dynamic, alpha_in * net / (tao_in + net), amounts)
+            # The pool price after the swap, relative to spot, is the tightest tolerance
+            min_tolerance = np.where(dynamic, (1 + net / tao_in) ** 2 - 1, 0.0)
+        return Quote(True, netuids, amounts, alpha_out, spot, min_tolerance, dynamic)
+
+    def unstake(self, netuids, alpha_amounts) -> Quote:
+        """
+        Quote unstaking alpha amounts from subnets.
+
+        Raises:
+            ValueError: If a netuid does not exist
+        """
+        netuids, amounts, tao_in, alpha_in, dynamic = self._lookup(netuids, alpha_amounts)
+        net = amounts * (1 - self.fee)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spot = np.where(dynamic, tao_in / alpha_in, 1.0)
+            tao_out = np.where(dynamic, tao_in * net / (alpha_in + net), amounts)
+            min_tolerance = np.where(dynamic, 1 - (alpha_in / (alpha_in + net)) ** 2, 0.0)
+        return Quote(False, netuids, amounts, tao_out, spot, min_tolerance, dynamic)
+
+    def max_amount(self, netuids, max_tolerance, buy: bool) -> np.ndarray:
+        """
+        Largest stake (TAO, buy) or unstake (alpha, sell) per subnet whose minimum
+        tolerance is `max_tolerance`; the inverse of Quote.min_tolerance. Infinite
+        on stable subnets, which have no price impact.
+        """
+        netuids, tolerance, tao_in, alpha_in, dynamic = self._lookup(netuids, max_tolerance)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if buy:
+                net = tao_in * (np.sqrt(1 + tolerance) - 1)
+            else:
+                net = alpha_in * (1 / np.sqrt(1 - tolerance) - 1)
+            return np.where(dynamic, net / (1 - self.fee), np.inf)
+
+    def limit_price(self, netuids, tolerance, buy: bool) -> np.ndarray:
+        """
+        Limit price in rao `tolerance` away from each subnet's spot price.
+        """
+        netuids, _, tao_in, alpha_in, dynamic = self._lookup(netuids, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spot = np.where(dynamic, tao_in / alpha_in, np.nan)
+        return limit_prices(spot, tolerance, buy)
+
+
+def ladder(max_amount: float, steps: int, min_amount: Optional[float] = None) -> np.ndarray:
+    """
+    Geometrically spaced trade sizes up to max_amount, for price-impact curves.
+
+    Args:
+        max_amount: Largest size
+        steps: Number of sizes
+        min_amount: Smallest size, defaults to max_amount / 2 ** (steps - 1)
+    """
+    if max_amount <= 0 or steps < 1:
+        raise ValueError("Ladder needs a positive max amount and at least one step")
+    if min_amount is None:
+        min_amount = max_amount / 2 ** (steps - 1)
+    if not 0 < min_amount <= max_amount:
+        raise ValueError("Ladder min amount must be positive and not above the max amount")
+    return np.geomspace(min_amount, max_amount, steps)
+
+
+def tolerance_error(quote: Quote, tolerance: float):
+    """
+    Error message if `tolerance` is too tight for a single-trade quote to fill, else None.
+
+    Trades are sent with allow_partial False, so such a trade can only fail
+    on chain after paying the transaction fee.
+    """
+    min_tolerance = float(np.max(quote.min_tolerance))
+    if tolerance >= min_tolerance:
+        return None
+    return f"Tolerance {tolerance} is below the {min_tolerance:.6f} price impact of this trade"
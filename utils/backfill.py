@@ -0,0 +1,108 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional
+
+from utils.block_follower import Block, read_timestamp
+from utils.substrate_pool import SubstratePool
+
+
+class Backfill:
+    """
+    Fetch a range of historical blocks concurrently and deliver them in order.
+
+    Each block's hash, extrinsics and events are fetched by a worker on its
+    own connection from a bounded SubstratePool, with up to `window` blocks
+    in flight. Results are buffered and handed out strictly by block number,
+    so handlers written for one block at a time see the same sequence they
+    would have seen live, only much faster.
+    """
+
+    def __init__(
+        self,
+        network: str,
+        workers: int = 8,
+        with_extrinsics: bool = True,
+        with_events: bool = True,
+        with_timestamps: bool = False,
+        retries: int = 3,
+        pool: Optional[SubstratePool] = None,
+    ):
+        """
+        Initialize the backfill and start warming its connections in the background.
+
+        Args:
+            network: Network name, websocket URL or comma-separated URLs
+            workers: Number of blocks fetched at once, and connections opened
+            with_extrinsics: Whether to fetch each block's extrinsics
+            with_events: Whether to fetch each block's events
+            with_timestamps: Whether to read each block's timestamp when its extrinsics are not fetched
+            retries: Attempts per block before the range fails
+            pool: Connection pool to use instead of opening one
+        """
+        self.network = network
+        self.workers = max(1, workers)
+        self.window = self.workers * 4
+        self.with_extrinsics = with_extrinsics
+        self.with_events = with_events
+        self.with_timestamps = with_timestamps
+        self.retries = max(1, retries)
+        self.pool = pool or SubstratePool(network, size=self.workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+
+    def fetch(self, number: int) -> Block:
+        """
+        Hash, extrinsics and events of one block, retrying on a fresh connection.
+
+        Raises:
+            Exception: The last error if every attempt failed
+        """
+        error = None
+        for _ in range(self.retries):
+            try:
+                with self.pool.connection() as substrate:
+                    block_hash = substrate.get_block_hash(block_id=number)
+                    extrinsics = substrate.get_extrinsics(block_hash=block_hash) if self.with_extrinsics else None
+                    events = substrate.get_events(block_hash=block_hash) if self.with_events else None
+                    # With the extrinsics at hand the timestamp is read from Timestamp.set instead
+                    timestamp = (
+                        read_timestamp(substrate, block_hash)
+                        if self.with_timestamps and not self.with_extrinsics else None
+                    )
+                return Block(number, block_hash, events, extrinsics, timestamp)
+            except Exception as e:
+                print(f"Error fetching block {number}: {e}")
+                error = e
+        raise error
+
+    def blocks(self, start: int, end: int) -> Iterator[Block]:
+        """
+        Every block from start to end inclusive, in order.
+
+        Raises:
+            Exception: If a block could not be fetched; blocks before it have been delivered
+        """
+        pending = deque()
+        next_number = start
+        while pending or next_number <= end:
+            while next_number <= end and len(pending) < self.window:
+                pending.append(self._executor.submit(self.fetch, next_number))
+                next_number += 1
+            yield pending.popleft().result()
+
+    def run(self, start: int, end: int, *handlers: Callable[[Block], None]) -> int:
+        """
+        Call every handler with each block from start to end, in order.
+
+        Returns:
+            Number of the last block handled
+        """
+        last = start - 1
+        for block in self.blocks(start, end):
+            for handler in handlers:
+                handler(block)
+            last = block.number
+        return last
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.pool.close()
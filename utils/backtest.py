@@ -0,0 +1,221 @@
+import itertools
+import os
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.amm import SWAP_FEE, QuoteEngine
+from utils.price_history import PriceHistory
+from utils.strategy import STAKE, ThresholdStrategy
+
+
+class BacktestResult:
+    """
+    Outcome of replaying one strategy over a block range.
+    """
+
+    def __init__(self, strategy: ThresholdStrategy, params: Dict, start_block: Optional[int], end_block: Optional[int]):
+        self.strategy = strategy
+        self.params = params
+        self.start_block = start_block
+        self.end_block = end_block
+        self.cash = 0.0           # TAO received minus TAO spent
+        self.alpha = 0.0          # alpha held at the end
+        self.exit_value = 0.0     # TAO the open position would fetch at the last block
+        self.trades = 0
+        self.round_trips = 0
+        self.failed = 0
+        self.slippage: List[float] = []
+        self.fills: List[Dict] = []
+
+    @property
+    def pnl(self) -> float:
+        return self.cash + self.exit_value
+
+    @property
+    def return_pct(self) -> float:
+        return self.pnl / self.strategy.stake_amount * 100 if self.strategy.stake_amount else 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            **self.params,
+            "start_block": self.start_block,
+            "end_block": self.end_block,
+            "pnl": self.pnl,
+            "return_pct": self.return_pct,
+            "trades": self.trades,
+            "round_trips": self.round_trips,
+            "failed": self.failed,
+            "open_alpha": self.alpha,
+            "exit_value": self.exit_value,
+            "mean_slippage": float(np.mean(self.slippage)) if self.slippage else 0.0,
+            "max_slippage": float(np.max(self.slippage)) if self.slippage else 0.0,
+        }
+
+    def __str__(self) -> str:
+        stats = self.as_dict()
+        return (
+            f"SN{self.strategy.netuid} threshold {self.params.get('threshold')} tolerance {self.strategy.tolerance} "
+            f"amount {self.strategy.stake_amount}: PnL {stats['pnl']:+.4f} TAO ({stats['return_pct']:+.2f}%), "
+            f"{self.trades} trades, {self.failed} failed, mean slippage {stats['mean_slippage']:.4%}"
+        )
+
+
+def backtest(
+    strategy: ThresholdStrategy,
+    blocks: np.ndarray,
+    tao_in: np.ndarray,
+    alpha_in: np.ndarray,
+    fee: float = SWAP_FEE,
+    params: Optional[Dict] = None,
+) -> BacktestResult:
+    """
+    Replay a strategy over recorded reserves of its subnet.
+
+    The strategy sees the pool price of every block, in order. Trades fill
+    against that block's reserves through the AMM model, fee included, and
+    fail like add_stake_limit/remove_stake_limit would when the strategy's
+    tolerance is below the trade's own price impact. The price after each
+    fill is handed to the strategy for re-anchoring. Later blocks are the
+    recorded ones, so the backtest does not carry the impact of its own
+    trades forward.
+
+    Between trades, the next block that triggers and can fill is found with
+    array operations over the rest of the range, so the cost is per trade
+    rather than per block.
+
+    Args:
+        strategy: Strategy to replay; it is mutated
+        blocks: Block number of each row
+        tao_in: TAO reserve of the subnet at each block, 0 where not recorded
+        alpha_in: Alpha reserve of the subnet at each block, 0 where not recorded
+        fee: Pool swap fee
+        params: Sweep parameters to report with the result
+
+    Returns:
+        BacktestResult
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        recorded = (tao_in > 0) & (alpha_in > 0)
+        prices = np.where(recorded, tao_in / alpha_in, np.nan)
+    valid = np.flatnonzero(recorded)
+    result = BacktestResult(
+        strategy, params or {}, int(blocks[0]) if len(blocks) else None, int(blocks[-1]) if len(blocks) else None,
+    )
+    if not valid.size:
+        return result
+
+    # One pseudo-subnet per block, so a trade is quoted against every block at once
+    rows = np.arange(len(prices))
+    engine = QuoteEngine(rows, tao_in, alpha_in, recorded, fee=fee)
+
+    i = int(valid[0])
+    strategy.start(float(prices[i]))
+    while i < len(prices):
+        trigger = strategy.trigger()
+        if trigger is None:
+            break
+        action, level, below = trigger
+        remaining = prices[i:]
+        # NaN compares False, so unrecorded blocks never trigger
+        hit_rows = np.flatnonzero(remaining < level if below else remaining > level) + i
+        if not hit_rows.size:
+            break
+
+        amount = strategy.stake_amount if action == STAKE else result.alpha
+        quote = engine.stake(hit_rows, amount) if action == STAKE else engine.unstake(hit_rows, amount)
+        # Trades are sent with allow_partial False, so a tolerance below the impact fails (see tolerance_error)
+        fillable = quote.min_tolerance <= strategy.tolerance
+        first = int(np.argmax(fillable))
+        if not fillable[first]:
+            result.failed += len(hit_rows)
+            break
+        result.failed += first
+        i = int(hit_rows[first])
+
+        amount_out = float(quote.amount_out[first])
+        min_tolerance = float(quote.min_tolerance[first])
+        if action == STAKE:
+            result.cash -= amount
+            result.alpha += amount_out
+            price_after = float(prices[i]) * (1 + min_tolerance)
+        else:
+            result.cash += amount_out
+            result.alpha = 0.0
+            result.round_trips += 1
+            price_after = float(prices[i]) * (1 - min_tolerance)
+        result.trades += 1
+        result.slippage.append(float(quote.price_impact[first]))
+        result.fills.append({"block": int(blocks[i]), "action": action, "amount_in": amount, "amount_out": amount_out})
+        strategy.filled(action, price_after)
+        i += 1
+
+    if result.alpha:
+        result.exit_value = float(engine.unstake(valid[-1], result.alpha).amount_out)
+    return result
+
+
+# History opened once per sweep worker process
+_history: Optional[PriceHistory] = None
+
+
+def _open_history(path: str) -> None:
+    global _history
+    _history = PriceHistory(path, readonly=True)
+
+
+def _run_one(task) -> Dict:
+    netuid, threshold, tolerance, amount, start, end, fee = task
+    params = {"netuid": netuid, "threshold": threshold, "tolerance": tolerance, "amount": amount}
+    strategy = ThresholdStrategy(netuid, amount, tolerance, threshold=threshold)
+    result = backtest(
+        strategy,
+        _history.blocks(start, end),
+        _history.window("tao_in", start, end, netuid),
+        _history.window("alpha_in", start, end, netuid),
+        fee=fee,
+        params=params,
+    )
+    return result.as_dict()
+
+
+def sweep(
+    history_path: str,
+    netuids: Iterable[int],
+    thresholds: Iterable[float],
+    tolerances: Iterable[float],
+    amounts: Iterable[float],
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    fee: float = SWAP_FEE,
+    workers: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Backtest every combination of netuid, threshold, tolerance and stake amount.
+
+    Combinations run in a process pool; each worker maps the recorded
+    history once and slices it without copying.
+
+    Args:
+        history_path: PriceHistory directory
+        netuids: Subnets to test
+        thresholds: Price thresholds (in TAO) to test
+        tolerances: Rate tolerances to test
+        amounts: Stake amounts (in TAO) to test
+        start: First block, defaults to the first recorded one
+        end: Last block, defaults to the last recorded one
+        fee: Pool swap fee
+        workers: Worker processes, defaults to the CPU count
+
+    Returns:
+        Result dicts, best PnL first
+    """
+    tasks = [
+        (netuid, threshold, tolerance, amount, start, end, fee)
+        for netuid, threshold, tolerance, amount in itertools.product(netuids, thresholds, tolerances, amounts)
+    ]
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    with Pool(workers, initializer=_open_history, initargs=(history_path,)) as pool:
+        results = pool.map(_run_one, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+    return sorted(results, key=lambda result: result["pnl"], reverse=True)
@@ -0,0 +1,150 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bittensor.utils.balance import Balance
+
+from utils.subnet_cache import get_subnet_cache
+
+
+def _free(value) -> Balance:
+    account = getattr(value, "value", value) or {}
+    return Balance.from_rao(account.get("data", {}).get("free", 0))
+
+
+def read_balances(substrate, addresses: Iterable[str], block_hash: Optional[str] = None) -> Dict[str, Balance]:
+    """
+    Free balance of many accounts, read with one state_queryStorageAt call pinned to one block.
+
+    Args:
+        substrate: SubstrateInterface connection
+        addresses: Account addresses
+        block_hash: Block to read at, defaults to the current head
+
+    Returns:
+        Dict of address -> free balance
+    """
+    addresses = list(dict.fromkeys(addresses))
+    if not addresses:
+        return {}
+    if block_hash is None:
+        block_hash = substrate.get_chain_head()
+    keys = [substrate.create_storage_key("System", "Account", [address]) for address in addresses]
+    by_key = {key.to_hex(): value for key, value in substrate.query_multi(keys, block_hash=block_hash)}
+    return {address: _free(by_key.get(key.to_hex())) for address, key in zip(addresses, keys)}
+
+
+async def read_balances_async(substrate, addresses: Iterable[str], block_hash: Optional[str] = None) -> Dict[str, Balance]:
+    """
+    read_balances() for an AsyncSubstrateInterface connection.
+    """
+    addresses = list(dict.fromkeys(addresses))
+    if not addresses:
+        return {}
+    if block_hash is None:
+        block_hash = await substrate.get_chain_head()
+    keys = [
+        await substrate.create_storage_key("System", "Account", [address], block_hash=block_hash)
+        for address in addresses
+    ]
+    by_key = {key.to_hex(): value for key, value in await substrate.query_multi(keys, block_hash=block_hash)}
+    return {address: _free(by_key.get(key.to_hex())) for address, key in zip(addresses, keys)}
+
+
+class BalanceCache:
+    """
+    Free balances of accounts, cached per block.
+
+    Balances are read at the block of the shared SubnetStateCache, so they
+    line up with the prices served next to them. All accounts not yet cached
+    for that block are read in one query, and the cache is dropped as soon
+    as the head moves, so a page showing any number of wallets costs at most
+    one balance query per block.
+    """
+
+    def __init__(self, network: str):
+        """
+        Args:
+            network: Network name, websocket URL or comma-separated URLs
+        """
+        self.network = network
+        self.subnets = get_subnet_cache(network)
+        # (block_hash, {address: free balance}), replaced when the head moves
+        self._state: Tuple[Optional[str], Dict[str, Balance]] = (None, {})
+        self._lock = threading.Lock()
+
+    @property
+    def block(self) -> Optional[int]:
+        return self.subnets.block
+
+    def _lookup(self, addresses: List[str]) -> Tuple[str, Dict[str, Balance], List[str]]:
+        block_hash = self.subnets.block_hash
+        cached_hash, balances = self._state
+        if cached_hash != block_hash:
+            balances = {}
+        missing = [address for address in addresses if address not in balances]
+        return block_hash, balances, missing
+
+    def _store(self, block_hash: str, fetched: Dict[str, Balance]) -> None:
+        with self._lock:
+            cached_hash, balances = self._state
+            if cached_hash == block_hash:
+                balances = dict(balances, **fetched)
+            elif block_hash == self.subnets.block_hash:
+                balances = fetched
+            else:
+                # The head moved while we were reading; keep whatever is newer
+                return
+            self._state = (block_hash, balances)
+
+    def get(self, substrate, addresses: Iterable[str]) -> Dict[str, Balance]:
+        """
+        Free balance of each address at the cached head block.
+
+        Args:
+            substrate: SubstrateInterface connection used for addresses not cached yet
+            addresses: Account addresses
+
+        Returns:
+            Dict of address -> free balance, in the order given
+        """
+        addresses = list(dict.fromkeys(addresses))
+        self.subnets.wait_ready()
+        block_hash, balances, missing = self._lookup(addresses)
+        if missing:
+            fetched = read_balances(substrate, missing, block_hash=block_hash)
+            self._store(block_hash, fetched)
+            balances = dict(balances, **fetched)
+        return {address: balances[address] for address in addresses}
+
+    async def get_async(
+        self, substrate, addresses: Iterable[str], block_hash: Optional[str] = None,
+    ) -> Dict[str, Balance]:
+        """
+        get() for an AsyncSubstrateInterface connection.
+
+        A block_hash other than the cached head's is read directly and not cached.
+        """
+        addresses = list(dict.fromkeys(addresses))
+        await self.subnets.wait_ready_async()
+        if block_hash is not None and block_hash != self.subnets.block_hash:
+            return await read_balances_async(substrate, addresses, block_hash=block_hash)
+        block_hash, balances, missing = self._lookup(addresses)
+        if missing:
+            fetched = await read_balances_async(substrate, missing, block_hash=block_hash)
+            self._store(block_hash, fetched)
+            balances = dict(balances, **fetched)
+        return {address: balances[address] for address in addresses}
+
+
+_caches: Dict[str, BalanceCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_balance_cache(network: str) -> BalanceCache:
+    """
+    Return the process-wide BalanceCache for a network, creating it on first use.
+    """
+    with _caches_lock:
+        if network not in _caches:
+            _caches[network] = BalanceCache(network)
+        return _caches[network]
@@ -0,0 +1,241 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+from bittensor.utils.balance import Balance
+
+from utils.receipts import dispatch_error, event_parts
+from utils.snapshot import PoolState, take_snapshot
+
+
+# Utility call used for each batch mode: batch_all reverts every item if one
+# fails, force_batch keeps the items that succeeded.
+BATCH_MODES = {
+    "all": "batch_all",
+    "force": "force_batch",
+}
+
+# Largest amount per operation, the same bound the API puts on single trades
+MAX_AMOUNT = 1e9
+
+# Events that carry the outcome of a single staking item
+STAKE_EVENTS = ("StakeAdded", "StakeRemoved", "StakeMoved", "StakeSwapped")
+
+
+def parse_operations(
+    operations: List[Dict],
+    default_hotkey: Optional[str] = None,
+    default_tolerance: float = 0.005,
+) -> List[Dict]:
+    """
+    Validate batch operations and fill in defaults.
+
+    Operations are dicts with an "op" of "add", "remove" or "move":
+        {"op": "add", "netuid": 1, "hotkey": "5...", "amount": 1.0, "tolerance": 0.01}
+        {"op": "remove", "netuid": 1, "hotkey": "5...", "amount": 0.5}
+        {"op": "remove", "netuid": 1, "hotkey": "5...", "all": true}
+        {"op": "move", "origin_netuid": 1, "destination_netuid": 2,
+         "origin_hotkey": "5...", "destination_hotkey": "5...", "amount": 1.0}
+    Amounts are in TAO for "add" and alpha for "remove"/"move"; a missing
+    amount on "remove"/"move" (or "all": true) uses the whole stake.
+    Amounts must be above 0 and at most MAX_AMOUNT, tolerances between 0 and 1.
+
+    Raises:
+        ValueError: If an operation is malformed or out of range
+    """
+    if not operations:
+        raise ValueError("No operations to batch")
+
+    parsed = []
+    for index, operation in enumerate(operations):
+        op = dict(operation)
+        kind = op.get("op")
+        if kind == "add":
+            required = ("netuid", "amount")
+            op.setdefault("hotkey", default_hotkey)
+            op.setdefault("tolerance", default_tolerance)
+        elif kind == "remove":
+            required = ("netuid",)
+            op.setdefault("hotkey", default_hotkey)
+            op.setdefault("tolerance", default_tolerance)
+        elif kind == "move":
+            required = ("origin_netuid", "destination_netuid")
+            op.setdefault("origin_hotkey", default_hotkey)
+            op.setdefault("destination_hotkey", default_hotkey)
+        else:
+            raise ValueError(f"Operation {index}: unknown op {kind!r}")
+
+        missing = [key for key in required if op.get(key) is None]
+        missing += [key for key in ("hotkey", "origin_hotkey", "destination_hotkey") if key in op and not op[key]]
+        if missing:
+            raise ValueError(f"Operation {index}: missing {', '.join(missing)}")
+        if op.pop("all", False):
+            op["amount"] = None
+        for key in ("amount", "tolerance"):
+            if op.get(key) is None:
+                continue
+            try:
+                op[key] = float(op[key])
+            except (TypeError, ValueError):
+                raise ValueError(f"Operation {index}: {key} must be a number")
+        if op.get("amount") is not None and not (math.isfinite(op["amount"]) and 0 < op["amount"] <= MAX_AMOUNT):
+            raise ValueError(f"Operation {index}: amount must be above 0 and at most {MAX_AMOUNT:g}")
+        if op.get("tolerance") is not None and not 0 < op["tolerance"] < 1:
+            raise ValueError(f"Operation {index}: tolerance must be between 0 and 1")
+        parsed.append(op)
+    return parsed
+
+
+def subnet_needed(op: Dict) -> Optional[int]:
+    """
+    Netuid whose pool price is needed to build the operation's limit price, if any.
+    """
+    return op["netuid"] if op["op"] in ("add", "remove") else None
+
+
+def stake_needed(op: Dict) -> Optional[Tuple[str, int]]:
+    """
+    (hotkey, netuid) whose current stake is the operation's amount, if it has none.
+    """
+    if op.get("amount") is not None:
+        return None
+    if op["op"] == "remove":
+        return op["hotkey"], op["netuid"]
+    if op["op"] == "move":
+        return op["origin_hotkey"], op["origin_netuid"]
+    return None
+
+
+def build_call(op: Dict, pool: Optional[PoolState] = None, stake: Optional[Balance] = None) -> Tuple[str, Dict]:
+    """
+    SubtensorModule call function and params for one operation.
+
+    Args:
+        op: Operation returned by parse_operations()
+        pool: Pool state for subnet_needed(op), if any
+        stake: Current stake for stake_needed(op), if any
+
+    Returns:
+        Tuple of (call_function, call_params)
+    """
+    if op["op"] == "add":
+        return "add_stake_limit", {
+            "hotkey": op["hotkey"],
+            "netuid": op["netuid"],
+            "amount_staked": Balance.from_tao(op["amount"]).rao,
+            "limit_price": pool.limit_price(op["tolerance"], buy=True),
+            "allow_partial": False,
+        }
+
+    if op["op"] == "remove":
+        amount = stake if op["amount"] is None else Balance.from_tao(op["amount"], op["netuid"])
+        return "remove_stake_limit", {
+            "hotkey": op["hotkey"],
+            "netuid": op["netuid"],
+            "amount_unstaked": amount.rao - 1,
+            "limit_price": pool.limit_price(op["tolerance"], buy=False),
+            "allow_partial": False,
+        }
+
+    amount = stake if op["amount"] is None else Balance.from_tao(op["amount"], op["origin_netuid"])
+    return "move_stake", {
+        "origin_hotkey": op["origin_hotkey"],
+        "destination_hotkey": op["destination_hotkey"],
+        "origin_netuid": op["origin_netuid"],
+        "destination_netuid": op["destination_netuid"],
+        "alpha_amount": amount.rao - 1,
+    }
+
+
+def decode_batch_events(events, count: int, fallback_error: Optional[str] = None) -> Tuple[bool, List[Dict]]:
+    """
+    Split the events of a proxied batch into per-item results.
+
+    The Utility pallet emits ItemCompleted or ItemFailed after each item, so
+    the staking events seen since the previous boundary belong to that item.
+    A failed batch_all reverts everything and reports its error once on the
+    ProxyExecuted result.
+
+    Args:
+        events: Events triggered by the extrinsic
+        count: Number of operations in the batch
+        fallback_error: Error to report when the extrinsic itself failed
+
+    Returns:
+        Tuple of (every item succeeded, per-item results)
+    """
+    results = []
+    pending = []
+    proxy_error = None
+    proxy_executed = False
+
+    for event in events:
+        module_id, event_id, attributes = event_parts(event)
+        if module_id == "SubtensorModule" and event_id in STAKE_EVENTS:
+            pending.append({"event": event_id, "attributes": attributes})
+        elif module_id == "Utility" and event_id in ("ItemCompleted", "ItemFailed"):
+            error = dispatch_error(attributes) if event_id == "ItemFailed" else None
+            results.append({"success": error is None, "error": error, "events": pending})
+            pending = []
+        elif module_id == "Proxy" and event_id == "ProxyExecuted":
+            proxy_executed = True
+            result = attributes.get("result") if isinstance(attributes, dict) else attributes
+            proxy_error = dispatch_error(result)
+
+    if not proxy_executed:
+        error = fallback_error or "Proxy call was not executed"
+        return False, [{"success": False, "error": error, "events": []} for _ in range(count)]
+
+    if proxy_error is not None and len(results) < count:
+        # batch_all rolled back, so no item took effect
+        return False, [{"success": False, "error": proxy_error, "events": []} for _ in range(count)]
+
+    # force_batch still reports an item when it fails; anything missing never ran
+    while len(results) < count:
+        results.append({"success": False, "error": "Not executed", "events": []})
+
+    return all(result["success"] for result in results), results
+
+
+def compose_batch_call(substrate, delegator: str, ops: List[Dict], mode: str = "all"):
+    """
+    Compose one Utility batch call for parsed operations on a sync substrate connection.
+
+    Pool prices and whole-stake amounts come from a single TradeSnapshot, so
+    every limit price in the batch is built from the same block.
+    """
+    if mode not in BATCH_MODES:
+        raise ValueError(f"Unknown batch mode {mode!r}, expected one of {', '.join(BATCH_MODES)}")
+
+    snapshot = take_snapshot(
+        substrate,
+        delegator,
+        netuids={subnet_needed(op) for op in ops} - {None},
+        positions={stake_needed(op) for op in ops} - {None},
+    )
+    return substrate.compose_call(
+        call_module='Utility',
+        call_function=BATCH_MODES[mode],
+        call_params={'calls': [
+            substrate.compose_call(call_module='SubtensorModule', call_function=call_function, call_params=call_params)
+            for call_function, call_params in batch_calls(snapshot, ops)
+        ]},
+    )
+
+
+def batch_calls(snapshot, ops: List[Dict]) -> List[Tuple[str, Dict]]:
+    """
+    (call_function, call_params) for every operation, priced from a TradeSnapshot.
+
+    Raises:
+        ValueError: If an operation refers to a subnet that does not exist
+    """
+    calls = []
+    for op in ops:
+        netuid = subnet_needed(op)
+        pool = snapshot.pool(netuid) if netuid is not None else None
+        if netuid is not None and pool is None:
+            raise ValueError(f"Subnet with netuid {netuid} does not exist")
+        stake_key = stake_needed(op)
+        stake = snapshot.stake(*stake_key) if stake_key is not None else None
+        calls.append(build_call(op, pool, stake))
+    return calls
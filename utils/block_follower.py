@@ -0,0 +1,202 @@
+import asyncio
+import queue
+import threading
+from typing import Callable, Iterator, List, Optional
+
+from utils.rpc import create_subtensor
+
+
+class Block:
+    """
+    One block delivered by a BlockFollower.
+    """
+
+    __slots__ = ("number", "hash", "events", "extrinsics", "timestamp")
+
+    def __init__(
+        self,
+        number: int,
+        hash: str,
+        events: Optional[List],
+        extrinsics: Optional[List] = None,
+        timestamp: Optional[float] = None,
+    ):
+        self.number = number
+        self.hash = hash
+        self.events = events
+        self.extrinsics = extrinsics
+        # Unix time the block was authored at, if it was fetched
+        self.timestamp = timestamp
+
+    def __repr__(self) -> str:
+        return f"Block({self.number}, {self.hash})"
+
+
+def read_timestamp(substrate, block_hash: str) -> Optional[float]:
+    """
+    Unix time of a block from its Timestamp.Now storage.
+    """
+    now = substrate.query("Timestamp", "Now", block_hash=block_hash)
+    now = getattr(now, "value", now)
+    return now / 1000 if now else None
+
+
+class BlockFollower:
+    """
+    Follow the chain head through a `chain_subscribeNewHeads` subscription.
+
+    A background thread holds the subscription and queues every new head
+    number. Consumers iterate over the follower (or `async for` it, or hand
+    callbacks to follow()) and get each block exactly once, in order: if
+    several heads arrive while a block is being processed, or the
+    subscription drops and reconnects, the blocks in between are fetched by
+    number instead of being skipped. Gaps of `backfill_gap` blocks or more,
+    e.g. after a long reconnect, are fetched concurrently by a Backfill.
+    """
+
+    def __init__(
+        self,
+        network: str,
+        start_block: Optional[int] = None,
+        with_events: bool = True,
+        finalized: bool = False,
+        backfill_gap: int = 8,
+        with_timestamps: bool = False,
+    ):
+        """
+        Args:
+            network: Network name, websocket URL or comma-separated URLs
+            start_block: First block to deliver, defaults to the first new head
+            with_events: Whether to fetch and decode each block's events
+            finalized: Follow finalized heads instead of best heads
+            backfill_gap: Blocks behind the head at which catching up goes concurrent
+            with_timestamps: Whether to read each block's timestamp (one more query per block)
+        """
+        self.network = network
+        self.next_block = start_block
+        self.with_events = with_events
+        self.finalized = finalized
+        self.backfill_gap = backfill_gap
+        self.with_timestamps = with_timestamps
+        self._backfill = None
+        self.subtensor = create_subtensor(network)
+        self._heads: "queue.Queue[Optional[int]]" = queue.Queue()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._subscribe_loop, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._closed.set()
+        self._heads.put(None)
+        if self._backfill is not None:
+            self._backfill.close()
+
+    def __iter__(self) -> Iterator[Block]:
+        while not self._closed.is_set():
+            head = self._latest_head()
+            if head is None:
+                return
+            if self.next_block is None:
+                self.next_block = head
+            if head - self.next_block >= self.backfill_gap:
+                print(f"Backfilling blocks {self.next_block} to {head}")
+                try:
+                    for block in self._get_backfill().blocks(self.next_block, head):
+                        if self._closed.is_set():
+                            return
+                        self.next_block = block.number + 1
+                        yield block
+                except Exception as e:
+                    # Whatever was not delivered is fetched one by one below
+                    print(f"Backfill stopped at block {self.next_block}: {e}")
+            while self.next_block <= head and not self._closed.is_set():
+                block = self._fetch(self.next_block)
+                if block is None:
+                    return
+                self.next_block += 1
+                yield block
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def _aiter(self):
+        blocks = iter(self)
+        done = object()
+        while True:
+            # Waiting and fetching are blocking calls, so each step runs in a thread
+            block = await asyncio.to_thread(next, blocks, done)
+            if block is done:
+                return
+            yield block
+
+    def follow(self, *handlers: Callable[[Block], None]) -> None:
+        """
+        Call every handler with each block, in order, until close() is called.
+        A handler that raises is reported and does not stop the others.
+        """
+        for block in self:
+            for handler in handlers:
+                try:
+                    handler(block)
+                except Exception as e:
+                    print(f"Error handling block {block.number}: {e}")
+
+    def _get_backfill(self):
+        if self._backfill is None:
+            # Imported here because utils.backfill builds on Block
+            from utils.backfill import Backfill
+            self._backfill = Backfill(
+                self.network,
+                with_extrinsics=False,
+                with_events=self.with_events,
+                with_timestamps=self.with_timestamps,
+            )
+        return self._backfill
+
+    def _latest_head(self) -> Optional[int]:
+        """
+        Wait for a new head, then drain the queue to the most recent one.
+        """
+        head = self._heads.get()
+        while head is not None:
+            try:
+                newer = self._heads.get_nowait()
+            except queue.Empty:
+                break
+            if newer is None:
+                return None
+            head = max(head, newer)
+        return head
+
+    def _fetch(self, number: int) -> Optional[Block]:
+        """
+        Block hash and events of a block number, reconnecting until it succeeds
+        or the follower is closed.
+        """
+        while True:
+            try:
+                substrate = self.subtensor.substrate
+                block_hash = substrate.get_block_hash(block_id=number)
+                events = substrate.get_events(block_hash=block_hash) if self.with_events else None
+                timestamp = read_timestamp(substrate, block_hash) if self.with_timestamps else None
+                return Block(number, block_hash, events, timestamp=timestamp)
+            except Exception as e:
+                print(f"Error fetching block {number}: {e}")
+                if self._closed.wait(1):
+                    return None
+                self.subtensor = create_subtensor(self.network)
+
+    def _on_head(self, obj, update_nr, subscription_id):
+        if self._closed.is_set():
+            # A non-None return value ends the subscription
+            return True
+        self._heads.put(int(obj["header"]["number"]))
+
+    def _subscribe_loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                substrate = create_subtensor(self.network).substrate
+                substrate.subscribe_block_headers(self._on_head, finalized_only=self.finalized)
+            except Exception as e:
+                print(f"Head subscription dropped: {e}")
+            self._closed.wait(1)
@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from substrateinterface import ExtrinsicReceipt, SubstrateInterface
+from substrateinterface.exceptions import SubstrateRequestException
+
+from utils.nonce import NotIncludedError
+from utils.rpc import resolve_endpoints
+
+
+def broadcast_endpoints(network: str) -> List[str]:
+    """
+    Nodes to broadcast to: BROADCAST_ENDPOINTS if set, otherwise every endpoint of the network.
+    """
+    configured = os.getenv("BROADCAST_ENDPOINTS", "")
+    urls = [url.strip() for url in configured.split(",") if url.strip()]
+    return urls or resolve_endpoints(network)
+
+
+class ExtrinsicBroadcaster:
+    """
+    Pushes the same signed extrinsic to several nodes at once.
+
+    The signed bytes go out through `author_submitExtrinsic` on every node in
+    parallel, so a slow gossip path from one node no longer costs the
+    one-block validity window. A single tracker then watches new blocks on
+    the caller's connection until the extrinsic shows up. The report lists
+    which nodes acknowledged it and how fast; every node holds the same
+    bytes, so which copy the block author used cannot be told.
+    """
+
+    def __init__(self, urls: List[str], max_blocks: int = 4, poll_interval: float = 0.25):
+        """
+        Initialize the broadcaster.
+
+        Args:
+            urls: Websocket URLs of the nodes to submit to
+            max_blocks: Blocks to watch for inclusion before giving up
+            poll_interval: Seconds between head checks while tracking
+        """
+        if not urls:
+            raise ValueError("At least one broadcast endpoint is required")
+        self.urls = urls
+        self.max_blocks = max_blocks
+        self.poll_interval = poll_interval
+        self._connections: Dict[str, SubstrateInterface] = {}
+        self._locks = {url: threading.Lock() for url in urls}
+        self._executor = ThreadPoolExecutor(max_workers=len(urls))
+
+    def submit(
+        self,
+        substrate: SubstrateInterface,
+        extrinsic,
+        wait_for_inclusion: bool = True,
+    ) -> Tuple[Optional[ExtrinsicReceipt], Dict]:
+        """
+        Broadcast a signed extrinsic and optionally wait for it to be included.
+
+        Args:
+            substrate: Connection used to track inclusion and read the receipt
+            extrinsic: Signed extrinsic
+            wait_for_inclusion: Whether to watch blocks until it is included
+
+        Returns:
+            Tuple of (receipt, broadcast report)
+
+        Raises:
+            SubstrateRequestException: If no node accepted the extrinsic
+            NotIncludedError: If it was accepted but not included within max_blocks
+        """
+        data = str(extrinsic.data)
+        extrinsic_hash = f"0x{extrinsic.extrinsic_hash.hex()}"
+        from_block = self._head(substrate)
+
+        report = self.push(data)
+        report["extrinsic_hash"] = extrinsic_hash
+        if report["first_ack"] is None:
+            raise SubstrateRequestException(next(iter(report["errors"].values())))
+
+        if not wait_for_inclusion:
+            return ExtrinsicReceipt(substrate=substrate, extrinsic_hash=extrinsic_hash), report
+
+        receipt = self._track(substrate, data, extrinsic_hash, from_block)
+        if receipt is None:
+            raise NotIncludedError(f"Extrinsic {extrinsic_hash} was not included in time", report)
+        report["block_number"] = receipt.block_number
+        return receipt, report
+
+    def push(self, data: str) -> Dict:
+        """
+        Submit encoded extrinsic bytes to every node in parallel without tracking inclusion.
+
+        Returns:
+            Report with the first node to acknowledge, per-node ack latency and errors;
+            an extrinsic any node acknowledged may be included
+        """
+        report = {
+            "first_ack": None,
+            "acks_ms": {},
+            "errors": {},
+            "block_number": None,
+        }
+        started = time.monotonic()
+        futures = {self._executor.submit(self._submit_to, url, data): url for url in self.urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                # A node that already got it by gossip still counts as delivered
+                if "already imported" not in str(e).lower():
+                    report["errors"][url] = str(e)
+                    continue
+            report["acks_ms"][url] = round((time.monotonic() - started) * 1000, 1)
+            if report["first_ack"] is None:
+                report["first_ack"] = url
+        return report
+
+    def _submit_to(self, url: str, data: str) -> str:
+        with self._locks[url]:
+            try:
+                if url not in self._connections:
+                    self._connections[url] = SubstrateInterface(url=url, ss58_format=42)
+                response = self._connections[url].rpc_request("author_submitExtrinsic", [data])
+            except SubstrateRequestException:
+                raise
+            except Exception:
+                # Drop the connection so the next broadcast reconnects
+                self._connections.pop(url, None)
+                raise
+        if 'result' not in response:
+            raise SubstrateRequestException(response.get('error'))
+        return response['result']
+
+    def _track(
+        self,
+        substrate: SubstrateInterface,
+        data: str,
+        extrinsic_hash: str,
+        from_block: int,
+    ) -> Optional[ExtrinsicReceipt]:
+        # Compare raw extrinsic bytes so blocks never need to be decoded
+        checked = from_block
+        last_block = from_block + self.max_blocks
+        while checked < last_block:
+            head = self._head(substrate)
+            while checked < min(head, last_block):
+                checked += 1
+                block_hash = substrate.get_block_hash(checked)
+                block = substrate.rpc_request('chain_getBlock', [block_hash])['result']['block']
+                if data in block['extrinsics']:
+                    return ExtrinsicReceipt(
+                        substrate=substrate,
+                        extrinsic_hash=extrinsic_hash,
+                        block_hash=block_hash,
+                        block_number=checked,
+                        extrinsic_idx=block['extrinsics'].index(data),
+                    )
+            time.sleep(self.poll_interval)
+        return None
+
+    @staticmethod
+    def _head(substrate: SubstrateInterface) -> int:
+        return int(substrate.rpc_request('chain_getHeader', [])['result']['number'], 16)
@@ -0,0 +1,290 @@
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from utils.events import decode_stake_events
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+STAKE_COLUMNS = (
+    "block", "idx", "timestamp", "type", "coldkey", "hotkey", "netuid",
+    "amount", "alpha", "origin_hotkey", "origin_netuid",
+)
+SWAP_COLUMNS = ("block", "timestamp", "old_coldkey", "new_coldkey", "netuid")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stake_events (
+    block INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    timestamp REAL,
+    type TEXT NOT NULL,
+    coldkey TEXT,
+    hotkey TEXT,
+    netuid INTEGER,
+    amount INTEGER,
+    alpha INTEGER,
+    origin_hotkey TEXT,
+    origin_netuid INTEGER,
+    PRIMARY KEY (block, idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS stake_events_coldkey ON stake_events (coldkey, netuid, timestamp);
+CREATE INDEX IF NOT EXISTS stake_events_hotkey ON stake_events (hotkey, netuid, timestamp);
+CREATE INDEX IF NOT EXISTS stake_events_netuid ON stake_events (netuid, timestamp);
+CREATE INDEX IF NOT EXISTS stake_events_timestamp ON stake_events (timestamp);
+
+CREATE TABLE IF NOT EXISTS coldkey_swaps (
+    block INTEGER NOT NULL,
+    timestamp REAL,
+    old_coldkey TEXT NOT NULL,
+    new_coldkey TEXT,
+    netuid INTEGER,
+    PRIMARY KEY (block, old_coldkey)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS coldkey_swaps_old ON coldkey_swaps (old_coldkey);
+CREATE INDEX IF NOT EXISTS coldkey_swaps_new ON coldkey_swaps (new_coldkey);
+CREATE INDEX IF NOT EXISTS coldkey_swaps_netuid ON coldkey_swaps (netuid, block);
+"""
+
+
+def block_timestamp(block) -> Optional[float]:
+    """
+    Unix time of a block, as fetched with it or from its Timestamp.set extrinsic, or None if unknown.
+    """
+    if getattr(block, "timestamp", None) is not None:
+        return block.timestamp
+    for ex in block.extrinsics or ():
+        call = ex.value.get("call", {})
+        if call.get("call_module") == "Timestamp" and call.get("call_function") == "set":
+            for arg in call.get("call_args", []):
+                if arg["name"] == "now":
+                    return arg["value"] / 1000
+    return None
+
+
+class EventStore:
+    """
+    SQLite store of decoded stake events and coldkey swaps.
+
+    Meant to be a BlockFollower or Backfill handler: add_block() decodes a
+    block's staking events and buffers them, and rows are written in one
+    transaction every `batch_size` rows or `flush_interval` seconds. The
+    database runs in WAL mode, so other processes can query it while a
+    watcher is writing. Rows are keyed by block and on-chain event index, so
+    re-feeding a range after a restart does not duplicate them. Timestamps
+    are the block's own (see block_timestamp()); feed blocks fetched with
+    their timestamps or extrinsics, as rows of other blocks get a NULL one.
+    """
+
+    def __init__(self, path: str = "events.db", batch_size: int = 500, flush_interval: float = 12.0):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite database file
+            batch_size: Buffered rows that trigger a write
+            flush_interval: Seconds after which buffered rows are written anyway
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._stake_rows: List[tuple] = []
+        self._swap_rows: List[tuple] = []
+        self._flushed_at = time.monotonic()
+
+    def add_block(self, block, stake_events: Optional[List] = None) -> int:
+        """
+        Buffer the staking events of a block.
+
+        Args:
+            block: Block from a BlockFollower or Backfill
+            stake_events: The block's events already decoded by decode_stake_events, if at hand
+
+        Returns:
+            Number of events buffered
+        """
+        if stake_events is None:
+            stake_events = decode_stake_events(block.events or [])
+        timestamp = block_timestamp(block)
+        rows = [
+            (
+                block.number, event.index, timestamp, event.type, event.coldkey, event.hotkey, event.netuid,
+                event.amount, event.alpha, event.origin_hotkey, event.origin_netuid,
+            )
+            for event in stake_events
+        ]
+        with self._lock:
+            self._stake_rows.extend(rows)
+        self._maybe_flush()
+        return len(rows)
+
+    def add_coldkey_swaps(self, block_number: int, swaps: Iterable[Dict], timestamp: Optional[float] = None) -> None:
+        """
+        Buffer coldkey swaps as reported by ColdkeySwapFetcher (old_coldkey, new_coldkey, subnet).
+        The timestamp is the block's (see block_timestamp()), NULL if unknown.
+        """
+        rows = [
+            (block_number, timestamp, swap["old_coldkey"], swap["new_coldkey"], swap.get("subnet"))
+            for swap in swaps
+        ]
+        with self._lock:
+            self._swap_rows.extend(rows)
+        self._maybe_flush()
+
+    def flush(self) -> None:
+        """
+        Write every buffered row in one transaction.
+        """
+        with self._lock:
+            stake_rows, self._stake_rows = self._stake_rows, []
+            swap_rows, self._swap_rows = self._swap_rows, []
+            self._flushed_at = time.monotonic()
+            if not stake_rows and not swap_rows:
+                return
+            with self._db:
+                self._db.executemany(
+                    f"INSERT OR IGNORE INTO stake_events ({', '.join(STAKE_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(STAKE_COLUMNS))})",
+                    stake_rows,
+                )
+                self._db.executemany(
+                    f"INSERT OR IGNORE INTO coldkey_swaps ({', '.join(SWAP_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(SWAP_COLUMNS))})",
+                    swap_rows,
+                )
+
+    def _maybe_flush(self) -> None:
+        pending = len(self._stake_rows) + len(self._swap_rows)
+        if pending >= self.batch_size or time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flows(
+        self,
+        coldkey: Optional[str] = None,
+        hotkey: Optional[str] = None,
+        netuid: Optional[int] = None,
+        types: Optional[Iterable[str]] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Stake events matching every given filter, oldest first.
+
+        Args:
+            coldkey: Coldkey SS58 address
+            hotkey: Hotkey SS58 address (the destination for moves and swaps)
+            netuid: Subnet (the destination for moves and swaps)
+            types: Event types, e.g. ("StakeAdded", "StakeRemoved")
+            since: Unix time of the earliest event
+            until: Unix time of the latest event
+            limit: Most rows to return
+
+        Returns:
+            List of event dicts with amounts in rao and amount_tao
+        """
+        filters = {"coldkey = ?": coldkey, "hotkey = ?": hotkey, "netuid = ?": netuid,
+                   "timestamp >= ?": since, "timestamp <= ?": until}
+        clauses = [clause for clause, value in filters.items() if value is not None]
+        params = [value for value in filters.values() if value is not None]
+        if types:
+            types = list(types)
+            clauses.append(f"type IN ({', '.join('?' * len(types))})")
+            params += types
+
+        query = "SELECT * FROM stake_events"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY block, idx"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [dict(row, amount_tao=(row["amount"] or 0) / 1e9) for row in rows]
+
+    def coldkey_swaps(self, coldkey: Optional[str] = None, netuid: Optional[int] = None) -> List[Dict]:
+        """
+        Recorded coldkey swaps from or to a coldkey and/or of a subnet, oldest first.
+        """
+        query = "SELECT * FROM coldkey_swaps"
+        clauses, params = [], []
+        if coldkey is not None:
+            clauses.append("(old_coldkey = ? OR new_coldkey = ?)")
+            params += [coldkey, coldkey]
+        if netuid is not None:
+            clauses.append("netuid = ?")
+            params.append(netuid)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY block"
+        with self._lock:
+            return [dict(row) for row in self._db.execute(query, params).fetchall()]
+
+    def last_block(self) -> Optional[int]:
+        """
+        Highest block with a stored stake event, to resume a backfill from.
+        """
+        with self._lock:
+            return self._db.execute("SELECT MAX(block) FROM stake_events").fetchone()[0]
+
+    def export_parquet(self, path: str, table: str = "stake_events", batch_rows: int = 100_000) -> int:
+        """
+        Write a table to a Parquet file, in row groups of `batch_rows`.
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            RuntimeError: If pyarrow is not installed
+        """
+        if pq is None:
+            raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+        if table not in ("stake_events", "coldkey_swaps"):
+            raise ValueError(f"Unknown table {table}")
+        self.flush()
+
+        columns = STAKE_COLUMNS if table == "stake_events" else SWAP_COLUMNS
+        # Explicit types, so a batch whose column is all NULL still matches the others
+        types = {"timestamp": pa.float64(), "amount": pa.int64(), "alpha": pa.int64()}
+        schema = pa.schema([
+            (name, types.get(name, pa.int64() if name in ("block", "idx") or name.endswith("netuid") else pa.string()))
+            for name in columns
+        ])
+        writer = None
+        written = 0
+        with self._lock:
+            cursor = self._db.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY block")
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_rows)
+                    if not rows:
+                        break
+                    batch = pa.Table.from_pydict(
+                        {name: [row[i] for row in rows] for i, name in enumerate(columns)}, schema=schema,
+                    )
+                    if writer is None:
+                        writer = pq.ParquetWriter(path, schema)
+                    writer.write_table(batch)
+                    written += len(rows)
+            finally:
+                if writer is not None:
+                    writer.close()
+        return written
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._db.close()
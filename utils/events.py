@@ -0,0 +1,127 @@
+from functools import lru_cache
+from typing import List, Optional
+
+from scalecodec.utils.ss58 import ss58_encode
+
+from utils.receipts import event_parts
+
+
+SS58_FORMAT = 42
+
+STAKE_EVENT_IDS = frozenset(("StakeAdded", "StakeRemoved", "StakeMoved", "StakeSwapped"))
+
+
+class StakeEvent:
+    """
+    One decoded SubtensorModule staking event.
+
+    `hotkey`/`netuid` are the position that was staked into or out of; for
+    StakeMoved and StakeSwapped they are the destination, and the origin is
+    in `origin_hotkey`/`origin_netuid`. Amounts are in rao. `index` is the
+    event's position in the events it was decoded from, i.e. its on-chain
+    event index when those are a whole block's events.
+    """
+
+    __slots__ = ("type", "coldkey", "hotkey", "netuid", "amount", "alpha", "origin_hotkey", "origin_netuid", "index")
+
+    def __init__(
+        self,
+        type: str,
+        coldkey: Optional[str],
+        hotkey: Optional[str],
+        netuid: Optional[int],
+        amount: Optional[int],
+        alpha: Optional[int] = None,
+        origin_hotkey: Optional[str] = None,
+        origin_netuid: Optional[int] = None,
+        index: Optional[int] = None,
+    ):
+        self.type = type
+        self.coldkey = coldkey
+        self.hotkey = hotkey
+        self.netuid = netuid
+        self.amount = amount
+        self.alpha = alpha
+        self.origin_hotkey = origin_hotkey
+        self.origin_netuid = origin_netuid
+        self.index = index
+
+    @property
+    def amount_tao(self) -> float:
+        return self.amount / 1e9 if self.amount else 0.0
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__} | {"amount_tao": self.amount_tao}
+
+    def __repr__(self) -> str:
+        return f"StakeEvent({self.type}, SN{self.netuid}, {self.amount_tao} TAO, {self.coldkey})"
+
+
+@lru_cache(maxsize=65536)
+def _encode(account, ss58_format: int) -> str:
+    return ss58_encode(bytes(account), ss58_format=ss58_format)
+
+
+def to_ss58(account, ss58_format: int = SS58_FORMAT) -> Optional[str]:
+    """
+    SS58 address of an AccountId as decoded by either substrate client.
+
+    substrate-interface already returns an address string; the bittensor
+    client returns the public key as a (possibly nested) tuple of ints.
+    Encodings are memoized, so the handful of keys that trade every block
+    are hex-converted and checksummed once.
+    """
+    if account is None or isinstance(account, str):
+        return account
+    if isinstance(account, (tuple, list)) and len(account) == 1 and not isinstance(account[0], int):
+        account = account[0]
+    if isinstance(account, list):
+        account = tuple(account)
+    return _encode(account, ss58_format)
+
+
+def _decode(event_id: str, attributes) -> Optional[StakeEvent]:
+    if isinstance(attributes, dict):
+        attributes = tuple(attributes.values())
+    if event_id in ("StakeAdded", "StakeRemoved") and len(attributes) >= 5:
+        # (coldkey, hotkey, tao, alpha, netuid, ...)
+        return StakeEvent(
+            event_id, to_ss58(attributes[0]), to_ss58(attributes[1]),
+            attributes[4], attributes[2], alpha=attributes[3],
+        )
+    if event_id == "StakeMoved" and len(attributes) >= 6:
+        # (coldkey, origin_hotkey, origin_netuid, destination_hotkey, destination_netuid, tao)
+        return StakeEvent(
+            event_id, to_ss58(attributes[0]), to_ss58(attributes[3]), attributes[4], attributes[5],
+            origin_hotkey=to_ss58(attributes[1]), origin_netuid=attributes[2],
+        )
+    if event_id == "StakeSwapped" and len(attributes) >= 5:
+        # (coldkey, hotkey, origin_netuid, destination_netuid, tao)
+        hotkey = to_ss58(attributes[1])
+        return StakeEvent(
+            event_id, to_ss58(attributes[0]), hotkey, attributes[3], attributes[4],
+            origin_hotkey=hotkey, origin_netuid=attributes[2],
+        )
+    return None
+
+
+def decode_stake_events(events) -> List[StakeEvent]:
+    """
+    Decode every StakeAdded/StakeRemoved/StakeMoved/StakeSwapped event of a block in one pass.
+
+    Args:
+        events: Events from get_events() or receipt.triggered_events, from either substrate client
+
+    Returns:
+        List of StakeEvent in block order
+    """
+    stake_events = []
+    for index, event in enumerate(events):
+        module_id, event_id, attributes = event_parts(event)
+        if module_id != "SubtensorModule" or event_id not in STAKE_EVENT_IDS:
+            continue
+        stake_event = _decode(event_id, attributes)
+        if stake_event is not None:
+            stake_event.index = index
+            stake_events.append(stake_event)
+    return stake_events
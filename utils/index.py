@@ -1,7 +1,11 @@
 import re
 
-def get_sn_price(subtensor, netuid):
-    subnet = subtensor.subnet(netuid=netuid)
+from utils.subnet_cache import get_subnet_cache
+
+def get_sn_price(subtensor, netuid, network=None):
+    # Served from the per-block subnet cache of the network, shared with everything else using it.
+    # Pass the configured network when the subtensor was opened on a URL.
+    subnet = get_subnet_cache(network or subtensor.network).subnet(netuid)
     if subnet is None:
         raise Exception(f"Subnet is None for netuid: {netuid}")
     sn_price_raw = subnet.alpha_to_tao(1)
@@ -29,113 +33,6 @@ def convert_alpha_to_float(raw_amount):
 
     return amount
 
-# Convert coldkey and hotkey to ss58 addresses if possible
-def to_ss58(subtensor, addr_bytes, ss58_format = 42):
-    if addr_bytes is None:
-        return None
-    pubkey_bytes = bytes(addr_bytes).hex()
-    if not pubkey_bytes.startswith("0x"):
-        pubkey_bytes = "0x" + pubkey_bytes
-    return subtensor.substrate.ss58_encode(pubkey_bytes, ss58_format=ss58_format)
-    
-def extract_stake_events_from_data(subtensor, events_data):
-    """
-    Extract stake and unstake events from blockchain event data.
-    
-    Args:
-        events_data: List of event dictionaries from blockchain
-    
-    Returns:
-        List of dictionaries containing stake/unstake event information
-    """
-    stake_events = []
-    
-    for event in events_data:
-        event_info = event.get('event', {})
-        
-        # Check if this is a SubtensorModule event
-        if not event_info.get('module_id') == 'SubtensorModule':
-            continue
-
-        event_id = event_info.get('event_id')
-        attributes = event_info.get('attributes', {})
-        
-           
-        if event_id == 'StakeAdded':
-            # The attributes for StakeAdded are a tuple, not a dict.
-            # Example: (
-            #   ((coldkey_bytes,), (hotkey_bytes,), amount, stake, netuid, block_number)
-            # )
-            # So we need to unpack the tuple accordingly.
-            if isinstance(attributes, tuple) and len(attributes) >= 6:
-                coldkey_tuple = to_ss58(subtensor, attributes[0][0]) if isinstance(attributes[0], tuple) and len(attributes[0]) > 0 else attributes[0]
-                hotkey_tuple = to_ss58(subtensor, attributes[1][0]) if isinstance(attributes[1], tuple) and len(attributes[1]) > 0 else attributes[1]
-                amount = attributes[2]
-                # attributes[3] is stake, but we use amount for TAO
-                netuid = attributes[4]
-            else:
-                coldkey_tuple = None
-                hotkey_tuple = None
-                amount = None
-                netuid = None
-            stake_events.append({
-                'type': 'StakeAdded',
-                'coldkey': coldkey_tuple,
-                'hotkey': hotkey_tuple,
-                'netuid': netuid,
-                'amount': amount,
-                'amount_tao': amount / 1e9 if amount else 0,
-            })
-            
-        elif event_id == 'StakeRemoved':
-            # Extract unstake information - also a tuple
-            if isinstance(attributes, tuple) and len(attributes) >= 6:
-                coldkey_tuple = to_ss58(subtensor, attributes[0][0]) if isinstance(attributes[0], tuple) and len(attributes[0]) > 0 else attributes[0]
-                hotkey_tuple = to_ss58(subtensor, attributes[1][0]) if isinstance(attributes[1], tuple) and len(attributes[1]) > 0 else attributes[1]
-                amount = attributes[2]
-                netuid = attributes[4]
-            else:
-                coldkey_tuple = None
-                hotkey_tuple = None
-                amount = None
-                netuid = None
-
-            stake_events.append({
-                'type': 'StakeRemoved',
-                'coldkey': coldkey_tuple,
-                'hotkey': hotkey_tuple,
-                'netuid': netuid,
-                'amount': amount,
-                'amount_tao': amount / 1e9 if amount else 0,
-            })
-            
-        elif event_id == 'StakeMoved':
-            # Extract stake move information - also a tuple
-            if isinstance(attributes, tuple) and len(attributes) >= 6:
-                coldkey_tuple = to_ss58(subtensor, attributes[0][0]) if isinstance(attributes[0], tuple) and len(attributes[0]) > 0 else attributes[0]
-                from_hotkey_tuple = to_ss58(subtensor, attributes[1][0]) if isinstance(attributes[1], tuple) and len(attributes[1]) > 0 else attributes[1]
-                to_hotkey_tuple = to_ss58(subtensor, attributes[3][0]) if isinstance(attributes[3], tuple) and len(attributes[3]) > 0 else attributes[3]
-                netuid = attributes[4]
-                amount = attributes[5]
-            else:
-                coldkey_tuple = None
-                from_hotkey_tuple = None
-                to_hotkey_tuple = None
-                netuid = None
-                amount = None
-            
-            stake_events.append({
-                'type': 'StakeMoved',
-                'coldkey': coldkey_tuple,
-                'from_hotkey': from_hotkey_tuple,
-                'to_hotkey': to_hotkey_tuple,
-                'netuid': netuid,
-                'amount': amount,
-                'amount_tao': amount / 1e9 if amount else 0,
-            })
-
-    return stake_events
-
 # def print_stake_events(subtensor, stake_events):
 #     now_subnet_infos = subtensor.all_subnets()
 #     prices = [float(subnet_info.price) for subnet_info in now_subnet_infos]
@@ -0,0 +1,195 @@
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from utils.subnet_cache import get_subnet_cache
+
+
+# Google Docs exported as text: one lists bot coldkeys, the other "<coldkey> <owner name>" pairs
+BOTS_URL = "https://docs.google.com/document/d/1Vdm20cXVAK-kjgjBw9XcbVYaAvvCWyY8IuPLAE2aRBI/export?format=txt"
+WALLET_OWNERS_URL = "https://docs.google.com/document/d/1VUDA8mzHd_iUQEqiDWMORys6--2ab8nDSThGb--_PaQ/export?format=txt"
+
+SS58_PATTERN = r'5[1-9A-HJ-NP-Za-km-z]{47}'
+
+# Seconds between attempts until the first refresh succeeds
+RETRY_INTERVAL = 5.0
+
+OWNER_COLOR = "\033[93m"
+BOT_COLOR = "\033[94m"
+RESET = "\033[0m"
+
+
+class LabelIndex:
+    """
+    Dict-backed labels for coldkeys: subnet owners, known bots and named wallets.
+
+    A background thread refreshes the three sources every `refresh_interval`
+    seconds. The documents are fetched with conditional requests, so an
+    unchanged document costs a 304 and is not parsed again; owners come from
+    the shared SubnetStateCache and only the netuids whose owner_coldkey
+    changed are touched. Each refresh builds new dicts and swaps them in at
+    once, so lookups, which are single dict reads, never see a half-built index.
+    """
+
+    def __init__(self, network: str, refresh_interval: float = 1200.0):
+        """
+        Initialize the index and start refreshing it in the background.
+
+        Args:
+            network: Network name, websocket URL or comma-separated URLs
+            refresh_interval: Seconds between refreshes
+        """
+        self.network = network
+        self.refresh_interval = refresh_interval
+        # netuid -> owner coldkey, as last read from the chain
+        self._owner_by_netuid: Dict[int, str] = {}
+        # (owners: coldkey -> lowest owned netuid, bots: coldkey -> bot number, wallets: coldkey -> name)
+        self._state: Tuple[Dict[str, int], Dict[str, int], Dict[str, str]] = ({}, {}, {})
+        # url -> (ETag, Last-Modified) of the last successful fetch
+        self._validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._thread.start()
+
+    def wait_ready(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        Block until the first refresh has finished.
+        """
+        return self._ready.wait(timeout)
+
+    def owner_netuid(self, coldkey: str) -> Optional[int]:
+        """
+        Netuid owned by a coldkey (the lowest if it owns several), or None.
+        """
+        return self._state[0].get(coldkey)
+
+    def bot_number(self, coldkey: str) -> Optional[int]:
+        return self._state[1].get(coldkey)
+
+    def wallet_name(self, coldkey: str) -> Optional[str]:
+        return self._state[2].get(coldkey)
+
+    def label(self, coldkey: Optional[str]) -> Optional[str]:
+        """
+        Plain label of a coldkey ("owner19", "bot3", or its wallet name), or None.
+        """
+        if coldkey is None:
+            return None
+        owners, bots, wallets = self._state
+        if coldkey in owners:
+            return f"owner{owners[coldkey]}"
+        if coldkey in bots:
+            return f"bot{bots[coldkey]}"
+        return wallets.get(coldkey)
+
+    def display_name(self, coldkey: Optional[str]) -> str:
+        """
+        Coldkey followed by its colored label, for terminal output.
+        """
+        if coldkey is None:
+            return "Unknown"
+        label = self.label(coldkey)
+        if label is None:
+            return coldkey
+        color = BOT_COLOR if label.startswith("bot") else OWNER_COLOR
+        return coldkey + f"{color} ({label}){RESET}"
+
+    def refresh(self) -> List[Tuple[int, Optional[str], Optional[str]]]:
+        """
+        Refresh every source and swap in the new index.
+
+        Returns:
+            (netuid, old owner, new owner) for every subnet whose owner changed
+        """
+        owner_changes = self.refresh_owners()
+        _, bots, wallets = self._state
+
+        text = self._fetch(BOTS_URL)
+        if text is not None:
+            bots = {coldkey: number for number, coldkey in reversed(list(enumerate(re.findall(SS58_PATTERN, text), 1)))}
+
+        text = self._fetch(WALLET_OWNERS_URL)
+        if text is not None:
+            wallets = dict(re.findall(rf'({SS58_PATTERN})\s+([^\s]+)', text))
+
+        with self._lock:
+            self._state = (self._state[0], bots, wallets)
+        self._ready.set()
+        return owner_changes
+
+    def close(self) -> None:
+        self._closed.set()
+
+    def refresh_owners(self) -> List[Tuple[int, Optional[str], Optional[str]]]:
+        """
+        Diff every subnet's owner_coldkey against the last read and swap in the
+        owners if any changed. Reads the shared subnet cache, so it costs no RPC.
+
+        Returns:
+            (netuid, old owner, new owner) for every subnet whose owner changed
+        """
+        current = {subnet.netuid: subnet.owner_coldkey for subnet in get_subnet_cache(self.network).all_subnets()}
+        changes = [
+            (netuid, self._owner_by_netuid.get(netuid), current.get(netuid))
+            for netuid in sorted(set(current) | set(self._owner_by_netuid))
+            if current.get(netuid) != self._owner_by_netuid.get(netuid)
+        ]
+        if not changes:
+            return changes
+        if self._owner_by_netuid:
+            for netuid, old, new in changes:
+                print(f"SN{netuid} owner changed from {old} to {new}")
+        self._owner_by_netuid = current
+        # Lowest netuid wins for a coldkey that owns several subnets
+        owners = {current[netuid]: netuid for netuid in sorted(current, reverse=True)}
+        with self._lock:
+            self._state = (owners,) + self._state[1:]
+        return changes
+
+    def _fetch(self, url: str) -> Optional[str]:
+        """
+        Body of a document if it changed since the last fetch, else None.
+        """
+        etag, last_modified = self._validators.get(url, (None, None))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            response = requests.get(url, headers=headers, timeout=10)
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Failed to load {url}: {e}")
+            return None
+        self._validators[url] = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return response.text
+
+    def _refresh_loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing coldkey labels: {e}")
+            # Until one refresh has worked there are no labels at all, so retry soon
+            self._closed.wait(self.refresh_interval if self._ready.is_set() else RETRY_INTERVAL)
+
+
+_indexes: Dict[str, LabelIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_label_index(network: str) -> LabelIndex:
+    """
+    Return the process-wide LabelIndex for a network, creating it on first use.
+    """
+    with _indexes_lock:
+        if network not in _indexes:
+            _indexes[network] = LabelIndex(network)
+        return _indexes[network]
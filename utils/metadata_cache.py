@@ -0,0 +1,100 @@
+import glob
+import os
+import threading
+from typing import Dict, Tuple
+
+from scalecodec.base import ScaleBytes
+from substrateinterface import SubstrateInterface
+from substrateinterface.exceptions import SubstrateRequestException
+
+
+# Raw runtime metadata, one file per genesis hash and spec version
+METADATA_CACHE_DIR = os.path.expanduser(os.getenv("METADATA_CACHE_DIR", "~/.cache/bt-script/metadata"))
+
+_lock = threading.Lock()
+_genesis: Dict[str, str] = {}
+_decoded: Dict[Tuple[str, int], object] = {}
+
+
+class CachedSubstrateInterface(SubstrateInterface):
+    """
+    SubstrateInterface that loads runtime metadata from a disk cache.
+
+    Metadata is keyed by genesis hash and runtime spec version; the spec
+    version is the one `init_runtime` just fetched with `state_getRuntimeVersion`,
+    so only a runtime upgrade downloads the full `state_getMetadata` blob
+    again. Decoded metadata is also shared between every connection in
+    the process, so a pool of connections decodes it once.
+    """
+
+    # (block hash, runtime version) of the last state_getRuntimeVersion call
+    _runtime_info = (None, None)
+
+    def get_block_runtime_version(self, block_hash):
+        runtime_info = super().get_block_runtime_version(block_hash)
+        self._runtime_info = (block_hash, runtime_info)
+        return runtime_info
+
+    def get_block_metadata(self, block_hash=None, decode=True):
+        if not decode:
+            return super().get_block_metadata(block_hash=block_hash, decode=decode)
+
+        # init_runtime() has just asked for the version of this block, so don't ask again
+        runtime_hash, runtime_info = self._runtime_info
+        if block_hash is None or runtime_hash != block_hash or runtime_info is None:
+            runtime_info = self.get_block_runtime_version(block_hash=block_hash)
+        if runtime_info is None:
+            raise SubstrateRequestException(f"No runtime information for block '{block_hash}'")
+        key = (self._genesis_hash(), runtime_info["specVersion"])
+
+        with _lock:
+            if key in _decoded:
+                return _decoded[key]
+
+        path = os.path.join(METADATA_CACHE_DIR, f"{key[0]}_{key[1]}.hex")
+        metadata_hex = _read(path)
+        if metadata_hex is None:
+            response = super().get_block_metadata(block_hash=block_hash, decode=False)
+            metadata_hex = response.get('result')
+            if not metadata_hex:
+                return response
+            _write(path, metadata_hex, key[0])
+
+        metadata = self.runtime_config.create_scale_object('MetadataVersioned', data=ScaleBytes(metadata_hex))
+        metadata.decode()
+        with _lock:
+            return _decoded.setdefault(key, metadata)
+
+    def _genesis_hash(self) -> str:
+        with _lock:
+            if self.url in _genesis:
+                return _genesis[self.url]
+        genesis_hash = self.get_block_hash(0)
+        with _lock:
+            _genesis[self.url] = genesis_hash
+        return genesis_hash
+
+
+def _read(path: str):
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write(path: str, metadata_hex: str, genesis_hash: str) -> None:
+    """
+    Store metadata atomically and drop files of older runtimes of the same chain.
+    """
+    try:
+        os.makedirs(METADATA_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(metadata_hex)
+        os.replace(tmp_path, path)
+        for old_path in glob.glob(os.path.join(METADATA_CACHE_DIR, f"{genesis_hash}_*.hex")):
+            if old_path != path:
+                os.remove(old_path)
+    except OSError as e:
+        print(f"Could not write metadata cache {path}: {e}")
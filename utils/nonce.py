@@ -0,0 +1,140 @@
+import asyncio
+import threading
+from typing import Dict, Optional
+
+from substrateinterface.exceptions import SubstrateRequestException
+
+
+# Pool errors that mean our local view of the account nonce is wrong. Bare codes
+# such as "1010: Invalid Transaction" also cover price-limit and fee errors.
+NONCE_ERRORS = (
+    "priority is too low",
+    "transaction is outdated",
+    "stale",
+    "will be valid in the future",
+)
+
+
+class NotIncludedError(Exception):
+    """
+    A signed extrinsic was accepted into node pools but not seen in a block in time.
+
+    It may still be included, so its nonce has to be treated as used and
+    re-read from the chain rather than handed out again.
+    """
+
+    def __init__(self, message: str, report: Optional[Dict] = None):
+        super().__init__(message)
+        self.report = report
+
+
+class NonceManager:
+    """
+    Hands out account nonces locally so one signer can have several extrinsics in flight.
+
+    While a signer has nothing in flight its next nonce is read from the chain
+    (`system_accountNextIndex`, which counts transactions already in the
+    pool), so outside activity and dropped transactions are picked up. While
+    extrinsics are in flight nonces are assigned from the local counter
+    without any RPC. A nonce-related pool error, or an extrinsic that was
+    pushed but not seen in a block, forces a resync; a rejected submission
+    that was the last one handed out gives its nonce back.
+    Safe to share between threads; acquire_async() is the asyncio equivalent
+    of acquire() for AsyncSubstrateInterface connections.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next: Dict[str, int] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._signer_locks: Dict[str, threading.Lock] = {}
+        self._async_signer_locks: Dict[str, asyncio.Lock] = {}
+
+    def acquire(self, substrate, ss58_address: str) -> int:
+        """
+        Reserve the next nonce for a signer. Must be paired with release().
+        """
+        with self._signer_lock(ss58_address):
+            with self._lock:
+                synced = ss58_address in self._next and self._in_flight.get(ss58_address, 0) > 0
+            if not synced:
+                chain_next = self.chain_nonce(substrate, ss58_address)
+                with self._lock:
+                    self._next[ss58_address] = chain_next
+
+            with self._lock:
+                nonce = self._next[ss58_address]
+                self._next[ss58_address] = nonce + 1
+                self._in_flight[ss58_address] = self._in_flight.get(ss58_address, 0) + 1
+            return nonce
+
+    async def acquire_async(self, substrate, ss58_address: str) -> int:
+        """
+        Reserve the next nonce for a signer from a coroutine. Must be paired with release().
+        """
+        async with self._async_signer_lock(ss58_address):
+            with self._lock:
+                synced = ss58_address in self._next and self._in_flight.get(ss58_address, 0) > 0
+            if not synced:
+                response = await substrate.rpc_request("system_accountNextIndex", [ss58_address])
+                with self._lock:
+                    self._next[ss58_address] = response.get('result', 0)
+
+            with self._lock:
+                nonce = self._next[ss58_address]
+                self._next[ss58_address] = nonce + 1
+                self._in_flight[ss58_address] = self._in_flight.get(ss58_address, 0) + 1
+            return nonce
+
+    def release(self, ss58_address: str, nonce: int, error: Optional[Exception] = None) -> None:
+        """
+        Mark a reserved nonce as finished.
+
+        Args:
+            ss58_address: Signer address
+            nonce: Nonce returned by acquire()
+            error: Exception raised while submitting, if any
+        """
+        with self._lock:
+            self._in_flight[ss58_address] = max(0, self._in_flight.get(ss58_address, 0) - 1)
+            if error is None:
+                return
+
+            message = str(error).lower()
+            if isinstance(error, NotIncludedError) or any(marker in message for marker in NONCE_ERRORS):
+                # Resync from the chain on the next acquire; an extrinsic not yet included may still be in node pools
+                self._next.pop(ss58_address, None)
+            elif isinstance(error, SubstrateRequestException) and self._next.get(ss58_address) == nonce + 1:
+                # Rejected by the pool, so the nonce was never used
+                self._next[ss58_address] = nonce
+
+    def reset(self, ss58_address: str) -> None:
+        """
+        Forget the local nonce so the next acquire reads it from the chain.
+        """
+        with self._lock:
+            self._next.pop(ss58_address, None)
+
+    @staticmethod
+    def chain_nonce(substrate, ss58_address: str) -> int:
+        """
+        Next nonce according to the node, including transactions in its pool.
+        """
+        response = substrate.rpc_request("system_accountNextIndex", [ss58_address])
+        return response.get('result', 0)
+
+    def _signer_lock(self, ss58_address: str) -> threading.Lock:
+        with self._lock:
+            if ss58_address not in self._signer_locks:
+                self._signer_locks[ss58_address] = threading.Lock()
+            return self._signer_locks[ss58_address]
+
+    def _async_signer_lock(self, ss58_address: str) -> asyncio.Lock:
+        with self._lock:
+            if ss58_address not in self._async_signer_locks:
+                self._async_signer_locks[ss58_address] = asyncio.Lock()
+            return self._async_signer_locks[ss58_address]
+
+
+# Shared by every proxy engine in the process so signers never race on a nonce
+nonce_manager = NonceManager()
@@ -0,0 +1,222 @@
+import json
+import os
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Per-block, per-netuid columns; each is one float64 file of shape (blocks, width)
+FIELDS = ("price", "tao_in", "alpha_in", "alpha_out")
+
+NetuidIndex = Union[int, slice, None]
+
+
+class PriceHistory:
+    """
+    Price and reserves of every subnet at every recorded block, in memory-mapped arrays.
+
+    Each field is a fixed-width float64 file laid out as (block, netuid),
+    so row `block - start_block` holds every subnet at that block and
+    column `netuid` one subnet's series. Files grow by `chunk` blocks at a
+    time; rows that were never recorded stay zero and are flagged in the
+    `recorded` mask. Slicing a block range and a netuid (or netuid slice)
+    returns a view of the mapped file, so months of history can be read
+    without copying or any RPC.
+
+    One process records; any number can open the same directory read-only.
+    A writer holds an exclusive lock on the directory for as long as it is
+    open, so a second writer fails instead of overwriting the same rows.
+    """
+
+    def __init__(self, path: str, width: int = 256, chunk: int = 7200, readonly: bool = False):
+        """
+        Open (or create) a history directory.
+
+        Args:
+            path: Directory holding the column files and meta.json
+            width: Netuid capacity of each row, fixed when the history is created
+            chunk: Blocks the files grow by (7200 is about a day)
+            readonly: Open for reading only
+
+        Raises:
+            RuntimeError: If another process has the directory open for writing
+        """
+        self.path = path
+        self.chunk = chunk
+        self.readonly = readonly
+        self.meta: Dict = {"start_block": None, "last_block": None, "width": width, "capacity": 0}
+        self._arrays: Dict[str, np.memmap] = {}
+        self._recorded: Optional[np.memmap] = None
+        self._lock_file = None
+        if not readonly:
+            os.makedirs(path, exist_ok=True)
+            self._lock()
+        self.reload()
+
+    @property
+    def start_block(self) -> Optional[int]:
+        return self.meta["start_block"]
+
+    @property
+    def last_block(self) -> Optional[int]:
+        return self.meta["last_block"]
+
+    @property
+    def width(self) -> int:
+        return self.meta["width"]
+
+    def reload(self) -> None:
+        """
+        Re-read meta.json and re-map the files, e.g. to see blocks a recorder added since.
+        """
+        meta_path = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        self._map()
+
+    def append(self, block: int, subnet_infos: Iterable) -> None:
+        """
+        Record every subnet's price and reserves at a block.
+
+        Blocks may be skipped (their rows stay unrecorded) but not go back
+        before the first recorded block.
+
+        Args:
+            block: Block number the subnet infos were read at
+            subnet_infos: Subnet infos from all_subnets(block=block)
+
+        Raises:
+            ValueError: If the block precedes the history or a netuid does not fit its width
+        """
+        if self.readonly:
+            raise ValueError("Price history is open read-only")
+        subnet_infos = list(subnet_infos)
+        if self.start_block is None:
+            self.meta["start_block"] = block
+        row = block - self.start_block
+        if row < 0:
+            raise ValueError(f"Block {block} is before the first recorded block {self.start_block}")
+        netuids = np.array([info.netuid for info in subnet_infos], dtype=np.int64)
+        if netuids.size and netuids.max() >= self.width:
+            raise ValueError(f"Netuid {netuids.max()} does not fit a history of width {self.width}")
+        if row >= self.meta["capacity"]:
+            self._grow(row + 1)
+
+        for field in FIELDS:
+            self._arrays[field][row, netuids] = [float(getattr(info, field)) for info in subnet_infos]
+        self._recorded[row] = True
+        if self.last_block is None or block > self.last_block:
+            self.meta["last_block"] = block
+
+    def flush(self) -> None:
+        """
+        Write mapped pages and meta.json to disk.
+        """
+        if self.readonly:
+            return
+        for array in [*self._arrays.values(), self._recorded]:
+            if isinstance(array, np.memmap):
+                array.flush()
+        meta_path = os.path.join(self.path, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(self.meta, f)
+        # Readers only ever see a complete meta.json
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def window(
+        self,
+        field: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        netuid: NetuidIndex = None,
+    ) -> np.ndarray:
+        """
+        Values of a field from block start to end inclusive.
+
+        Args:
+            field: One of FIELDS
+            start: First block, defaults to the first recorded block
+            end: Last block, defaults to the last recorded block
+            netuid: A netuid for one series, a slice of netuids, or None for every column
+
+        Returns:
+            View into the mapped file, shaped (blocks,) for one netuid else (blocks, netuids)
+        """
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field {field}, expected one of {', '.join(FIELDS)}")
+        rows = self._rows(start, end)
+        array = self._arrays[field][rows]
+        return array if netuid is None else array[:, netuid]
+
+    def recorded(self, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """
+        Whether each block from start to end was recorded.
+        """
+        return self._recorded[self._rows(start, end)]
+
+    def blocks(self, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """
+        Block numbers of the rows window() returns for the same range.
+        """
+        rows = self._rows(start, end)
+        return np.arange(rows.start, rows.stop) + (self.start_block or 0)
+
+    def close(self) -> None:
+        self.flush()
+        self._arrays = {}
+        self._recorded = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _lock(self) -> None:
+        if fcntl is None:
+            return
+        self._lock_file = open(os.path.join(self.path, "lock"), "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            self._lock_file = None
+            raise RuntimeError(f"Price history {self.path} is already being recorded by another process")
+
+    def _rows(self, start: Optional[int], end: Optional[int]) -> slice:
+        if self.start_block is None:
+            return slice(0, 0)
+        first = 0 if start is None else max(start - self.start_block, 0)
+        last = self.last_block if end is None else min(end, self.last_block)
+        return slice(first, max(last - self.start_block + 1, first))
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _map(self) -> None:
+        capacity = self.meta["capacity"]
+        if not capacity:
+            self._arrays = {field: np.zeros((0, self.width)) for field in FIELDS}
+            self._recorded = np.zeros(0, dtype=bool)
+            return
+        mode = "r" if self.readonly else "r+"
+        self._arrays = {
+            field: np.memmap(self._file(field), dtype=np.float64, mode=mode, shape=(capacity, self.width))
+            for field in FIELDS
+        }
+        self._recorded = np.memmap(self._file("recorded"), dtype=bool, mode=mode, shape=(capacity,))
+
+    def _grow(self, rows: int) -> None:
+        self.flush()
+        capacity = -(-rows // self.chunk) * self.chunk
+        # Extending with truncate leaves the new rows as zero-filled (sparse) pages
+        for field in FIELDS:
+            with open(self._file(field), "ab") as f:
+                f.truncate(capacity * self.width * 8)
+        with open(self._file("recorded"), "ab") as f:
+            f.truncate(capacity)
+        self.meta["capacity"] = capacity
+        self._map()
@@ -0,0 +1,158 @@
+from typing import Dict, Optional, Tuple
+
+from bittensor.utils.balance import Balance
+
+
+# Position of each field in the SubtensorModule staking event tuples:
+# StakeAdded/StakeRemoved(coldkey, hotkey, tao, alpha, netuid, ...)
+# StakeMoved(coldkey, origin_hotkey, origin_netuid, destination_hotkey, destination_netuid, tao)
+_TRADE_FIELDS = {
+    "StakeAdded": {"tao": 2, "alpha": 3, "netuid": 4},
+    "StakeRemoved": {"tao": 2, "alpha": 3, "netuid": 4},
+    "StakeMoved": {"tao": 5, "netuid": 4},
+}
+
+
+def event_parts(event) -> Tuple[str, str, object]:
+    """
+    (module_id, event_id, attributes) of an event from either substrate client.
+    """
+    record = getattr(event, "value", event)
+    data = record.get("event", record)
+    return data["module_id"], data["event_id"], data["attributes"]
+
+
+def dispatch_error(result) -> Optional[str]:
+    """
+    Error of a decoded DispatchResult, or None if it is Ok.
+    """
+    if isinstance(result, dict):
+        if "Err" in result:
+            return str(result["Err"])
+        if "error" in result:
+            return str(result["error"])
+        return None
+    if result is None or result == "Ok":
+        return None
+    return str(result)
+
+
+class TradeOutcome:
+    """
+    Result of one proxied stake, unstake or move, read from its receipt.
+    """
+
+    def __init__(
+        self,
+        success: bool,
+        error: Optional[str] = None,
+        event: Optional[str] = None,
+        netuid: Optional[int] = None,
+        tao: Optional[Balance] = None,
+        alpha: Optional[Balance] = None,
+        extrinsic: Optional[str] = None,
+    ):
+        self.success = success
+        self.error = error
+        self.event = event
+        self.netuid = netuid
+        self.tao = tao
+        self.alpha = alpha
+        self.extrinsic = extrinsic
+
+    @property
+    def price(self) -> Optional[float]:
+        """
+        Effective TAO paid or received per alpha, fees and slippage included.
+        """
+        if self.tao is None or not self.alpha:
+            return None
+        return self.tao.tao / self.alpha.tao
+
+    def as_dict(self) -> Dict:
+        return {
+            "success": self.success,
+            "error": self.error,
+            "event": self.event,
+            "netuid": self.netuid,
+            "tao": self.tao.tao if self.tao is not None else None,
+            "alpha": self.alpha.tao if self.alpha is not None else None,
+            "price": self.price,
+            "extrinsic": self.extrinsic,
+        }
+
+    def __str__(self) -> str:
+        if not self.success:
+            return f"Error: {self.error}"
+        # The amounts may be missing if the event could not be parsed
+        at_price = f" at {self.price:.9f} TAO/alpha" if self.price is not None else ""
+        if self.event == "StakeAdded":
+            return f"Staked {self.tao} for {self.alpha}{at_price}"
+        if self.event == "StakeRemoved":
+            return f"Unstaked {self.alpha} for {self.tao}{at_price}"
+        if self.event == "StakeMoved":
+            return f"Moved stake worth {self.tao} to netuid {self.netuid}"
+        return "Success"
+
+
+def _field(attributes, event_id: str, name: str):
+    index = _TRADE_FIELDS[event_id].get(name)
+    if index is None:
+        return None
+    if isinstance(attributes, dict):
+        attributes = list(attributes.values())
+    return attributes[index] if len(attributes) > index else None
+
+
+def parse_trade_outcome(events, fallback_error: Optional[str] = None, extrinsic: Optional[str] = None) -> TradeOutcome:
+    """
+    Outcome of a Proxy.proxy staking extrinsic from the events it triggered.
+
+    The outer extrinsic succeeds even when the proxied call fails, so success
+    is taken from the ProxyExecuted result, and the amounts from the staking
+    event emitted by the same extrinsic. Nothing else on the coldkey in the
+    same block can affect the result, and no further queries are needed.
+
+    Args:
+        events: Events triggered by the extrinsic (receipt.triggered_events)
+        fallback_error: Error to report when the extrinsic was not included
+        extrinsic: Extrinsic identifier to attach to the outcome
+
+    Returns:
+        TradeOutcome
+    """
+    proxy_executed = False
+    error = None
+    trade = None
+
+    for event in events:
+        module_id, event_id, attributes = event_parts(event)
+        if module_id == "SubtensorModule" and event_id in _TRADE_FIELDS:
+            trade = (event_id, attributes)
+        elif module_id == "Proxy" and event_id == "ProxyExecuted":
+            proxy_executed = True
+            result = attributes.get("result") if isinstance(attributes, dict) else attributes
+            error = dispatch_error(result)
+        elif module_id == "System" and event_id == "ExtrinsicFailed":
+            result = attributes.get("dispatch_error") if isinstance(attributes, dict) else attributes
+            error = dispatch_error({"Err": result})
+
+    if error is None and not proxy_executed:
+        error = fallback_error or "Proxy call was not executed"
+    if error is not None:
+        return TradeOutcome(False, error=error, extrinsic=extrinsic)
+    if trade is None:
+        return TradeOutcome(False, error="No staking event in receipt", extrinsic=extrinsic)
+
+    event_id, attributes = trade
+    netuid = _field(attributes, event_id, "netuid")
+    tao = _field(attributes, event_id, "tao")
+    alpha = _field(attributes, event_id, "alpha")
+    return TradeOutcome(
+        True,
+        event=event_id,
+        netuid=netuid,
+        tao=Balance.from_rao(tao) if tao is not None else None,
+        alpha=Balance.from_rao(alpha).set_unit(netuid) if alpha is not None else None,
+        extrinsic=extrinsic,
+    )
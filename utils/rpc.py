@@ -0,0 +1,276 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import bittensor as bt
+from substrateinterface import SubstrateInterface
+
+from utils.metadata_cache import CachedSubstrateInterface
+
+
+# Public endpoints per network. Extra nodes (e.g. our private ones) are added with
+# RPC_ENDPOINTS_<NETWORK>=ws://host:9944,ws://other:9944 and are tried first.
+RPC_ENDPOINTS = {
+    'test': ['wss://test.finney.opentensor.ai:443'],
+    'finney': ['wss://entrypoint-finney.opentensor.ai:443'],
+}
+
+
+def resolve_endpoints(network: str) -> List[str]:
+    """
+    Turn a network name, a single URL or a comma-separated URL list into endpoint URLs.
+    """
+    if network in RPC_ENDPOINTS:
+        extra = os.getenv(f"RPC_ENDPOINTS_{network.upper()}", "")
+        urls = [url.strip() for url in extra.split(",") if url.strip()]
+        urls += RPC_ENDPOINTS[network]
+    else:
+        urls = [url.strip() for url in network.split(",") if url.strip()]
+    # Keep order, drop duplicates
+    return list(dict.fromkeys(urls))
+
+
+def connect_substrate(url: str) -> SubstrateInterface:
+    """
+    Open a SubstrateInterface and load its runtime so the first call on it is fast.
+    Runtime metadata comes from the on-disk cache unless the runtime has changed.
+    """
+    substrate = CachedSubstrateInterface(
+        url=url,
+        ss58_format=42,
+        type_registry_preset='substrate-node-template',
+        auto_reconnect=True,
+    )
+    substrate.init_runtime()
+    return substrate
+
+
+class EndpointHealth:
+    """
+    Latest probe results for one endpoint.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency: Optional[float] = None   # smoothed round trip, seconds
+        self.head: Optional[int] = None
+        self.head_changed_at = 0.0
+        self.failures = 0
+        self.substrate: Optional[SubstrateInterface] = None
+
+    def as_dict(self) -> Dict:
+        return {
+            "url": self.url,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "head": self.head,
+            "failures": self.failures,
+        }
+
+
+class EndpointSet:
+    """
+    Tracks head-block lag and round-trip latency for a set of nodes.
+
+    Every endpoint is probed concurrently with `chain_getHeader`. A node is
+    healthy when its last probe succeeded, it is at most `max_lag` blocks
+    behind the highest head seen, and its head has moved within
+    `stall_timeout` seconds. `best()` returns the fastest healthy node.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        probe_interval: float = 6.0,
+        max_lag: int = 2,
+        stall_timeout: float = 36.0,
+    ):
+        """
+        Initialize the endpoint set and run a first probe round.
+
+        Args:
+            urls: Endpoint URLs, in order of preference when nothing is known yet
+            probe_interval: Seconds between probe rounds
+            max_lag: Blocks a node may trail the best head and still be healthy
+            stall_timeout: Seconds without a new head before a node counts as stalled
+        """
+        if not urls:
+            raise ValueError("At least one RPC endpoint is required")
+
+        self.urls = urls
+        self.probe_interval = probe_interval
+        self.max_lag = max_lag
+        self.stall_timeout = stall_timeout
+        self.health = {url: EndpointHealth(url) for url in urls}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(urls))
+
+        if len(urls) > 1:
+            self.probe()
+            threading.Thread(target=self._probe_loop, daemon=True).start()
+
+    def best(self) -> str:
+        """
+        Return the fastest healthy endpoint (or the least bad one if none is healthy).
+        """
+        return self.ranked()[0]
+
+    def ranked(self) -> List[str]:
+        """
+        Return every endpoint, best first.
+        """
+        with self._lock:
+            return sorted(self.urls, key=self._rank_key)
+
+    def is_healthy(self, url: str) -> bool:
+        with self._lock:
+            return self._is_healthy(self.health[url]) if url in self.health else False
+
+    def report_failure(self, url: str) -> None:
+        """
+        Mark an endpoint as failing so it is skipped until a probe succeeds again.
+        """
+        with self._lock:
+            if url in self.health:
+                self.health[url].failures += 1
+
+    def status(self) -> List[Dict]:
+        with self._lock:
+            return [
+                dict(self.health[url].as_dict(), healthy=self._is_healthy(self.health[url]))
+                for url in self.urls
+            ]
+
+    def probe(self) -> None:
+        """
+        Probe every endpoint concurrently and update its health.
+        """
+        list(self._executor.map(self._probe_one, self.urls))
+
+    def _probe_loop(self) -> None:
+        while True:
+            time.sleep(self.probe_interval)
+            self.probe()
+
+    def _probe_one(self, url: str) -> None:
+        health = self.health[url]
+        try:
+            if health.substrate is None:
+                health.substrate = SubstrateInterface(url=url, ss58_format=42)
+            started = time.monotonic()
+            header = health.substrate.rpc_request('chain_getHeader', [])['result']
+            elapsed = time.monotonic() - started
+            head = int(header['number'], 16)
+        except Exception as e:
+            print(f"RPC probe failed for {url}: {e}")
+            with self._lock:
+                health.failures += 1
+            if health.substrate is not None:
+                try:
+                    health.substrate.close()
+                except Exception:
+                    pass
+                health.substrate = None
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if health.head is None or head > health.head:
+                health.head_changed_at = now
+            health.head = head
+            health.latency = elapsed if health.latency is None else 0.7 * health.latency + 0.3 * elapsed
+            health.failures = 0
+
+    def _best_head(self) -> int:
+        heads = [h.head for h in self.health.values() if h.head is not None]
+        return max(heads) if heads else 0
+
+    def _is_healthy(self, health: EndpointHealth) -> bool:
+        if len(self.urls) == 1:
+            return True
+        if health.failures or health.head is None:
+            return False
+        if self._best_head() - health.head > self.max_lag:
+            return False
+        return time.monotonic() - health.head_changed_at <= self.stall_timeout
+
+    def _rank_key(self, url: str):
+        health = self.health[url]
+        lag = self._best_head() - health.head if health.head is not None else float("inf")
+        latency = health.latency if health.latency is not None else float("inf")
+        return (not self._is_healthy(health), health.failures, lag, latency, self.urls.index(url))
+
+
+_endpoint_sets: Dict[str, EndpointSet] = {}
+_endpoint_sets_lock = threading.Lock()
+
+
+def get_endpoints(network: str) -> EndpointSet:
+    """
+    Return the process-wide EndpointSet for a network, creating it on first use.
+    """
+    with _endpoint_sets_lock:
+        if network not in _endpoint_sets:
+            _endpoint_sets[network] = EndpointSet(resolve_endpoints(network))
+        return _endpoint_sets[network]
+
+
+def create_substrate(network: str) -> SubstrateInterface:
+    """
+    Connect a SubstrateInterface to the best endpoint of a network, falling back in rank order.
+    """
+    endpoints = get_endpoints(network)
+    error = None
+    for url in endpoints.ranked():
+        try:
+            return connect_substrate(url)
+        except Exception as e:
+            print(f"Error connecting to {url}: {e}")
+            endpoints.report_failure(url)
+            error = e
+    raise ConnectionError(f"No RPC endpoint reachable for {network}: {error}")
+
+
+def create_subtensor(network: str) -> bt.Subtensor:
+    """
+    Create a bt.Subtensor on the best endpoint of a network, falling back in rank order.
+
+    The endpoint is chosen once: the client stays on it even if another node
+    becomes faster, and moves only when the caller recreates it after an error.
+    """
+    endpoints = get_endpoints(network)
+    error = None
+    for url in endpoints.ranked():
+        try:
+            return bt.Subtensor(network=url)
+        except Exception as e:
+            print(f"Error connecting to {url}: {e}")
+            endpoints.report_failure(url)
+            error = e
+    raise ConnectionError(f"No RPC endpoint reachable for {network}: {error}")
+
+
+async def create_async_subtensor(network: str) -> bt.AsyncSubtensor:
+    """
+    Create and initialize a bt.AsyncSubtensor on the best endpoint of a network,
+    falling back in rank order. Like create_subtensor(), it stays on that endpoint.
+    """
+    # The first call for a network probes every endpoint, which blocks
+    endpoints = await asyncio.to_thread(get_endpoints, network)
+    error = None
+    for url in endpoints.ranked():
+        subtensor = bt.AsyncSubtensor(network=url)
+        try:
+            await subtensor.initialize()
+            return subtensor
+        except Exception as e:
+            print(f"Error connecting to {url}: {e}")
+            endpoints.report_failure(url)
+            error = e
+            try:
+                await subtensor.close()
+            except Exception:
+                pass
+    raise ConnectionError(f"No RPC endpoint reachable for {network}: {error}")
@@ -0,0 +1,185 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bittensor.utils.balance import Balance, fixed_to_float
+
+from utils.amm import Quote, QuoteEngine, limit_prices
+
+
+class PoolState:
+    """
+    Reserves of one subnet pool at a snapshot block.
+    """
+
+    def __init__(self, netuid: int, exists: bool, is_dynamic: bool, tao_in: Balance, alpha_in: Balance):
+        self.netuid = netuid
+        self.exists = exists
+        self.is_dynamic = is_dynamic
+        self.tao_in = tao_in
+        self.alpha_in = alpha_in
+
+    @property
+    def price(self) -> Balance:
+        """
+        TAO price of one alpha (1 TAO on stable subnets).
+        """
+        if not self.is_dynamic or not self.alpha_in.rao:
+            return Balance.from_tao(1)
+        return Balance.from_tao(self.tao_in.tao / self.alpha_in.tao)
+
+    def limit_price(self, tolerance: float, buy: bool) -> int:
+        """
+        Limit price in rao for add_stake_limit (buy) or remove_stake_limit (sell).
+        """
+        spot_price = self.price.tao if self.is_dynamic else float("nan")
+        return int(limit_prices(spot_price, tolerance, buy))
+
+    def quote(self, amount: Balance, buy: bool) -> Quote:
+        """
+        Quote staking `amount` TAO (buy) or unstaking `amount` alpha (sell) on this pool.
+        """
+        engine = QuoteEngine.from_pools([self])
+        return engine.stake(self.netuid, amount.tao) if buy else engine.unstake(self.netuid, amount.tao)
+
+
+class TradeSnapshot:
+    """
+    Free balance, alpha stakes and pool reserves read together at one block hash.
+    """
+
+    def __init__(
+        self,
+        block_hash: str,
+        coldkey: str,
+        free_balance: Balance,
+        pools: Dict[int, PoolState],
+        stakes: Dict[Tuple[str, int], Balance],
+    ):
+        self.block_hash = block_hash
+        self.coldkey = coldkey
+        self.free_balance = free_balance
+        self.pools = pools
+        self.stakes = stakes
+
+    def pool(self, netuid: int) -> Optional[PoolState]:
+        """
+        Pool state of a subnet, or None if it does not exist.
+        """
+        pool = self.pools.get(netuid)
+        return pool if pool is not None and pool.exists else None
+
+    def stake(self, hotkey: str, netuid: int) -> Balance:
+        return self.stakes.get((hotkey, netuid), Balance.from_rao(0).set_unit(netuid))
+
+
+def _storage_specs(coldkey: str, netuids: List[int], positions: List[Tuple[str, int]]) -> List[Tuple[str, str, list]]:
+    specs = [("System", "Account", [coldkey])]
+    for netuid in netuids:
+        specs += [
+            ("SubtensorModule", "NetworksAdded", [netuid]),
+            ("SubtensorModule", "SubnetMechanism", [netuid]),
+            ("SubtensorModule", "SubnetTAO", [netuid]),
+            ("SubtensorModule", "SubnetAlphaIn", [netuid]),
+        ]
+    for hotkey, netuid in positions:
+        specs += [
+            ("SubtensorModule", "Alpha", [hotkey, coldkey, netuid]),
+            ("SubtensorModule", "TotalHotkeyAlpha", [hotkey, netuid]),
+            ("SubtensorModule", "TotalHotkeyShares", [hotkey, netuid]),
+        ]
+    return specs
+
+
+def _normalize(netuids: Iterable[int], positions: Iterable[Tuple[str, int]]) -> Tuple[List[int], List[Tuple[str, int]]]:
+    positions = list(dict.fromkeys(positions))
+    netuids = list(dict.fromkeys(list(netuids) + [netuid for _, netuid in positions]))
+    return netuids, positions
+
+
+def _fixed(value) -> float:
+    return fixed_to_float(value) if value else 0.0
+
+
+def _build(
+    block_hash: str,
+    coldkey: str,
+    netuids: List[int],
+    positions: List[Tuple[str, int]],
+    values: Dict[Tuple[str, str, tuple], object],
+) -> TradeSnapshot:
+    def get(module, storage, params):
+        value = values.get((module, storage, tuple(params)))
+        return getattr(value, "value", value)
+
+    account = get("System", "Account", [coldkey]) or {}
+    free_balance = Balance.from_rao(account.get("data", {}).get("free", 0))
+
+    pools = {}
+    for netuid in netuids:
+        pools[netuid] = PoolState(
+            netuid=netuid,
+            exists=bool(get("SubtensorModule", "NetworksAdded", [netuid])),
+            is_dynamic=(get("SubtensorModule", "SubnetMechanism", [netuid]) or 0) == 1,
+            tao_in=Balance.from_rao(get("SubtensorModule", "SubnetTAO", [netuid]) or 0),
+            alpha_in=Balance.from_rao(get("SubtensorModule", "SubnetAlphaIn", [netuid]) or 0).set_unit(netuid),
+        )
+
+    stakes = {}
+    for hotkey, netuid in positions:
+        shares = _fixed(get("SubtensorModule", "Alpha", [hotkey, coldkey, netuid]))
+        total_alpha = get("SubtensorModule", "TotalHotkeyAlpha", [hotkey, netuid]) or 0
+        total_shares = _fixed(get("SubtensorModule", "TotalHotkeyShares", [hotkey, netuid]))
+        alpha = int(shares * total_alpha / total_shares) if total_shares else 0
+        stakes[(hotkey, netuid)] = Balance.from_rao(alpha).set_unit(netuid)
+
+    return TradeSnapshot(block_hash, coldkey, free_balance, pools, stakes)
+
+
+def take_snapshot(
+    substrate,
+    coldkey: str,
+    netuids: Iterable[int] = (),
+    positions: Iterable[Tuple[str, int]] = (),
+    block_hash: Optional[str] = None,
+) -> TradeSnapshot:
+    """
+    Read a coldkey's free balance, its stake per (hotkey, netuid) and the pool
+    reserves of each subnet in one state_queryStorageAt call pinned to one block.
+
+    Args:
+        substrate: SubstrateInterface connection
+        coldkey: Coldkey (delegator) address
+        netuids: Subnets whose pool reserves are needed
+        positions: (hotkey, netuid) pairs whose stake is needed; their subnets are included
+        block_hash: Block to read at, defaults to the current head
+    """
+    netuids, positions = _normalize(netuids, positions)
+    if block_hash is None:
+        block_hash = substrate.get_chain_head()
+    specs = _storage_specs(coldkey, netuids, positions)
+    keys = [substrate.create_storage_key(module, storage, params) for module, storage, params in specs]
+    by_key = {key.to_hex(): value for key, value in substrate.query_multi(keys, block_hash=block_hash)}
+    values = {(m, s, tuple(p)): by_key.get(key.to_hex()) for (m, s, p), key in zip(specs, keys)}
+    return _build(block_hash, coldkey, netuids, positions, values)
+
+
+async def take_snapshot_async(
+    substrate,
+    coldkey: str,
+    netuids: Iterable[int] = (),
+    positions: Iterable[Tuple[str, int]] = (),
+    block_hash: Optional[str] = None,
+) -> TradeSnapshot:
+    """
+    take_snapshot() for an AsyncSubstrateInterface connection.
+    """
+    netuids, positions = _normalize(netuids, positions)
+    if block_hash is None:
+        block_hash = await substrate.get_chain_head()
+    specs = _storage_specs(coldkey, netuids, positions)
+    keys = [
+        await substrate.create_storage_key(module, storage, params, block_hash=block_hash)
+        for module, storage, params in specs
+    ]
+    by_key = {key.to_hex(): value for key, value in await substrate.query_multi(keys, block_hash=block_hash)}
+    values = {(m, s, tuple(p)): by_key.get(key.to_hex()) for (m, s, p), key in zip(specs, keys)}
+    return _build(block_hash, coldkey, netuids, positions, values)
@@ -1,70 +1,132 @@
-import bittensor as bt
+import html
+from typing import Dict, List, Optional
 
-from rich.console import Console
-from rich.table import Table
-from io import StringIO
+from utils.amm import QuoteEngine
 
 
-def get_amount(tao_in, alpha_in, alpha_unstake_amount):
-    p = tao_in * alpha_in
-    alpha_in_after = alpha_in + alpha_unstake_amount
-    tao_in_after = p / alpha_in_after
-    return tao_in - tao_in_after
+def build_portfolio(
+    wallet_ss58: str,
+    stake_infos: List,
+    subnet_infos: List,
+    balance,
+    block: Optional[int] = None,
+    engine: Optional[QuoteEngine] = None,
+) -> Dict:
+    """
+    Positions of a coldkey with prices and AMM exit values, as plain JSON-ready data.
 
+    Args:
+        wallet_ss58: Coldkey address
+        stake_infos: StakeInfo objects from get_stake_for_coldkey()
+        subnet_infos: Subnet infos from all_subnets()
+        balance: Free balance (Balance)
+        block: Block the data was read at, if known
+        engine: QuoteEngine over the same subnet infos, built from them if not given
 
-def get_stake_list(subtensor, wallet_ss58):
-    stake_infos = subtensor.get_stake_for_coldkey(
-        coldkey_ss58=wallet_ss58
-    )
-    subnet_infos = subtensor.all_subnets()
+    Returns:
+        Dict with the free balance, total value and one entry per position
+    """
+    stake_infos = [info for info in stake_infos if info.stake.rao]
+    subnets = {subnet_info.netuid: subnet_info for subnet_info in subnet_infos}
+    engine = engine or QuoteEngine.from_pools(subnet_infos)
+    # Every position is valued by unstaking it, in one vectorized quote
+    values = engine.unstake(
+        [info.netuid for info in stake_infos],
+        [info.stake.tao for info in stake_infos],
+    ).amount_out.tolist()
 
-    # Create a Rich Table to display the stake_infos in a readable format
-
-    table = Table(title="Stake Infos", show_lines=True)
-    table.add_column("NetUID", justify="right", no_wrap=True)
-    table.add_column("Subnet Name")
-    table.add_column("Value")
-    table.add_column("Stake", justify="right")
-    table.add_column("Price")
-    table.add_column("Hotkey SS58")
-
-    # stake_infos is a list of StakeInfo objects
-    total_value = 0
-    for info in stake_infos:
-        subnet_info = subnet_infos[info.netuid]
-        value = get_amount(subnet_info.tao_in.tao, subnet_info.alpha_in.tao, info.stake.tao)
-        table.add_row(
-            str(info.netuid),
-            subnet_info.subnet_name,
-            f"{value:.2f}",
-            f"{info.stake.tao:.2f}",
-            f"{subnet_info.price.tao:.4f}",
-            info.hotkey_ss58,
+    positions = []
+    for info, value in zip(stake_infos, values):
+        subnet_info = subnets[info.netuid]
+        positions.append({
+            "netuid": info.netuid,
+            "subnet_name": subnet_info.subnet_name,
+            "hotkey": info.hotkey_ss58,
+            "stake": info.stake.tao,
+            "price": subnet_info.price.tao,
+            "value": value,
+        })
+
+    return {
+        "coldkey": wallet_ss58,
+        "block": block,
+        "free_balance": balance.tao,
+        "total_value": sum(values),
+        "positions": positions,
+    }
+
+
+def format_portfolio(portfolio: Dict) -> str:
+    """
+    Plain-text table of a portfolio, for terminals.
+    """
+    lines = [f"{'NetUID':>6}  {'Subnet Name':<20} {'Value':>10} {'Stake':>12} {'Price':>10}  Hotkey SS58"]
+    for position in portfolio["positions"]:
+        lines.append(
+            f"{position['netuid']:>6}  {position['subnet_name'][:20]:<20} {position['value']:>10.2f} "
+            f"{position['stake']:>12.2f} {position['price']:>10.4f}  {position['hotkey']}"
         )
-        total_value += value
+    lines += [
+        "",
+        "Wallet:",
+        f"  Coldkey SS58: {portfolio['coldkey']}",
+        f"  Free Balance: {portfolio['free_balance']:.4f} TAO",
+        f"  Total TAO Value (TAO): {portfolio['total_value']}",
+    ]
+    return "\n".join(lines)
+
 
+def render_portfolio_html(portfolio: Dict, title: str) -> str:
+    """
+    Standalone HTML page of a portfolio.
+    """
+    rows = "".join(
+        f"<tr><td>{position['netuid']}</td><td>{html.escape(position['subnet_name'])}</td>"
+        f"<td>{position['value']:.2f}</td><td>{position['stake']:.2f}</td>"
+        f"<td>{position['price']:.4f}</td><td>{position['hotkey']}</td></tr>"
+        for position in portfolio["positions"]
+    )
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>{html.escape(title)} | Stake List</title>
+        <style>
+            body {{ font-family: monospace; }}
+            table {{ border-collapse: collapse; }}
+            th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+        </style>
+    </head>
+    <body>
+        <table>
+            <tr><th>NetUID</th><th>Subnet Name</th><th>Value</th><th>Stake</th><th>Price</th><th>Hotkey SS58</th></tr>
+            {rows}
+        </table>
+        <pre>
+Wallet:
+  Coldkey SS58: {portfolio['coldkey']}
+  Free Balance: {portfolio['free_balance']:.4f} TAO
+  Total TAO Value (TAO): {portfolio['total_value']}
+  Block: {portfolio['block']}
+        </pre>
+    </body>
+    </html>
+    """
 
 
-    balance = subtensor.get_balance(wallet_ss58)
-    
-    console = Console(file=StringIO(), force_terminal=False)
-    console.print(table)
-    console.print("\n")
-    console.print(
-        f"Wallet:\n"
-        f"  Coldkey SS58: {wallet_ss58}\n"
-        f"  Free Balance: {balance}\n"
-        f"  Total TAO Value (TAO): {total_value}"
+def get_stake_list(subtensor, wallet_ss58):
+    stake_infos = subtensor.get_stake_for_coldkey(
+        coldkey_ss58=wallet_ss58
     )
+    subnet_infos = subtensor.all_subnets()
+    balance = subtensor.get_balance(wallet_ss58)
+    return format_portfolio(build_portfolio(wallet_ss58, stake_infos, subnet_infos, balance))
 
-    table_str = console.file.getvalue()
-    return table_str
-    
 
 if __name__ == "__main__":
+    import bittensor as bt
+
     subtensor = bt.Subtensor("finney")
     wallet_ss58 = "5F5WLLEzDBXQDdTzDYgbQ3d3JKbM15HhPdFuLMmuzcUW5xG2"
-    stake_list = get_stake_list(subtensor, wallet_ss58)    
+    stake_list = get_stake_list(subtensor, wallet_ss58)
     print(stake_list)
-    
-
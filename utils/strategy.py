@@ -0,0 +1,133 @@
+from typing import Dict, Optional
+
+
+STAKE = "stake"
+UNSTAKE = "unstake"
+
+
+class ThresholdStrategy:
+    """
+    The leo buy-below / sell-above loop on one subnet.
+
+    Flat, it stakes `stake_amount` TAO once the price drops below
+    `stake_price`; staked, it unstakes everything once the price rises
+    above `unstake_price`. With a `threshold`, both levels follow the
+    market: after a stake the unstake price is set `threshold` above the
+    price it left, and after an unstake the stake price `threshold` below
+    it (leo-auto-stake). Without one the two prices stay fixed (leo-base).
+    The strategy stops after `repeat` round trips, if given.
+
+    Live scripts and the backtester drive the same instance through
+    decide() and filled(), so a backtest replays exactly what would have run.
+    """
+
+    def __init__(
+        self,
+        netuid: int,
+        stake_amount: float,
+        tolerance: float,
+        threshold: Optional[float] = None,
+        stake_price: Optional[float] = None,
+        unstake_price: Optional[float] = None,
+        repeat: Optional[int] = None,
+        staked: bool = False,
+    ):
+        """
+        Args:
+            netuid: Subnet to trade
+            stake_amount: TAO to stake each time
+            tolerance: Rate tolerance of every trade
+            threshold: Distance of the trigger prices from the last fill, None for fixed prices
+            stake_price: Initial (or fixed) price to stake below
+            unstake_price: Initial (or fixed) price to unstake above
+            repeat: Round trips before stopping, None for no limit
+            staked: Whether a position is already open
+        """
+        if threshold is None and (stake_price is None or unstake_price is None):
+            raise ValueError("Fixed-price strategies need both a stake price and an unstake price")
+        self.netuid = netuid
+        self.stake_amount = stake_amount
+        self.tolerance = tolerance
+        self.threshold = threshold
+        self.stake_price = stake_price
+        self.unstake_price = unstake_price
+        self.repeats_left = repeat
+        self.staked = staked
+
+    @property
+    def done(self) -> bool:
+        return self.repeats_left is not None and self.repeats_left <= 0
+
+    def start(self, price: float) -> None:
+        """
+        Anchor any trigger price that was not given to the current price.
+        """
+        if self.threshold is None:
+            return
+        if self.stake_price is None:
+            self.stake_price = price - self.threshold
+        if self.unstake_price is None:
+            self.unstake_price = price + self.threshold
+
+    def trigger(self):
+        """
+        (action, level, below) the strategy is waiting for: `action` fires once
+        the price is below `level` if `below`, else above it. None when done.
+        """
+        if self.done:
+            return None
+        if self.staked:
+            return UNSTAKE, self.unstake_price, False
+        return STAKE, self.stake_price, True
+
+    def decide(self, price: float) -> Optional[str]:
+        """
+        Action to take at a price, or None.
+        """
+        trigger = self.trigger()
+        if trigger is None:
+            return None
+        action, level, below = trigger
+        if level is None:
+            self.start(price)
+            return None
+        if (price < level) if below else (price > level):
+            return action
+        return None
+
+    def filled(self, action: str, price: float) -> None:
+        """
+        Record a successful trade and move the trigger prices.
+
+        Args:
+            action: STAKE or UNSTAKE
+            price: Pool price right after the trade
+        """
+        if action == STAKE:
+            self.staked = True
+            if self.threshold is not None:
+                self.unstake_price = price + self.threshold
+        else:
+            self.staked = False
+            if self.repeats_left is not None:
+                self.repeats_left -= 1
+            if self.threshold is not None:
+                self.stake_price = price - self.threshold
+
+    def as_dict(self) -> Dict:
+        return {
+            "netuid": self.netuid,
+            "stake_amount": self.stake_amount,
+            "tolerance": self.tolerance,
+            "threshold": self.threshold,
+            "stake_price": self.stake_price,
+            "unstake_price": self.unstake_price,
+            "repeats_left": self.repeats_left,
+            "staked": self.staked,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"SN{self.netuid} stake_price: {self.stake_price}, unstake_price: {self.unstake_price}, "
+            f"stake_amount: {self.stake_amount}, staked: {self.staked}"
+        )
@@ -0,0 +1,198 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bittensor.utils.balance import Balance
+
+from utils.block_follower import Block, BlockFollower
+from utils.rpc import create_substrate
+from utils.snapshot import PoolState, take_snapshot
+from utils.strategy import STAKE, UNSTAKE, ThresholdStrategy
+
+
+class StrategySlot:
+    """
+    One configured strategy and the account it trades for.
+    """
+
+    def __init__(self, name: str, wallet: str, delegator: str, hotkey: str, strategy: ThresholdStrategy):
+        self.name = name
+        self.wallet = wallet
+        self.delegator = delegator
+        self.hotkey = hotkey
+        self.strategy = strategy
+        # Set while a trade is in flight, so the strategy is not evaluated again until it lands
+        self.busy = False
+
+    @property
+    def account(self) -> Tuple[str, str]:
+        return self.wallet, self.delegator
+
+    def __str__(self) -> str:
+        return f"[{self.name}] {self.strategy}"
+
+
+def load_config(path: str, default_hotkey: str) -> Tuple[Optional[str], List[StrategySlot]]:
+    """
+    Read a strategy runner config.
+
+    The file is a JSON object with an optional "network" and a "strategies"
+    list. Each strategy has netuid, wallet, delegator, stake_amount and
+    tolerance, plus either a threshold or fixed stake_price/unstake_price,
+    and optionally name, hotkey, repeat, staked and unstake_price.
+
+    Returns:
+        (network, slots)
+
+    Raises:
+        ValueError: If a strategy is missing a field or is inconsistent
+    """
+    with open(path) as f:
+        config = json.load(f)
+
+    slots = []
+    for i, entry in enumerate(config.get("strategies", [])):
+        try:
+            strategy = ThresholdStrategy(
+                netuid=int(entry["netuid"]),
+                stake_amount=float(entry["stake_amount"]),
+                tolerance=float(entry["tolerance"]),
+                threshold=entry.get("threshold"),
+                stake_price=entry.get("stake_price"),
+                unstake_price=entry.get("unstake_price"),
+                repeat=entry.get("repeat"),
+                staked=bool(entry.get("staked", False)),
+            )
+            slots.append(StrategySlot(
+                name=entry.get("name", f"{entry['wallet']}-sn{entry['netuid']}"),
+                wallet=entry["wallet"],
+                delegator=entry["delegator"],
+                hotkey=entry.get("hotkey", default_hotkey),
+                strategy=strategy,
+            ))
+        except KeyError as e:
+            raise ValueError(f"Strategy {i} is missing {e}")
+    return config.get("network"), slots
+
+
+class StrategyRunner:
+    """
+    Run many strategies over one block feed.
+
+    Every block, the pool reserves of every configured subnet are read in a
+    single query pinned to that block, and each strategy decides from the
+    same snapshot. Trades go to a shared execution engine: one worker per
+    (wallet, delegator) account, so accounts trade in parallel while one
+    account's extrinsics are still sent one at a time on its own proxy
+    connection. A strategy with a trade in flight sits out until it lands.
+    """
+
+    def __init__(
+        self,
+        network: str,
+        slots: List[StrategySlot],
+        proxy_factory: Callable[[str, str], object],
+    ):
+        """
+        Args:
+            network: Network name, websocket URL or comma-separated URLs
+            slots: Strategies to run
+            proxy_factory: Builds the proxy (e.g. a LeoProxy) for a (wallet, delegator)
+        """
+        if not slots:
+            raise ValueError("At least one strategy is required")
+        self.network = network
+        self.slots = slots
+        self.netuids = sorted({slot.strategy.netuid for slot in slots})
+        self.substrate = create_substrate(network)
+        self._proxies = {account: proxy_factory(*account) for account in {slot.account for slot in slots}}
+        self._executors = {account: ThreadPoolExecutor(max_workers=1) for account in self._proxies}
+        self._lock = threading.Lock()
+        self.follower: Optional[BlockFollower] = None
+
+    def pools(self, block: Block) -> Dict[int, PoolState]:
+        """
+        Pool state of every configured subnet at a block.
+        """
+        # take_snapshot reads one account's balance alongside; any configured one will do
+        snapshot = take_snapshot(self.substrate, self.slots[0].delegator, netuids=self.netuids, block_hash=block.hash)
+        return {netuid: snapshot.pool(netuid) for netuid in self.netuids}
+
+    def on_block(self, block: Block) -> None:
+        """
+        Evaluate every strategy against one shared snapshot and dispatch their trades.
+        """
+        try:
+            pools = self.pools(block)
+        except Exception as e:
+            print(f"Error reading pools at block {block.number}: {e}")
+            self.substrate = create_substrate(self.network)
+            return
+
+        for slot in self.slots:
+            pool = pools.get(slot.strategy.netuid)
+            with self._lock:
+                if slot.busy or slot.strategy.done or pool is None:
+                    continue
+                action = slot.strategy.decide(pool.price.tao)
+                if action is None:
+                    continue
+                slot.busy = True
+            print(f"Block {block.number}: {slot} => {action} at {pool.price.tao}")
+            self._executors[slot.account].submit(self._execute, slot, action, pool)
+
+    def _execute(self, slot: StrategySlot, action: str, pool: PoolState) -> None:
+        proxy = self._proxies[slot.account]
+        strategy = slot.strategy
+        try:
+            if action == STAKE:
+                outcome = proxy.add_stake(
+                    netuid=strategy.netuid,
+                    hotkey=slot.hotkey,
+                    amount=Balance.from_tao(strategy.stake_amount),
+                    tolerance=strategy.tolerance,
+                )
+            else:
+                outcome = proxy.remove_stake(
+                    netuid=strategy.netuid,
+                    hotkey=slot.hotkey,
+                    amount=Balance.from_tao(0, netuid=strategy.netuid),
+                    tolerance=strategy.tolerance,
+                    all=True,
+                )
+            if not outcome.success:
+                print(f"{slot}: {action} failed: {outcome.error}")
+                return
+
+            # Re-anchor at the pool price the fill left behind, as the backtester does
+            if action == STAKE:
+                impact = float(pool.quote(outcome.tao or Balance.from_tao(strategy.stake_amount), buy=True).min_tolerance)
+                price_after = pool.price.tao * (1 + impact)
+            else:
+                impact = float(pool.quote(outcome.alpha, buy=False).min_tolerance) if outcome.alpha is not None else 0.0
+                price_after = pool.price.tao * (1 - impact)
+            with self._lock:
+                strategy.filled(action, price_after)
+            print(f"{slot}: {outcome}")
+        except Exception as e:
+            print(f"{slot}: {action} failed: {e}")
+        finally:
+            slot.busy = False
+            if all(s.strategy.done for s in self.slots) and self.follower is not None:
+                self.follower.close()
+
+    def run(self) -> None:
+        """
+        Follow the chain until every strategy is done (or forever if any has no repeat limit).
+        """
+        self.follower = BlockFollower(self.network, with_events=False)
+        try:
+            self.follower.follow(self.on_block)
+        finally:
+            for executor in self._executors.values():
+                executor.shutdown(wait=True)
+
+    def status(self) -> List[Dict]:
+        with self._lock:
+            return [dict(slot.strategy.as_dict(), name=slot.name, busy=slot.busy) for slot in self.slots]
@@ -0,0 +1,181 @@
+import asyncio
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from utils.amm import QuoteEngine
+from utils.rpc import create_subtensor
+
+
+class SubnetStateCache:
+    """
+    Latest state of every subnet, fetched once per block.
+
+    A `chain_subscribeNewHeads` subscription signals each new head and a
+    background thread then reloads `all_subnets()`, keyed by the new block
+    hash. Lookups in between are memory reads, so any number of callers
+    asking for prices or reserves within one block cost a single RPC round
+    between them. The subscription and the reloads have their own
+    connections, so lookups never contend with a caller's subtensor. If no
+    head arrives for `poll_interval` seconds (e.g. while the subscription
+    reconnects), the head is checked anyway.
+    """
+
+    def __init__(self, network: str, poll_interval: float = 6.0):
+        """
+        Initialize the cache and start refreshing it in the background.
+
+        Args:
+            network: Network name, websocket URL or comma-separated URLs
+            poll_interval: Seconds without a new head after which the head is checked directly
+        """
+        self.network = network
+        self.poll_interval = poll_interval
+        self._new_head = threading.Event()
+        # (block, block_hash, {netuid: subnet info}), replaced as a whole on refresh
+        self._state = (None, None, {})
+        # (block, QuoteEngine) built lazily from the state of that block
+        self._quotes = (None, None)
+        self._ready = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._thread.start()
+        self._subscriber = threading.Thread(target=self._subscribe_loop, daemon=True)
+        self._subscriber.start()
+
+    def wait_ready(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        Block until the first refresh has finished.
+        """
+        return self._ready.wait(timeout)
+
+    async def wait_ready_async(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        asyncio equivalent of wait_ready(); only waits in a thread before the first refresh.
+        """
+        if self._ready.is_set():
+            return True
+        return await asyncio.to_thread(self._ready.wait, timeout)
+
+    @property
+    def block(self) -> Optional[int]:
+        return self._state[0]
+
+    @property
+    def block_hash(self) -> Optional[str]:
+        return self._state[1]
+
+    def subnet(self, netuid: int):
+        """
+        Subnet info for a netuid at the cached block, or None if it does not exist.
+        """
+        self.wait_ready()
+        return self._state[2].get(netuid)
+
+    def all_subnets(self) -> List:
+        """
+        Every subnet's info at the cached block, ordered by netuid.
+        """
+        self.wait_ready()
+        subnets = self._state[2]
+        return [subnets[netuid] for netuid in sorted(subnets)]
+
+    def price(self, netuid: int) -> float:
+        """
+        TAO price of one alpha on a subnet at the cached block.
+        """
+        subnet = self.subnet(netuid)
+        if subnet is None:
+            raise ValueError(f"Subnet with netuid {netuid} does not exist")
+        return float(subnet.price.tao)
+
+    def quotes(self) -> QuoteEngine:
+        """
+        QuoteEngine over every subnet's reserves at the cached block.
+        """
+        self.wait_ready()
+        block, _, subnets = self._state
+        return self._engine(block, subnets)
+
+    def state(self) -> Tuple[Optional[int], Optional[str], List, QuoteEngine]:
+        """
+        Block, block hash, every subnet's info and the QuoteEngine, all of the same cached block.
+        """
+        self.wait_ready()
+        block, block_hash, subnets = self._state
+        return block, block_hash, [subnets[netuid] for netuid in sorted(subnets)], self._engine(block, subnets)
+
+    def _engine(self, block: Optional[int], subnets: Dict) -> QuoteEngine:
+        quote_block, engine = self._quotes
+        if engine is None or quote_block != block:
+            engine = QuoteEngine.from_pools(subnets.values(), block=block)
+            self._quotes = (block, engine)
+        return engine
+
+    async def quotes_async(self) -> QuoteEngine:
+        """
+        quotes() for coroutines, without blocking the event loop before the first refresh.
+        """
+        await self.wait_ready_async()
+        return self.quotes()
+
+    def refresh(self, subtensor) -> bool:
+        """
+        Reload subnet state if the head has moved. Returns whether it did.
+        """
+        block = subtensor.get_current_block()
+        if block == self.block:
+            return False
+        block_hash = subtensor.get_block_hash(block)
+        subnets = {subnet.netuid: subnet for subnet in subtensor.all_subnets(block=block)}
+        # Swap the whole state at once so readers never see a mix of two blocks
+        self._state = (block, block_hash, subnets)
+        self._ready.set()
+        return True
+
+    def close(self) -> None:
+        self._closed.set()
+        self._new_head.set()
+
+    def _refresh_loop(self) -> None:
+        subtensor = None
+        while not self._closed.is_set():
+            # Cleared before refreshing, so a head that arrives meanwhile triggers another refresh
+            self._new_head.clear()
+            try:
+                if subtensor is None:
+                    subtensor = create_subtensor(self.network)
+                self.refresh(subtensor)
+            except Exception as e:
+                print(f"Error refreshing subnet state: {e}")
+                subtensor = None
+                self._closed.wait(1)
+            self._new_head.wait(self.poll_interval)
+
+    def _on_head(self, obj, update_nr, subscription_id):
+        if self._closed.is_set():
+            # A non-None return value ends the subscription
+            return True
+        self._new_head.set()
+
+    def _subscribe_loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                substrate = create_subtensor(self.network).substrate
+                substrate.subscribe_block_headers(self._on_head)
+            except Exception as e:
+                print(f"Head subscription dropped: {e}")
+            self._closed.wait(1)
+
+
+_caches: Dict[str, SubnetStateCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_subnet_cache(network: str) -> SubnetStateCache:
+    """
+    Return the process-wide SubnetStateCache for a network, creating it on first use.
+    """
+    with _caches_lock:
+        if network not in _caches:
+            _caches[network] = SubnetStateCache(network)
+        return _caches[network]
@@ -0,0 +1,207 @@
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from substrateinterface import SubstrateInterface
+from websocket import WebSocketException
+
+from utils.rpc import create_substrate, get_endpoints
+
+
+# Errors that mean the websocket underneath a connection is unusable.
+CONNECTION_ERRORS = (WebSocketException, OSError)
+
+
+class SubstratePool:
+    """
+    Pool of pre-warmed SubstrateInterface connections.
+
+    Connections are opened with their runtime metadata already loaded, so a
+    caller on the trade path only pays for the RPCs it actually makes. A
+    heartbeat thread pings idle connections and replaces dead ones in the
+    background; callers only ever connect inline when the whole pool is down.
+    Connections are opened on the network's best endpoint, and ones left on
+    a node that has stalled or fallen behind are moved off it by the heartbeat.
+    """
+
+    def __init__(
+        self,
+        network: str,
+        size: int = 4,
+        heartbeat_interval: float = 12.0,
+    ):
+        """
+        Initialize the pool and start warming connections in the background.
+
+        Args:
+            network: Network name, websocket URL or comma-separated URLs
+            size: Number of connections to keep open
+            heartbeat_interval: Seconds between health checks of idle connections
+        """
+        self.network = network
+        self.endpoints = get_endpoints(network)
+        self.size = max(1, size)
+        self.heartbeat_interval = heartbeat_interval
+        # LIFO so the most recently used (hottest) connection is handed out first
+        self._idle: "queue.LifoQueue[SubstrateInterface]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._pending = 0
+        # Connections open right now, idle or checked out; inline connects may push it past size
+        self._open = 0
+        # ids of checked-out connections a caller has found dead
+        self._broken = set()
+        self._closed = threading.Event()
+
+        for _ in range(self.size):
+            self._reconnect_in_background()
+
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        self._heartbeat.start()
+
+    def checkout(self, timeout: Optional[float] = 10.0) -> SubstrateInterface:
+        """
+        Take a connection out of the pool.
+
+        Waits for an idle connection while background reconnects are in
+        flight; connects inline only if nothing is idle and nothing is pending.
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            pending = self._pending
+
+        # Connections being reconnected or pinged will be back shortly
+        if pending:
+            try:
+                return self._idle.get(timeout=timeout)
+            except queue.Empty:
+                pass
+
+        substrate = create_substrate(self.network)
+        with self._lock:
+            self._open += 1
+        return substrate
+
+    def mark_broken(self, substrate: SubstrateInterface) -> None:
+        """
+        Flag a checked-out connection as dead, for callers that handle the
+        error themselves; connection() then discards it instead of returning it.
+        """
+        with self._lock:
+            self._broken.add(id(substrate))
+
+    def checkin(self, substrate: SubstrateInterface, broken: bool = False) -> None:
+        """
+        Return a connection to the pool, replacing it in the background if broken.
+
+        Connections beyond `size`, opened inline during a burst, are closed
+        instead of kept.
+        """
+        with self._lock:
+            broken = broken or id(substrate) in self._broken
+            self._broken.discard(id(substrate))
+            surplus = not broken and self._open > self.size
+            if broken or surplus or self._closed.is_set():
+                self._open -= 1
+            # A broken surplus connection is not replaced
+            replace = self._open < self.size
+        if broken or self._closed.is_set():
+            self._discard(substrate)
+            if replace and not self._closed.is_set():
+                self._reconnect_in_background()
+            return
+        if surplus:
+            self._discard(substrate)
+            return
+        self._idle.put(substrate)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = 10.0) -> Iterator[SubstrateInterface]:
+        """
+        Check a connection out for the duration of a `with` block.
+        """
+        substrate = self.checkout(timeout)
+        try:
+            yield substrate
+        except CONNECTION_ERRORS:
+            self.checkin(substrate, broken=True)
+            raise
+        except BaseException:
+            self.checkin(substrate)
+            raise
+        else:
+            self.checkin(substrate)
+
+    def close(self) -> None:
+        """
+        Stop the heartbeat and close every idle connection.
+        """
+        self._closed.set()
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+            with self._lock:
+                self._open -= 1
+
+    def _reconnect_in_background(self) -> None:
+        with self._lock:
+            self._pending += 1
+        threading.Thread(target=self._reconnect, daemon=True).start()
+
+    def _reconnect(self) -> None:
+        try:
+            while not self._closed.is_set():
+                try:
+                    substrate = create_substrate(self.network)
+                except Exception as e:
+                    print(f"Error connecting to {self.network}: {e}")
+                    self._closed.wait(1)
+                    continue
+                with self._lock:
+                    self._open += 1
+                self._idle.put(substrate)
+                return
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _heartbeat_loop(self) -> None:
+        while not self._closed.wait(self.heartbeat_interval):
+            # Only idle connections are pinged; busy ones prove themselves in use.
+            idle = []
+            while True:
+                with self._lock:
+                    try:
+                        idle.append(self._idle.get_nowait())
+                    except queue.Empty:
+                        break
+                    self._pending += 1
+
+            for substrate in idle:
+                try:
+                    url = substrate.url
+                    if not self.endpoints.is_healthy(url) and url != self.endpoints.best():
+                        raise ConnectionError("endpoint stalled or lagging")
+                    substrate.rpc_request('system_health', [])
+                except Exception as e:
+                    print(f"Heartbeat failed for {substrate.url}: {e}")
+                    self.endpoints.report_failure(substrate.url)
+                    self.checkin(substrate, broken=True)
+                else:
+                    self.checkin(substrate)
+                finally:
+                    with self._lock:
+                        self._pending -= 1
+
+    @staticmethod
+    def _discard(substrate: SubstrateInterface) -> None:
+        try:
+            substrate.close()
+        except Exception:
+            pass
@@ -0,0 +1,155 @@
+from typing import Dict, List, Optional
+
+from bittensor.utils.balance import Balance
+
+from utils.amm import QuoteEngine
+from utils.receipts import TradeOutcome
+from utils.snapshot import PoolState
+
+
+class TwapOrder:
+    """
+    A stake order executed as a series of child add_stake_limit trades.
+
+    Each child is sized from the pool depth at the time it is sent so that
+    its own price impact stays within `max_impact`, and is sent only after
+    the previous one was included, so children land in successive blocks
+    and arbitrage can pull the price back in between. Every child is priced
+    from a fresh snapshot; the order stops once the pool price has moved
+    more than `max_drift` above where it started, when even a `min_child`
+    child would exceed `max_impact`, after `max_failures` failed children
+    in a row, or after `max_children` children.
+
+    The executors (LeoProxy.twap_add_stake, StakeService.stake with
+    mode="twap") only fetch pool state and send children; sizing, stopping
+    and fill accounting live here.
+    """
+
+    def __init__(
+        self,
+        netuid: int,
+        amount: Balance,
+        max_impact: float = 0.002,
+        max_drift: float = 0.02,
+        tolerance_margin: float = 0.001,
+        min_child: float = 0.01,
+        max_children: int = 100,
+        max_failures: int = 3,
+    ):
+        """
+        Args:
+            netuid: Subnet to stake into
+            amount: Total TAO to stake
+            max_impact: Price impact allowed for each child
+            max_drift: Stop once the spot price rose this much above the first child's
+            tolerance_margin: Added to max_impact for each child's limit price
+            min_child: Smallest child in TAO worth a transaction fee, unless less remains;
+                the order stops if the pool is too thin for one within max_impact
+            max_children: Most children to send
+            max_failures: Stop after this many failed children in a row
+        """
+        self.netuid = netuid
+        self.amount = amount
+        self.max_impact = max_impact
+        self.max_drift = max_drift
+        self.tolerance = max_impact + tolerance_margin
+        self.min_child = Balance.from_tao(min_child)
+        self.max_children = max_children
+        self.max_failures = max_failures
+
+        self.start_price: Optional[float] = None
+        self.filled_tao = Balance.from_rao(0)
+        self.filled_alpha = Balance.from_rao(0).set_unit(netuid)
+        self.children: List[TradeOutcome] = []
+        self.failures = 0
+        self.stopped: Optional[str] = None
+
+    @property
+    def remaining(self) -> Balance:
+        return Balance.from_rao(max(self.amount.rao - self.filled_tao.rao, 0))
+
+    @property
+    def done(self) -> bool:
+        return self.stopped is not None or self.remaining.rao == 0
+
+    @property
+    def average_price(self) -> Optional[float]:
+        """
+        TAO paid per alpha over every filled child, fees included.
+        """
+        if not self.filled_alpha.rao:
+            return None
+        return self.filled_tao.tao / self.filled_alpha.tao
+
+    def stop(self, reason: str) -> None:
+        self.stopped = reason
+
+    def next_child(self, pool: Optional[PoolState]) -> Optional[Balance]:
+        """
+        Size of the next child at the given pool state, or None if the order stops.
+        """
+        if self.done:
+            return None
+        if pool is None:
+            self.stop(f"Subnet with netuid {self.netuid} does not exist")
+            return None
+        if len(self.children) >= self.max_children:
+            self.stop(f"Reached {self.max_children} child orders")
+            return None
+
+        price = pool.price.tao
+        if self.start_price is None:
+            self.start_price = price
+        elif price > self.start_price * (1 + self.max_drift):
+            self.stop(f"Price moved from {self.start_price:.9f} to {price:.9f}, more than {self.max_drift:.2%}")
+            return None
+
+        depth = float(QuoteEngine.from_pools([pool]).max_amount(self.netuid, self.max_impact, buy=True))
+        size = Balance.from_tao(min(depth, self.remaining.tao)) if depth != float("inf") else self.remaining
+        if size.rao < self.remaining.rao and size.rao < self.min_child.rao:
+            # Raising the child to min_child would break the impact cap, and a pool this thin
+            # will not deepen enough within a few blocks, so stop rather than overpay
+            self.stop(
+                f"Pool too thin: a child within {self.max_impact:.2%} impact is {size}, "
+                f"below the minimum child of {self.min_child}"
+            )
+            return None
+        return size
+
+    def record(self, child: Balance, outcome: TradeOutcome) -> None:
+        """
+        Add a child's outcome to the fills.
+
+        The TAO filled is the child's full size, fees included, so the order
+        never spends more than `amount`; the alpha is what the receipt reports.
+        """
+        self.children.append(outcome)
+        if outcome.success:
+            self.failures = 0
+            self.filled_tao = Balance.from_rao(self.filled_tao.rao + child.rao)
+            if outcome.alpha is not None:
+                self.filled_alpha = Balance.from_rao(self.filled_alpha.rao + outcome.alpha.rao).set_unit(self.netuid)
+            return
+        self.failures += 1
+        if self.failures >= self.max_failures:
+            self.stop(f"{self.failures} child orders failed in a row: {outcome.error}")
+
+    def as_dict(self) -> Dict:
+        return {
+            "success": self.remaining.rao == 0,
+            "error": self.stopped,
+            "netuid": self.netuid,
+            "amount": self.amount.tao,
+            "filled_tao": self.filled_tao.tao,
+            "filled_alpha": self.filled_alpha.tao,
+            "average_price": self.average_price,
+            "start_price": self.start_price,
+            "children": [child.as_dict() for child in self.children],
+        }
+
+    def __str__(self) -> str:
+        status = "done" if self.remaining.rao == 0 else f"stopped: {self.stopped}"
+        return (
+            f"TWAP SN{self.netuid}: filled {self.filled_tao} of {self.amount} for {self.filled_alpha} "
+            f"in {len(self.children)} children ({status})"
+        )